@@ -1,19 +1,65 @@
 import streamlit as st
-import openai
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores.chroma import Chroma
 import pandas as pd
-import torch
 import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot"))
+from retriever import Retriever
+from answer_cache import AnswerCache, context_hash
+import answer_generator
+from answer_generator import stream_answer, format_seconds, format_latency
+from prompt_builder import DEFAULT_CONTEXT_TOKEN_BUDGET
+from generation_backend import create_generation_backend
+
+@st.cache_resource
+def load_retriever(chroma_path, backend="chroma"):
+    """
+    Streamlit 재실행과 세션 사이에서 공유되는 검색기를 로드하고 예열
 
-# HuggingFace Embeddings 모델 설정
-device = "cuda" if torch.cuda.is_available() else "cpu"
-embeddings = HuggingFaceEmbeddings(
-    model_name="jhgan/ko-sroberta-multitask",
-    model_kwargs={"device": device}
-)
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
 
-def query_rag(chroma_path, query_text, k=2):
+    Returns:
+        Retriever: 예열된 검색기
+    """
+    retriever = Retriever(chroma_path, device="auto", backend=backend)
+    retriever.warm_up()
+    print(retriever.startup_report())
+    return retriever
+
+@st.cache_resource
+def load_answer_cache(cache_path, threshold=0.95, ttl_seconds=None):
+    """
+    Streamlit 재실행과 세션 사이에서 공유되는 답변 의미 캐시를 로드
+
+    Args:
+        cache_path (str): 답변 캐시 SQLite 경로
+        threshold (float): 캐시된 답변을 재사용할 최소 코사인 유사도
+        ttl_seconds (float, optional): 답변 유효 시간 (None이면 만료 없음)
+
+    Returns:
+        AnswerCache: 답변 캐시
+    """
+    return AnswerCache(cache_path, threshold=threshold, ttl_seconds=ttl_seconds)
+
+@st.cache_resource
+def load_generation_backend(name="openai", api_key=None, base_url=None):
+    """
+    Streamlit 재실행과 세션 사이에서 공유되는 답변 생성 백엔드를 생성
+
+    Args:
+        name (str): 생성 백엔드 ("openai" 또는 "stub")
+        api_key (str, optional): OpenAI API 키
+        base_url (str, optional): OpenAI 호환 API 주소 (예: stub_server.py)
+
+    Returns:
+        답변 생성 백엔드
+    """
+    return create_generation_backend(name, api_key=api_key, base_url=base_url)
+
+def query_rag(chroma_path, query_text, k=2, filters=None, backend="chroma"):
     """
     Chroma DB에서 유사한 문서를 검색
 
@@ -21,115 +67,60 @@ def query_rag(chroma_path, query_text, k=2):
         chroma_path (str): Chroma DB 저장 경로
         query_text (str): 검색할 질의 문장
         k (int): 반환할 문서 개수
+        filters (dict, optional): 위원회(committee), 법 종류(field), 회기(session), 기간(date_from, date_to) 조건
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
 
     Returns:
         tuple: 검색된 문서의 컨텍스트와 메타데이터
     """
-    # Chroma DB 로드
-    db = Chroma(persist_directory=chroma_path, embedding_function=embeddings)
-
-    # 유사한 문서 검색
-    results = db.similarity_search_with_score(query_text, k=k)
-    if not results:
-        raise ValueError("No relevant context found.")
+    return load_retriever(chroma_path, backend).query(query_text, k=k, filters=filters)
 
-    # 컨텍스트와 메타데이터 추출
-    context = " ".join([doc.page_content for doc, _ in results])
-    metadata = results[0][0].metadata  # 가장 유사한 문서의 메타데이터
-    return context, metadata
-
-def generate_answer(api_key,query_text, context, metadata):
+def generate_answer(generator, query_text, context, metadata, context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET):
     """
-    OpenAI GPT 모델을 사용해 답변을 생성
+    생성 백엔드를 사용해 답변을 생성 (프롬프트는 CLI와 같은 prompt_builder로 구성)
     
     Args:
-        api_key (str): OpenAI API 키
+        generator: 답변 생성 백엔드
         query_text (str): 사용자 질의
         context (str): 검색된 문서 컨텍스트
         metadata (dict): 관련 메타데이터
+        context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
 
     Returns:
         str: 생성된 답변
     """
-    # Title과 발의자 정보 처리
-    openai.api_key = api_key
-    title = metadata.get('title', 'N/A')
-    proposer_info = ""
-    if "(" in title and ")" in title:
-        proposer_info = title[title.find("(")+1:title.find(")")]
-        title_without_proposer = title[:title.find("(")].strip()
-    else:
-        title_without_proposer = title
-
-    # 회기 정보 처리
-    session = metadata.get('session', 'N/A')
-    session_info = f"{session}대 국회" if session != "N/A" else "국회 회기 정보 없음"
-
-    # Terminology와 Terminology_en 키워드 선택
-    terminology = metadata.get('terminology', '').split(", ")
-    terminology_en = metadata.get('terminology_en', '').split(", ")
-    selected_korean_term = terminology[0] if terminology else "N/A"
-    selected_english_term = terminology_en[0] if terminology_en else "N/A"
-
-    # 첫 문장 구성
-    first_sentence = f"의안정보시스템에 {metadata.get('date', 'N/A')}에 게시된 법률안 검토 보고서에 따르면, '{title_without_proposer}'은 "
-    if proposer_info:
-        first_sentence += f"{proposer_info}이 발의하였으며, "
-    first_sentence += f"{metadata.get('committee', 'N/A')}에서 소관하는 법률안으로 {session_info}에서 공개되었습니다."
-
-    # 검색 사이트
-    search_site = 'https://likms.assembly.go.kr/bill/main.do'
-
-    # 프롬프트 설계 
-    prompt = f"""
-    Metadata:
-    Title: {metadata.get('title', 'N/A')}
-    Session: {metadata.get('session', 'N/A')}
-    Committee: {metadata.get('committee', 'N/A')}
-    Date: {metadata.get('date', 'N/A')}
-    Amendment: {metadata.get('amendment', 'N/A')}
-    Enactment: {metadata.get('enactment', 'N/A')}
-    Terminology: {metadata.get('terminology', 'N/A')}
-    Terminology_en: {metadata.get('terminology_en', 'N/A')}
-
-    Instruction:
-    1. 아래 첫 문장을 기반으로 예시와 같이 답변을 시작하십시오:
-       "{first_sentence}"
-    - 예시: "의안정보시스템에 2020년 5월 29일 게시된 법률안 검토 보고서에 따르면, '성폭력범죄의 처벌 등에 관한 특례법 일부개정법률안'은 고용진 의원 등 10인이 발의하였으며, 법제사법위원회에서 소관하는 법률안으로 21대 국회에서 공개되었습니다."
-    2. 질문에 충실히 답변하며, 질문에 대한 답변은 Context의 핵심 내용을 간결히 참고하여 제공합니다.
-    3. 질문에 대한 답변 이후에, Amendment와 Enactment 값을 활용하여, 이 법안이 개정되었다면, 해당 발의로 개정되었음만 언급합니다. 마찬가지로 제정되었으면, 해당 발의로 제정되었음만 언급합니다. 개정되지 않거나 제정되지 않았다면 생략합니다. 
-    - 예시: "최종적으로 이 법안은 해당 발의로 개정되었습니다."
-    4. 마지막으로 Terminology와 Terminology_en에서 관련 키워드를 하나씩 선택하여, 추가 검색을 유도하는 문장을 작성하십시오.
-       - 예: "이 법안에 대해 더 자세히 알아보시려면, 의안정보시스템에서  '{selected_korean_term}'과(와) '{selected_english_term}'를 검색해 보시기 바랍니다. ► 의안정보시스템 바로가기 : {search_site}"
-
-    Context:
-    {context}
-
-    Question:
-    {query_text}
-
-    Answer:
+    return answer_generator.generate_answer(query_text, context, metadata, context_token_budget, generator)
+    
+
+def render_answer_stream(placeholder, generator, query_text, context, metadata, timings,
+                         context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET):
     """
+    답변을 생성되는 대로 placeholder에 이어 붙여 표시
+
+    Args:
+        placeholder: st.empty()로 만든 표시 영역
+        generator: 답변 생성 백엔드
+        query_text (str): 사용자 질의
+        context (str): 검색된 문서 컨텍스트
+        metadata (dict): 관련 메타데이터
+        timings (dict): 첫 토큰까지의 시간(ttft)과 전체 시간(total)을 기록할 dict
+        context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
 
-    # 모델 호출
+    Returns:
+        str: 생성된 전체 답변
+    """
+    parts = []
     try:
-        completion = openai.chat.completions.create(
-            model="gpt-4o-mini", 
-            messages=[
-                {"role": "system", "content": "메타데이터와 컨텍스트를 기반으로 사용자가 이해하기 쉬운 답변을 작성하십시오. 최종적으로 논리적인 흐름을 가진 답변을 제공하십시오 "},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.7  
-        )
-        return completion.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"Error generating answer: {e}")
-        return ""
-    
+        for chunk in stream_answer(query_text, context, metadata, timings, context_token_budget, generator):
+            parts.append(chunk)
+            placeholder.success("".join(parts))
+    finally:
+        print(format_latency(timings))
+    return "".join(parts).strip()
 
 # Streamlit 메인 함수
-def main(csv_path, chroma_path, api_key):
+def main(csv_path, chroma_path, api_key, backend="chroma", answer_cache_path=None, cache_threshold=0.95, cache_ttl=None,
+         stream=True, context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, generation_backend="openai", base_url=None):
     # CSV 파일 로드
     data = pd.read_csv(csv_path)
 
@@ -137,6 +128,10 @@ def main(csv_path, chroma_path, api_key):
     st.set_page_config(page_title=" 나를 위한 법이 궁금해", page_icon="⚖️")
     st.title(" 나를 위한 법!이 궁금해 👀🔎")
 
+    # 검색기는 첫 실행에서 한 번만 로드하고 이후 재실행과 세션에서 재사용
+    load_retriever(chroma_path, backend)
+    generator = load_generation_backend(generation_backend, api_key, base_url)
+
     # 안내 문구 표시
     st.markdown(
         """
@@ -217,13 +212,34 @@ def main(csv_path, chroma_path, api_key):
 
         if submitted:
             try:
-                # RAG로 컨텍스트와 메타데이터 검색
-                context, metadata = query_rag(chroma_path,user_input, k=3)
-                answer = generate_answer(user_input, context, metadata)
+                # 선택한 위원회와 법 종류 안에서만 컨텍스트와 메타데이터 검색
+                filters = {"committee": selected_committee, "field": selected_field}
+                context, metadata = query_rag(chroma_path, user_input, k=3, filters=filters, backend=backend)
+                # 스트리밍이면 답변을 생성되는 대로 표시
+                answer_placeholder = st.empty()
+                timings = {}
+                if stream:
+                    generate = lambda: render_answer_stream(answer_placeholder, generator, user_input, context, metadata, timings,
+                                                                  context_token_budget)
+                else:
+                    generate = lambda: generate_answer(generator, user_input, context, metadata, context_token_budget)
+
+                # 같은 문서가 검색된 비슷한 이전 질문이 있으면 캐시된 답변 사용
+                if answer_cache_path:
+                    answer_cache = load_answer_cache(answer_cache_path, cache_threshold, cache_ttl)
+                    query_vector = load_retriever(chroma_path, backend).embed_queries([user_input])[0]
+                    answer, _ = answer_cache.get_or_generate(metadata.get("doc_id"),
+                                                             context_hash(context, metadata, context_token_budget),
+                                                             user_input, query_vector, generate)
+                    print(answer_cache.report())
+                else:
+                    answer = generate()
 
                 # 답변 표시
                 # st.write("### A ")
-                st.success(answer)
+                answer_placeholder.success(answer)
+                if timings:
+                    st.caption(f"첫 토큰 {format_seconds(timings.get('ttft'))} · 전체 {format_seconds(timings.get('total'))}")
 
                 # Retrieved Context를 토글 안에 숨기기
                 with st.expander("제공한 답변에 참고한 내용을 확인하고 싶다면 열어주세요 🧐"):
@@ -264,7 +280,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Streamlit 법률 정보 애플리케이션")
     parser.add_argument("--csv_path", type=str, required=True, help="CSV 파일 경로")
     parser.add_argument("--chroma_path", type=str, required=True, help="ChromaDB 경로")
-    parser.add_argument("--api_key", type=str, required=True, help="OpenAI API 키")
+    parser.add_argument("--api_key", type=str, default=None, help="OpenAI API 키 (없으면 OPENAI_API_KEY 환경 변수)")
+    parser.add_argument("--backend", type=str, choices=["chroma", "flat"], default="chroma", help="검색 백엔드 (기본값: chroma)")
+    parser.add_argument("--answer_cache", type=str, default=None, help="답변 의미 캐시 SQLite 경로 (비슷한 질문의 답변 재사용)")
+    parser.add_argument("--cache_threshold", type=float, default=0.95, help="캐시된 답변을 재사용할 최소 코사인 유사도 (기본값: 0.95)")
+    parser.add_argument("--cache_ttl", type=float, default=None, help="캐시된 답변의 유효 시간(초) (기본값: 만료 없음)")
+    parser.add_argument("--no_stream", action="store_true", help="답변을 스트리밍하지 않고 완성된 뒤 한 번에 표시")
+    parser.add_argument("--context_token_budget", type=int, default=DEFAULT_CONTEXT_TOKEN_BUDGET,
+                        help=f"프롬프트에 넣을 컨텍스트의 최대 토큰 수 (기본값: {DEFAULT_CONTEXT_TOKEN_BUDGET})")
+    parser.add_argument("--generation_backend", type=str, choices=["openai", "stub"], default="openai",
+                        help="답변 생성 백엔드 (stub: API 호출 없이 정해진 답변 반환, 기본값: openai)")
+    parser.add_argument("--base_url", type=str, default=None, help="OpenAI 호환 API 주소 (예: stub_server.py의 http://127.0.0.1:8001/v1)")
 
     args = parser.parse_args()
-    main(args.csv_path, args.chroma_path, args.api_key)
\ No newline at end of file
+    main(args.csv_path, args.chroma_path, args.api_key, args.backend, args.answer_cache, args.cache_threshold, args.cache_ttl,
+         not args.no_stream, args.context_token_budget, args.generation_backend, args.base_url)
\ No newline at end of file
@@ -1,30 +1,31 @@
+import os
+import sys
 import pandas as pd
-import json
 import argparse
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "preprocess"))
+from artifact_io import iter_records
+
+# Streamlit 화면에 필요한 컬럼 (본문 paragraph는 읽지 않음)
+METADATA_COLUMNS = ["committee", "session", "field", "title", "date"]
+
 def generate_metadata(input_json, output_csv):
     """
-    JSON 데이터를 읽어 Streamlit용 CSV 파일로 변환
+    전처리된 데이터를 읽어 Streamlit용 CSV 파일로 변환
 
     Args:
-        input_json (str): 최종 전처리된 JSON 데이터 경로
+        input_json (str): 최종 전처리된 데이터 경로 (.json, .jsonl, .parquet)
         output_csv (str): 생성될 CSV 파일 경로
     """
     try:
-        with open(input_json, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-        
-        # JSON 데이터를 DataFrame으로 변환
-        data = pd.DataFrame([
-            {
-                "committee": item.get("committee", "N/A"),
-                "session": item.get("session", "N/A"),
-                "field": item.get("field", "N/A"),
-                "title": item.get("title", "N/A"),
-                "date": item.get("date", "N/A")
-            }
-            for item in json_data
-        ])
+        # 필요한 컬럼만 읽어 DataFrame으로 변환
+        data = pd.DataFrame(
+            [
+                {column: "N/A" if item.get(column) is None else item[column] for column in METADATA_COLUMNS}
+                for item in iter_records(input_json, columns=METADATA_COLUMNS)
+            ],
+            columns=METADATA_COLUMNS
+        )
         
         # CSV 파일 저장
         data.to_csv(output_csv, index=False, encoding='utf-8')
@@ -34,8 +35,8 @@ def generate_metadata(input_json, output_csv):
 
 if __name__ == "__main__":
     # 입력 인자 설정
-    parser = argparse.ArgumentParser(description="JSON 데이터를 Streamlit용 CSV 파일로 변환")
-    parser.add_argument("--input_json", type=str, required=True, help="최종 전처리된 JSON 데이터 경로")
+    parser = argparse.ArgumentParser(description="전처리된 데이터를 Streamlit용 CSV 파일로 변환")
+    parser.add_argument("--input_json", type=str, required=True, help="최종 전처리된 데이터 경로 (.json/.jsonl/.parquet)")
     parser.add_argument("--output_csv", type=str, required=True, help="출력될 CSV 파일 경로")
 
     args = parser.parse_args()
@@ -0,0 +1,387 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import torch
+from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.vectorstores import Chroma
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from build_chroma import load_data, prepare_documents
+from flat_index import write_flat_index, squared_l2_distances
+from shards import group_by_shard, save_shard_manifest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot"))
+from retriever import Retriever, read_query_file
+
+
+DEFAULT_SETTINGS = ["chroma", "chroma_sharded", "flat", "flat_int8", "flat_binary", "cached"]
+
+# 합성 코퍼스 생성에 사용하는 값
+SYNTHETIC_COMMITTEES = ["법제사법위원회", "보건복지위원회", "국토교통위원회", "환경노동위원회", "교육위원회"]
+SYNTHETIC_SESSIONS = ["20", "21"]
+SYNTHETIC_LAWS = ["근로기준법", "주택임대차보호법", "국민건강보험법", "도로교통법", "아동복지법", "개인정보 보호법",
+                  "청소년 보호법", "최저임금법", "건축법", "고용보험법", "감염병의 예방 및 관리에 관한 법률", "소비자기본법"]
+SYNTHETIC_WORDS = ["개정", "신설", "조항", "보호", "지원", "의무", "위반", "처벌", "기준", "강화", "완화", "근로자", "임차인",
+                   "보험료", "운전자", "아동", "정보주체", "청소년", "임금", "건축물", "피보험자", "감염병", "소비자", "국가",
+                   "지방자치단체", "사업주", "과태료", "신고", "허가", "등록", "점검", "지정", "시행", "규정", "현행법", "대상"]
+
+
+def synthetic_corpus(num_bills, seed=0):
+    """
+    법률 이름별로 단어가 몰리도록 만든 합성 법률안 코퍼스 (전처리 결과와 같은 필드)
+
+    Args:
+        num_bills (int): 생성할 법률안 수
+        seed (int): 난수 시드
+
+    Returns:
+        list: 레코드 리스트
+    """
+    rng = random.Random(seed)
+    data = []
+    for i in range(num_bills):
+        law = rng.choice(SYNTHETIC_LAWS)
+        words = rng.sample(SYNTHETIC_WORDS, 12)
+        sentences = [f"{law} {' '.join(rng.sample(words, 5))}에 관한 사항을 정함." for _ in range(rng.randint(3, 6))]
+        year = rng.randint(2016, 2024)
+        data.append({
+            "id": f"SYN{i:07d}",
+            "title": f"{law} 일부개정법률안(의원 {i % 300}인)",
+            "session": rng.choice(SYNTHETIC_SESSIONS),
+            "committee": rng.choice(SYNTHETIC_COMMITTEES),
+            "field": law,
+            "date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "paragraph": " ".join(sentences)
+        })
+    return data
+
+
+def sample_queries(documents, num_queries, seed=0):
+    """
+    Args:
+        documents (list): 문서 리스트
+        num_queries (int): 만들 질의 수
+        seed (int): 난수 시드
+
+    Returns:
+        list: 무작위 문서에서 연속된 단어 몇 개를 잘라 만든 질의 리스트
+    """
+    rng = random.Random(seed)
+    queries = []
+    for document in rng.sample(documents, min(num_queries, len(documents))):
+        words = document.split()
+        start = rng.randint(0, max(len(words) - 8, 0))
+        queries.append(" ".join(words[start:start + 8]))
+    return queries
+
+
+def current_rss_mb():
+    """
+    Returns:
+        float: 현재 프로세스의 상주 메모리 (MB), 알 수 없으면 None
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        return None
+
+
+def git_commit():
+    """
+    Returns:
+        str: 현재 git 커밋 해시 (git 저장소가 아니면 None)
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def add_to_collection(chroma_path, collection_name, embeddings, ids, documents, metadatas, vectors, batch_size=1000):
+    """
+    이미 계산한 임베딩으로 Chroma 컬렉션을 만듦 (설정마다 다시 임베딩하지 않도록)
+    """
+    kwargs = {"collection_name": collection_name} if collection_name else {}
+    db = Chroma(persist_directory=chroma_path, embedding_function=embeddings, **kwargs)
+    for start in range(0, len(ids), batch_size):
+        db._collection.add(
+            ids=ids[start:start + batch_size],
+            embeddings=vectors[start:start + batch_size].tolist(),
+            metadatas=metadatas[start:start + batch_size],
+            documents=documents[start:start + batch_size]
+        )
+    db.persist()
+
+
+def build_indexes(work_dir, settings, model_name, embeddings, ids, documents, metadatas, vectors):
+    """
+    설정별 인덱스를 work_dir 아래에 구축
+
+    Returns:
+        dict: {설정 이름: Retriever 생성 인자}
+    """
+    targets = {}
+    chroma_path = os.path.join(work_dir, "chroma")
+    if {"chroma", "cached"} & set(settings):
+        shutil.rmtree(chroma_path, ignore_errors=True)
+        add_to_collection(chroma_path, None, embeddings, ids, documents, metadatas, vectors)
+        targets["chroma"] = targets["cached"] = {"chroma_path": chroma_path}
+
+    if "chroma_sharded" in settings:
+        sharded_path = os.path.join(work_dir, "chroma_sharded")
+        shutil.rmtree(sharded_path, ignore_errors=True)
+        manifest = {"shard_by": ["session"], "shards": {}}
+        for name, (values, indices) in sorted(group_by_shard(metadatas, ["session"]).items()):
+            add_to_collection(sharded_path, name, embeddings, [ids[i] for i in indices], [documents[i] for i in indices],
+                              [metadatas[i] for i in indices], vectors[indices])
+            manifest["shards"][name] = {"values": values, "count": len(indices)}
+        save_shard_manifest(sharded_path, manifest)
+        targets["chroma_sharded"] = {"chroma_path": sharded_path}
+
+    for setting, quantization in (("flat", None), ("flat_int8", "int8"), ("flat_binary", "binary")):
+        if setting in settings:
+            flat_path = os.path.join(work_dir, setting)
+            write_flat_index(flat_path, ids, documents, metadatas, vectors, model_name, quantization=quantization)
+            targets[setting] = {"chroma_path": work_dir, "backend": "flat", "flat_index_path": flat_path}
+    return targets
+
+
+def exact_top_k(query_vectors, vectors, ids, k):
+    """
+    Returns:
+        list: 질의별 float32 제곱 L2 거리 전수 비교 상위 k개 문서 id (recall 기준)
+            (Chroma와 flat 인덱스가 모두 같은 거리로 검색하므로 recall은 근사 검색과 양자화 오차만 반영)
+    """
+    top = np.argsort(squared_l2_distances(query_vectors, vectors), axis=1)[:, :k]
+    return [[ids[i] for i in rows] for rows in top]
+
+
+def latency_summary(latencies):
+    """
+    Args:
+        latencies (list): 질의별 소요 시간 (초)
+
+    Returns:
+        dict: 평균, p50, p95, p99 (ms)
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99))
+    }
+
+
+def benchmark_setting(setting, retriever, queries, truth, k, batch_size=32):
+    """
+    하나의 설정에 대해 질의를 하나씩 다시 실행해 지연 시간을, 배치로 실행해 처리량을 측정
+    모든 설정을 질의 문장에서 시작하는 전체 검색(질의 임베딩 + 인덱스 검색)으로 같은 방식으로 측정하고,
+    질의 임베딩 시간과 인덱스 검색 시간을 따로 기록 (cached만 질의 임베딩 캐시를 미리 채운 뒤 측정)
+
+    Returns:
+        dict: 지연 시간 분위수, 질의 임베딩/검색 평균 시간, 처리량, 인덱스 메모리, recall@k
+    """
+    rss_before = current_rss_mb()
+    retriever.warm_up()
+    rss_after = current_rss_mb()
+
+    if setting == "cached":
+        # 같은 질의를 한 번 실행해 질의 임베딩 캐시를 채움 (측정은 두 번째 실행, 모두 캐시 적중)
+        retriever.search_batch(queries, k)
+
+    latencies = []
+    embed_latencies = []
+    results = []
+    for query_text in queries:
+        # Retriever.search와 같은 경로를 단계별로 나눠 측정
+        start = time.perf_counter()
+        vectors = retriever.embed_queries([query_text])
+        embedded = time.perf_counter()
+        results.append(retriever.search_by_vectors(vectors, k)[0])
+        latencies.append(time.perf_counter() - start)
+        embed_latencies.append(embedded - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        retriever.search_batch(queries[i:i + batch_size], k)
+    batch_seconds = time.perf_counter() - start
+
+    recall = 0.0
+    for hits, expected in zip(results, truth):
+        found = {document.metadata.get("doc_id") for document, _ in hits}
+        recall += len(found.intersection(expected)) / max(len(expected), 1)
+
+    summary = {"setting": setting, **latency_summary(latencies)}
+    summary["embed_mean_ms"] = float(np.mean(embed_latencies) * 1000)
+    summary["search_mean_ms"] = float((np.mean(latencies) - np.mean(embed_latencies)) * 1000)
+    summary["qps"] = len(latencies) / sum(latencies)
+    summary["batch_qps"] = len(queries) / batch_seconds
+    summary["index_memory_mb"] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    summary[f"recall@{k}"] = recall / len(truth)
+    return summary
+
+
+def compare_results(baseline, current, k):
+    """
+    이전 결과 파일과 설정별로 비교한 변화율을 출력
+
+    Args:
+        baseline (dict): 이전 벤치마크 결과
+        current (dict): 현재 벤치마크 결과
+        k (int): recall 기준 문서 수
+    """
+    previous = {result["setting"]: result for result in baseline["results"]}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        before = previous.get(result["setting"])
+        if before is None:
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "search_mean_ms", "qps", f"recall@{k}"):
+            if before.get(key):
+                changes.append(f"{key} {(result[key] - before[key]) / before[key]:+.1%}")
+        print(f"  {result['setting']:<15} " + ", ".join(changes))
+
+
+def run_benchmark(data, queries, work_dir, settings=DEFAULT_SETTINGS, k=5, model_name="jhgan/ko-sroberta-multitask",
+                  device="cpu", embedding_cache_dir=None):
+    """
+    코퍼스로 설정별 인덱스를 만들고 같은 질의 집합을 다시 실행하여 결과를 비교
+
+    Args:
+        data (list): 법률안 레코드 리스트
+        queries (list): 질의 리스트
+        work_dir (str): 인덱스를 만들 디렉터리
+        settings (list): 측정할 설정 (chroma, chroma_sharded, flat, flat_int8, flat_binary, cached)
+        k (int): 질의마다 검색할 문서 수
+        model_name (str): HuggingFace Embedding 모델명
+        device (str): "cpu" 또는 "cuda"
+        embedding_cache_dir (str, optional): 임베딩 캐시 디렉터리 (반복 실행 시 코퍼스 임베딩 재사용)
+
+    Returns:
+        dict: 실행 정보와 설정별 결과
+    """
+    embeddings = HuggingFaceEmbeddings(model_name=model_name, model_kwargs={"device": device})
+    corpus_embeddings = embeddings
+    if embedding_cache_dir:
+        corpus_embeddings = CachedEmbeddings(embeddings, EmbeddingCache(embedding_cache_dir, model_name))
+
+    print(f"Embedding {len(data)} documents and {len(queries)} queries...")
+    ids, documents, metadatas = prepare_documents(data)
+    vectors = np.asarray(corpus_embeddings.embed_documents(documents), dtype=np.float32)
+    query_vectors = embeddings.embed_documents(queries)
+    truth = [set(top) for top in exact_top_k(query_vectors, vectors, ids, k)]
+
+    print("Building indexes...")
+    targets = build_indexes(work_dir, settings, model_name, embeddings, ids, documents, metadatas, vectors)
+
+    results = []
+    for setting in settings:
+        # cached 외의 설정은 질의 임베딩 캐시 없이 매번 질의를 임베딩 (cold)
+        query_cache_size = len(queries) if setting == "cached" else 0
+        retriever = Retriever(model_name=model_name, device=device, embeddings=embeddings,
+                              query_cache_size=query_cache_size, **targets[setting])
+        result = benchmark_setting(setting, retriever, queries, truth, k)
+        print(f"{setting:<15} p50 {result['p50_ms']:.2f}ms  p95 {result['p95_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms  "
+              f"(embed {result['embed_mean_ms']:.2f}ms + search {result['search_mean_ms']:.2f}ms)  "
+              f"{result['qps']:.1f} q/s (batch {result['batch_qps']:.1f} q/s)  recall@{k} {result[f'recall@{k}']:.3f}")
+        results.append(result)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": model_name,
+        "device": device,
+        "num_documents": len(data),
+        "num_queries": len(queries),
+        "k": k,
+        "results": results
+    }
+
+
+def main(output_file, input_file=None, synthetic=10000, sample=None, query_file=None, num_queries=200, k=5,
+         settings=DEFAULT_SETTINGS, work_dir=None, embedding_cache_dir=None, compare=None, seed=0):
+    """
+    Args:
+        output_file (str): 결과 JSON 저장 경로
+        input_file (str, optional): 전처리된 데이터 파일 (없으면 합성 코퍼스 사용)
+        synthetic (int): 합성 코퍼스의 법률안 수
+        sample (int, optional): input_file에서 무작위로 사용할 법률안 수
+        query_file (str, optional): 한 줄에 하나의 질의가 적힌 파일 (없으면 코퍼스에서 질의 생성)
+        num_queries (int): 코퍼스에서 생성할 질의 수
+        k (int): 질의마다 검색할 문서 수
+        settings (list): 측정할 설정
+        work_dir (str, optional): 인덱스를 만들 디렉터리 (기본값: 임시 디렉터리)
+        embedding_cache_dir (str, optional): 임베딩 캐시 디렉터리
+        compare (str, optional): 비교할 이전 결과 JSON 경로
+        seed (int): 샘플링 시드
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    if input_file:
+        data = load_data(input_file)
+        if sample and sample < len(data):
+            data = random.Random(seed).sample(data, sample)
+    else:
+        data = synthetic_corpus(synthetic, seed)
+    if query_file:
+        queries = read_query_file(query_file)
+    else:
+        queries = sample_queries([item.get("paragraph", "") for item in data], num_queries, seed)
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="retrieval_benchmark_")
+    print(f"Benchmark indexes: {work_dir}")
+    report = run_benchmark(data, queries, work_dir, settings=settings, k=k, device=device,
+                           embedding_cache_dir=embedding_cache_dir)
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Benchmark results saved to {output_file}")
+
+    if compare:
+        with open(compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), report, k)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="검색 백엔드별 지연 시간, 처리량, 메모리, recall@k 벤치마크")
+    parser.add_argument('--output_file', type=str, required=True, help='결과 JSON 저장 경로')
+    parser.add_argument('--input_file', type=str, default=None, help='전처리된 데이터 파일 (없으면 합성 코퍼스 사용)')
+    parser.add_argument('--synthetic', type=int, default=10000, help='합성 코퍼스의 법률안 수 (기본값: 10000)')
+    parser.add_argument('--sample', type=int, default=None, help='input_file에서 무작위로 사용할 법률안 수')
+    parser.add_argument('--query_file', type=str, default=None, help='한 줄에 하나의 질의가 적힌 파일 (없으면 코퍼스에서 생성)')
+    parser.add_argument('--num_queries', type=int, default=200, help='코퍼스에서 생성할 질의 수 (기본값: 200)')
+    parser.add_argument('--k', type=int, default=5, help='질의마다 검색할 문서 수 (기본값: 5)')
+    parser.add_argument('--settings', type=str, nargs='+', choices=DEFAULT_SETTINGS, default=DEFAULT_SETTINGS,
+                        help='측정할 설정 (기본값: 전체)')
+    parser.add_argument('--work_dir', type=str, default=None, help='인덱스를 만들 디렉터리 (기본값: 임시 디렉터리)')
+    parser.add_argument('--embedding_cache', type=str, default=None, help='임베딩 캐시 디렉터리 (반복 실행 시 재사용)')
+    parser.add_argument('--compare', type=str, default=None, help='비교할 이전 결과 JSON (설정별 변화율 출력)')
+    parser.add_argument('--seed', type=int, default=0, help='샘플링 시드 (기본값: 0)')
+
+    args = parser.parse_args()
+
+    main(
+        output_file=args.output_file,
+        input_file=args.input_file,
+        synthetic=args.synthetic,
+        sample=args.sample,
+        query_file=args.query_file,
+        num_queries=args.num_queries,
+        k=args.k,
+        settings=args.settings,
+        work_dir=args.work_dir,
+        embedding_cache_dir=args.embedding_cache,
+        compare=args.compare,
+        seed=args.seed
+    )
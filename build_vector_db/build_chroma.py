@@ -1,25 +1,351 @@
 import os
+import re
+import sys
 import json
+import hashlib
 import argparse
 import torch
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import Chroma
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from embedding_pipeline import run_embedding_pipeline
+from doc_store import DocStore, default_doc_store_path, lean_metadata, load_index_info, save_index_info, resolve_doc_store_path
+from flat_index import FlatIndex, write_flat_index, default_flat_index_path, evaluate_quantization
+from shards import SHARD_KEYS, group_by_shard, load_shard_manifest, save_shard_manifest, shard_manifest_path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "preprocess"))
+from artifact_io import load_records
 
 
 def load_data(input_file):
     """
     Args:
-        input_file (str): JSON 파일 경로
+        input_file (str): 전처리된 데이터 파일 경로 (.json, .jsonl, .parquet)
         
     Returns:
-        list: JSON 데이터의 리스트
+        list: 레코드 리스트
+    """
+    return load_records(input_file)
+
+
+def assign_doc_ids(data):
+    """
+    법안 id를 기준으로 문서별 고정 id를 부여 (같은 id가 여러 번 나오면 순번을 붙임)
+
+    Args:
+        data (list): 데이터 리스트
+
+    Returns:
+        list: 데이터와 같은 순서의 문서 id 리스트
+    """
+    doc_ids = []
+    seen = {}
+    for item in data:
+        base_id = str(item.get("id") or "")
+        if not base_id:
+            # id가 없는 법안은 제목과 게시일로 id를 만듦
+            key = f"{item.get('title', '')}|{item.get('date', '')}"
+            base_id = "bill-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        seen[base_id] = seen.get(base_id, 0) + 1
+        doc_ids.append(base_id if seen[base_id] == 1 else f"{base_id}#{seen[base_id]}")
+    return doc_ids
+
+
+def date_to_int(date):
+    """
+    Args:
+        date (str): 보고서 게시일 (예: '2020-05-29', '2020.5.29', '2020년 5월 29일')
+
+    Returns:
+        int: YYYYMMDD 형식의 정수 (날짜를 읽을 수 없으면 0), 기간 필터링에 사용
     """
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data
+    match = re.search(r"(\d{4})\D+(\d{1,2})\D+(\d{1,2})", str(date or ""))
+    if not match:
+        return 0
+    year, month, day = (int(value) for value in match.groups())
+    return year * 10000 + month * 100 + day
 
 
-def build_vector_db(data, embeddings_model_name, chroma_path, device="cpu"):
+def build_metadata(item, doc_id):
+    """
+    Args:
+        item (dict): 단일 데이터
+        doc_id (str): 문서 id
+
+    Returns:
+        dict: Chroma에 저장할 메타데이터
+    """
+    return {
+        "doc_id": doc_id,
+        "title": item.get("title", ""),
+        "session": item.get("session", ""),
+        "committee": item.get("committee", ""),
+        "field": item.get("field", ""),
+        "terminology": item.get("terminology", ""),
+        "disposal": item.get("disposal", ""),
+        "enactment": item.get("enactment", ""),
+        "amendment": item.get("amendment", ""),
+        "date": item.get("date", ""),
+        "date_int": date_to_int(item.get("date", "")),
+        "terminology_en": item.get("terminology_en", ""),
+        "paragraph": item.get("paragraph", ""),
+        # dedup_bills.py로 합친 거의 같은 법률안 (Chroma 메타데이터는 리스트를 저장할 수 없어 문자열로 저장)
+        "duplicate_ids": ", ".join(str(bill_id) for bill_id in item.get("duplicate_ids") or []),
+        "duplicate_count": int(item.get("duplicate_count") or 0)
+    }
+
+
+def content_hash(document, metadata):
+    """
+    Args:
+        document (str): 문서 본문
+        metadata (dict): 메타데이터 (content_hash 키 제외)
+
+    Returns:
+        str: 본문과 메타데이터의 SHA-256 해시
+    """
+    payload = json.dumps([document, metadata], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prepare_documents(data):
+    """
+    Args:
+        data (list): 데이터 리스트
+
+    Returns:
+        tuple: (문서 id 리스트, 문서 리스트, 메타데이터 리스트)
+    """
+    ids = assign_doc_ids(data)
+    documents = []
+    metadatas = []
+    for item, doc_id in zip(data, ids):
+        document = item.get("paragraph", "")  # 'paragraph' 필드를 문서로 사용
+        metadata = build_metadata(item, doc_id)
+        metadata["content_hash"] = content_hash(document, metadata)
+        documents.append(document)
+        metadatas.append(metadata)
+    return ids, documents, metadatas
+
+
+def apply_upsert_deletions(db, ids, metadatas, force=False):
+    """
+    기존 Chroma DB와 내용 해시를 비교하여 사라진 문서와 바뀐 문서를 삭제하고,
+    새로 임베딩해야 하는 문서의 인덱스를 반환
+
+    Args:
+        db (Chroma): 기존 Chroma DB
+        ids (list): 문서 id 리스트
+        metadatas (list): 메타데이터 리스트 (content_hash 포함)
+        force (bool): True이면 내용이 같은 문서도 다시 기록 (lean 여부가 바뀌어 저장 형식이 달라진 경우)
+
+    Returns:
+        tuple: (추가해야 하는 문서의 인덱스 리스트, 입력에서 사라져 삭제된 문서 id 리스트)
+    """
+    existing = db.get(include=["metadatas"])
+    existing_hashes = {
+        doc_id: (metadata or {}).get("content_hash")
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+
+    new_ids = set(ids)
+    changed = [i for i, doc_id in enumerate(ids) if force or existing_hashes.get(doc_id) != metadatas[i]["content_hash"]]
+    stale_ids = [doc_id for doc_id in existing_hashes if doc_id not in new_ids]
+    replaced_ids = [ids[i] for i in changed if ids[i] in existing_hashes]
+    print(f"Upsert: {len(changed) - len(replaced_ids)} new, {len(replaced_ids)} changed, "
+          f"{len(stale_ids)} removed, {len(ids) - len(changed)} unchanged")
+
+    if stale_ids or replaced_ids:
+        db._collection.delete(ids=stale_ids + replaced_ids)
+    return changed, stale_ids
+
+
+def add_texts_in_batches(db, ids, documents, metadatas, batch_size=1000):
+    """
+    Args:
+        db (Chroma): 문서를 추가할 Chroma DB
+        ids (list): 문서 id 리스트
+        documents (list): 문서 리스트
+        metadatas (list): 메타데이터 리스트
+        batch_size (int): 한 번에 추가할 문서 수
+    """
+    for start in range(0, len(ids), batch_size):
+        db.add_texts(
+            texts=documents[start:start + batch_size],
+            metadatas=metadatas[start:start + batch_size],
+            ids=ids[start:start + batch_size]
+        )
+
+
+def add_lean_documents(db, embeddings, ids, documents, metadatas, batch_size=1000):
+    """
+    본문으로 임베딩을 계산하되 Chroma에는 본문 없이 임베딩과 lean 메타데이터만 저장
+
+    Args:
+        db (Chroma): 문서를 추가할 Chroma DB
+        embeddings: 임베딩 모델
+        ids (list): 문서 id 리스트
+        documents (list): 임베딩할 문서 리스트
+        metadatas (list): lean 메타데이터 리스트
+        batch_size (int): 한 번에 추가할 문서 수
+    """
+    for start in range(0, len(ids), batch_size):
+        batch_ids = ids[start:start + batch_size]
+        db._collection.add(
+            ids=batch_ids,
+            embeddings=embeddings.embed_documents(documents[start:start + batch_size]),
+            metadatas=metadatas[start:start + batch_size],
+            documents=[""] * len(batch_ids)
+        )
+
+
+def export_flat_index(db, flat_index_path, ids, documents, metadatas, model_name, quantization=None, batch_size=5000):
+    """
+    Chroma DB에 저장된 임베딩을 다시 계산하지 않고 읽어 flat 인덱스로 저장
+    양자화하면 float32 전수 비교 대비 메모리 절감량과 recall@k를 출력
+
+    Args:
+        db (Chroma): 구축이 끝난 Chroma DB
+        flat_index_path (str): flat 인덱스 디렉터리
+        ids (list): 문서 id 리스트
+        documents (list): 문서 본문 리스트
+        metadatas (list): 전체 메타데이터 리스트
+        model_name (str): 임베딩 모델 이름
+        quantization (str, optional): 1차 검색용 양자화 코드 ("int8" 또는 "binary")
+        batch_size (int): 한 번에 읽을 임베딩 수
+    """
+    vectors_by_id = {}
+    for start in range(0, len(ids), batch_size):
+        batch = db._collection.get(ids=ids[start:start + batch_size], include=["embeddings"])
+        vectors_by_id.update(zip(batch["ids"], batch["embeddings"]))
+    missing = [doc_id for doc_id in ids if doc_id not in vectors_by_id]
+    if missing:
+        raise ValueError(f"{len(missing)} documents are missing from Chroma DB (e.g. {missing[0]})")
+    vectors = [vectors_by_id[doc_id] for doc_id in ids]
+    write_flat_index(flat_index_path, ids, documents, metadatas, vectors, model_name, quantization=quantization)
+
+    if quantization:
+        index = FlatIndex(flat_index_path)
+        report = evaluate_quantization(index, vectors)
+        index.close()
+        print(f"Quantization ({quantization}): resident vectors {report['codes_mb']:.1f} MB "
+              f"vs float32 {report['float32_mb']:.1f} MB ({1 - report['codes_mb'] / report['float32_mb']:.1%} saved), "
+              f"float16 rescoring matrix {report['float16_mb']:.1f} MB on disk")
+        print(f"Recall@{report['k']} vs float32: first pass {report['recall_first_pass']:.3f}, "
+              f"rescored {report['recall_rescored']:.3f}")
+
+
+def index_collection(db, ids, documents, metadatas, index_metadatas, embeddings, hf_embeddings, cache=None, upsert=False,
+                     pipeline=False, batch_size=64, num_processes=0, lean=False, doc_store_path=None, force=False):
+    """
+    하나의 Chroma 컬렉션에 문서를 추가 (upsert이면 바뀐 문서만 반영)
+
+    Args:
+        db (Chroma): 문서를 추가할 Chroma DB (컬렉션)
+        ids (list): 문서 id 리스트
+        documents (list): 문서 리스트
+        metadatas (list): 전체 메타데이터 리스트
+        index_metadatas (list): Chroma에 저장할 메타데이터 리스트 (lean이면 필터링 필드만)
+        embeddings: 임베딩 모델 (캐시 래퍼 포함)
+        hf_embeddings (HuggingFaceEmbeddings): 파이프라인에서 사용할 원래 임베딩 모델
+        cache (EmbeddingCache, optional): 임베딩 캐시
+        upsert (bool): 기존 컬렉션과 비교해 바뀐 문서만 반영할지 여부
+        pipeline (bool): 임베딩 파이프라인 사용 여부
+        batch_size (int): 파이프라인의 배치당 문서 수
+        num_processes (int): 파이프라인 임베딩에 사용할 CPU 프로세스 수
+        lean (bool): lean 인덱스 모드 사용 여부
+        doc_store_path (str, optional): lean 모드의 문서 저장소 경로
+        force (bool): 기존 컬렉션의 문서를 내용과 관계없이 모두 다시 기록 (lean 여부가 바뀐 경우)
+    """
+    if upsert or force:
+        print("Upserting into existing Chroma collection..." if not force else
+              "Index mode changed (lean/full), rewriting all documents...")
+        selected, removed_ids = apply_upsert_deletions(db, ids, index_metadatas, force=force)
+    else:
+        print("Building Chroma collection...")
+        selected, removed_ids = list(range(len(ids))), []
+
+    selected_ids = [ids[i] for i in selected]
+    selected_documents = [documents[i] for i in selected]
+    selected_metadatas = [index_metadatas[i] for i in selected]
+    if lean:
+        doc_store = DocStore(doc_store_path)
+        doc_store.delete(removed_ids)
+        doc_store.put_many(selected_ids, selected_documents, [metadatas[i] for i in selected])
+        doc_store.close()
+        print(f"Lean index: full documents stored in {doc_store.db_path}")
+
+    if pipeline:
+        run_embedding_pipeline(
+            selected_ids,
+            selected_documents,
+            selected_metadatas,
+            sentence_model=hf_embeddings.client,
+            collection=db._collection,
+            batch_size=batch_size,
+            num_processes=num_processes,
+            cache=cache,
+            store_documents=not lean
+        )
+    elif lean:
+        add_lean_documents(db, embeddings, selected_ids, selected_documents, selected_metadatas)
+    else:
+        add_texts_in_batches(db, selected_ids, selected_documents, selected_metadatas)
+
+
+def build_shards(chroma_path, shard_by, ids, documents, metadatas, index_metadatas, embeddings, hf_embeddings, cache=None,
+                 upsert=False, pipeline=False, batch_size=64, num_processes=0, lean=False, doc_store_path=None, force=False):
+    """
+    샤드 필드 값마다 별도의 Chroma 컬렉션을 만들고 manifest에 기록
+    입력에 없는 기존 샤드는 그대로 두므로 새 회기만 구축해 붙일 수 있음
+
+    Args:
+        chroma_path (str): Chroma DB 저장 디렉터리 경로
+        shard_by (list): 샤드를 나눌 필드 (session, committee)
+        나머지 인자는 index_collection과 같음
+    """
+    manifest = load_shard_manifest(chroma_path) or {"shard_by": list(shard_by), "shards": {}}
+    if manifest["shard_by"] != list(shard_by):
+        raise ValueError(f"Existing shards are split by {manifest['shard_by']}, not {list(shard_by)}")
+    groups = group_by_shard(metadatas, shard_by)
+    if force and set(manifest["shards"]) - set(groups):
+        # 입력에 없는 샤드는 다시 기록할 수 없으므로 lean 여부가 섞이지 않도록 중단
+        raise ValueError("Switching lean mode requires rebuilding every existing shard (or a new chroma_path)")
+
+    for name, (values, indices) in sorted(groups.items()):
+        print(f"Shard {name} {values}: {len(indices)} docs")
+        db = Chroma(persist_directory=chroma_path, embedding_function=embeddings, collection_name=name)
+        if not upsert and name in manifest["shards"]:
+            # 다시 구축하는 샤드는 기존 컬렉션을 비우고 새로 만듦
+            db.delete_collection()
+            db = Chroma(persist_directory=chroma_path, embedding_function=embeddings, collection_name=name)
+        index_collection(
+            db,
+            [ids[i] for i in indices],
+            [documents[i] for i in indices],
+            [metadatas[i] for i in indices],
+            [index_metadatas[i] for i in indices],
+            embeddings,
+            hf_embeddings,
+            cache=cache,
+            upsert=upsert,
+            pipeline=pipeline,
+            batch_size=batch_size,
+            num_processes=num_processes,
+            lean=lean,
+            doc_store_path=doc_store_path,
+            force=force
+        )
+        db.persist()
+        manifest["shards"][name] = {"values": values, "count": len(indices)}
+        # 샤드 하나가 끝날 때마다 기록하여 중간에 멈춰도 완성된 샤드는 검색에 사용
+        save_shard_manifest(chroma_path, manifest)
+    print(f"Shards: {len(manifest['shards'])} collections listed in {shard_manifest_path(chroma_path)}")
+
+
+def build_vector_db(data, embeddings_model_name, chroma_path, device="cpu", upsert=False, embedding_cache_dir=None,
+                    pipeline=False, batch_size=64, num_processes=0, lean=False, doc_store_path=None,
+                    flat_index=False, flat_index_path=None, quantization=None, shard_by=None):
     """
     문서와 메타데이터로 Chroma 벡터 DB를 구축
     
@@ -28,54 +354,107 @@ def build_vector_db(data, embeddings_model_name, chroma_path, device="cpu"):
         embeddings_model_name (str): HuggingFace Embedding 모델명
         chroma_path (str): Chroma DB 저장 디렉터리 경로
         device (str): "cpu" 또는 "cuda"
+        upsert (bool): True이면 기존 DB에 바뀐 문서만 반영
+        embedding_cache_dir (str, optional): 임베딩 캐시 디렉터리 (있으면 캐시에 없는 문서만 임베딩)
+        pipeline (bool): True이면 토크나이즈/임베딩/삽입 단계를 파이프라인으로 동시에 실행
+        batch_size (int): 파이프라인의 배치당 문서 수
+        num_processes (int): 파이프라인 임베딩에 사용할 CPU 프로세스 수 (0이면 현재 프로세스)
+        lean (bool): True이면 Chroma에는 필터링 필드만 저장하고 본문과 전체 메타데이터는 문서 저장소에 저장
+        doc_store_path (str, optional): lean 모드의 문서 저장소 경로 (기본값: chroma_path/doc_store.sqlite)
+        flat_index (bool): True이면 Chroma DB와 함께 전수 비교 검색용 flat 인덱스도 저장
+        flat_index_path (str, optional): flat 인덱스 경로 (기본값: chroma_path/flat_index)
+        quantization (str, optional): flat 인덱스의 1차 검색용 양자화 코드 ("int8" 또는 "binary")
+        shard_by (list, optional): 샤드를 나눌 필드 (session, committee), 값마다 별도 컬렉션에 저장
     """
+    if shard_by and flat_index:
+        raise ValueError("Flat index export is not supported for sharded builds")
+
     # HuggingFace Embeddings 모델 초기화
     print("Initializing embedding model...")
-    embeddings = HuggingFaceEmbeddings(
+    hf_embeddings = HuggingFaceEmbeddings(
         model_name=embeddings_model_name,
         model_kwargs={"device": device}
     )
+    embeddings = hf_embeddings
+    cache = None
+    if embedding_cache_dir:
+        cache = EmbeddingCache(embedding_cache_dir, embeddings_model_name)
+        embeddings = CachedEmbeddings(hf_embeddings, cache)
+
+    # 이전 구축의 lean 여부 (기록이 없는 예전 인덱스는 문서 저장소가 있으면 lean으로 간주)
+    doc_store_path = doc_store_path or default_doc_store_path(chroma_path)
+    previous_info = load_index_info(chroma_path)
+    if previous_info is None and os.path.exists(default_doc_store_path(chroma_path)):
+        previous_info = {"lean": True, "doc_store_path": None}
+    # lean 여부가 바뀌면 Chroma에 저장된 문서 형식이 달라지므로 내용이 같은 문서도 다시 기록
+    force = previous_info is not None and previous_info["lean"] != lean and os.path.isdir(chroma_path)
 
     # 데이터 준비
     print("Preparing documents and metadata for Chroma DB...")
-    documents = []
-    metadatas = []
+    ids, documents, metadatas = prepare_documents(data)
+    index_metadatas = [lean_metadata(metadata) for metadata in metadatas] if lean else metadatas
 
-    for item in data:
-        documents.append(item.get("paragraph", ""))  # 'paragraph' 필드를 문서로 사용
-        metadatas.append({
-            "title": item.get("title", ""),
-            "session": item.get("session", ""),
-            "committee": item.get("committee", ""),
-            "field": item.get("field", ""),
-            "terminology": item.get("terminology", ""),
-            "disposal": item.get("disposal", ""),
-            "enactment": item.get("enactment", ""),
-            "amendment": item.get("amendment", ""),
-            "date": item.get("date", ""),
-            "terminology_en": item.get("terminology_en", ""),
-            "paragraph": item.get("paragraph", "")
-        })
-
-    # Chroma DB 구축
-    print("Building Chroma Vector DB...")
-    db = Chroma.from_texts(
-        texts=documents,
-        embedding=embeddings,
-        metadatas=metadatas,
-        persist_directory=chroma_path
-    )
+    if shard_by:
+        build_shards(chroma_path, shard_by, ids, documents, metadatas, index_metadatas, embeddings, hf_embeddings,
+                     cache=cache, upsert=upsert, pipeline=pipeline, batch_size=batch_size, num_processes=num_processes,
+                     lean=lean, doc_store_path=doc_store_path, force=force)
+        db = None
+    else:
+        db = Chroma(persist_directory=chroma_path, embedding_function=embeddings)
+        if not upsert and db._collection.count():
+            # 고정 id로 저장하므로 다시 구축할 때는 기존 컬렉션을 비움
+            # (그대로 두면 같은 id의 예전 벡터와 입력에서 사라진 문서가 남음)
+            print("Rebuilding: clearing the existing Chroma collection...")
+            db.delete_collection()
+            db = Chroma(persist_directory=chroma_path, embedding_function=embeddings)
+            force = False
+            if lean and os.path.isfile(doc_store_path):
+                os.remove(doc_store_path)
+        index_collection(db, ids, documents, metadatas, index_metadatas, embeddings, hf_embeddings, cache=cache,
+                         upsert=upsert, pipeline=pipeline, batch_size=batch_size, num_processes=num_processes,
+                         lean=lean, doc_store_path=doc_store_path, force=force)
+
+    # Chroma DB 저장 (샤드는 build_shards에서 샤드마다 저장)
+    if db is not None:
+        db.persist()
 
-    # Chroma DB 저장
-    db.persist()
+    # 검색기는 문서 저장소 파일이 있는지가 아니라 이 기록으로 lean 여부를 판단
+    save_index_info(chroma_path, lean, doc_store_path if lean else None)
+    if not lean:
+        # lean이 아닌 인덱스에 남은 이전 문서 저장소는 오래된 내용이므로 삭제
+        for stale_path in {default_doc_store_path(chroma_path), resolve_doc_store_path(chroma_path, previous_info)}:
+            if stale_path and os.path.isfile(stale_path):
+                os.remove(stale_path)
+                print(f"Removed stale document store: {stale_path}")
+    if flat_index:
+        print("Exporting flat index...")
+        export_flat_index(db, flat_index_path or default_flat_index_path(chroma_path), ids, documents, metadatas,
+                          embeddings_model_name, quantization=quantization)
+    if cache:
+        stats = cache.stats()
+        print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+        cache.close()
     print(f"Chroma DB 구축 완료, 위치: {chroma_path}")
 
 
-def main(input_file, chroma_path):
+def main(input_file, chroma_path, upsert=False, embedding_cache_dir=None, pipeline=False, batch_size=64,
+         num_processes=0, lean=False, doc_store_path=None, flat_index=False, flat_index_path=None, quantization=None,
+         shard_by=None):
     """
     Args:
-        input_file (str): 최종 전처리된 JSON 파일 경로
+        input_file (str): 최종 전처리된 데이터 파일 경로
         chroma_path (str): 벡터 DB 저장 디렉터리 경로
+        upsert (bool): 기존 DB에 바뀐 문서만 반영할지 여부
+        embedding_cache_dir (str, optional): 임베딩 캐시 디렉터리
+        pipeline (bool): 임베딩 파이프라인 사용 여부
+        batch_size (int): 파이프라인의 배치당 문서 수
+        num_processes (int): 파이프라인 임베딩에 사용할 CPU 프로세스 수
+        lean (bool): lean 인덱스 모드 사용 여부
+        doc_store_path (str, optional): lean 모드의 문서 저장소 경로
+        flat_index (bool): flat 인덱스도 함께 저장할지 여부
+        flat_index_path (str, optional): flat 인덱스 경로
+        quantization (str, optional): flat 인덱스의 양자화 코드 종류
+        shard_by (list, optional): 샤드를 나눌 필드
     """
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Using device: {device}")
@@ -87,17 +466,45 @@ def main(input_file, chroma_path):
     data = load_data(input_file)
     
     #벡터 DB 구축
-    build_vector_db(data, embeddings_model_name, chroma_path, device)
+    build_vector_db(data, embeddings_model_name, chroma_path, device, upsert=upsert,
+                    embedding_cache_dir=embedding_cache_dir, pipeline=pipeline, batch_size=batch_size,
+                    num_processes=num_processes, lean=lean, doc_store_path=doc_store_path,
+                    flat_index=flat_index, flat_index_path=flat_index_path, quantization=quantization,
+                    shard_by=shard_by)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Chroma Vector DB 구축 스크립트")
-    parser.add_argument('--input_file', type=str, required=True, help='최종 전처리된 JSON 파일 경로')
+    parser.add_argument('--input_file', type=str, required=True, help='최종 전처리된 데이터 파일 경로 (.json/.jsonl/.parquet)')
     parser.add_argument('--chroma_path', type=str, required=True, help='Chroma DB 저장 경로')
+    parser.add_argument('--upsert', action='store_true', help='기존 DB와 비교해 추가/변경/삭제된 문서만 반영')
+    parser.add_argument('--embedding_cache', type=str, default=None, help='임베딩 캐시 디렉터리 (모델과 텍스트 해시로 재사용)')
+    parser.add_argument('--pipeline', action='store_true', help='토크나이즈/임베딩/삽입 단계를 파이프라인으로 실행하고 단계별 처리량 출력')
+    parser.add_argument('--batch_size', type=int, default=64, help='파이프라인의 배치당 문서 수 (기본값: 64)')
+    parser.add_argument('--lean', action='store_true', help='Chroma에는 필터링 필드만 저장하고 본문과 전체 메타데이터는 문서 저장소에 저장')
+    parser.add_argument('--doc_store_path', type=str, default=None, help='lean 모드의 문서 저장소 경로 (기본값: <chroma_path>/doc_store.sqlite)')
+    parser.add_argument('--num_processes', type=int, default=0, help='파이프라인 임베딩에 사용할 CPU 프로세스 수 (기본값: 0, 현재 프로세스)')
+    parser.add_argument('--flat_index', action='store_true', help='Chroma DB와 함께 float16 임베딩 행렬의 flat 인덱스 저장 (검색 백엔드 flat)')
+    parser.add_argument('--flat_index_path', type=str, default=None, help='flat 인덱스 경로 (기본값: <chroma_path>/flat_index)')
+    parser.add_argument('--quantize', type=str, choices=['int8', 'binary'], default=None,
+                        help='flat 인덱스에 1차 검색용 양자화 코드를 저장하고 float16 벡터로 재계산 (메모리 절감량과 recall@k 출력)')
+    parser.add_argument('--shard_by', type=str, nargs='+', choices=list(SHARD_KEYS), default=None,
+                        help='회기(session)와/또는 위원회(committee)별로 별도 컬렉션에 저장하고 manifest 기록 (입력에 없는 샤드는 유지)')
 
     args = parser.parse_args()
     
     main(
         input_file=args.input_file, 
-        chroma_path=args.chroma_path
+        chroma_path=args.chroma_path,
+        upsert=args.upsert,
+        embedding_cache_dir=args.embedding_cache,
+        pipeline=args.pipeline,
+        batch_size=args.batch_size,
+        num_processes=args.num_processes,
+        lean=args.lean,
+        doc_store_path=args.doc_store_path,
+        flat_index=args.flat_index or args.flat_index_path is not None or args.quantize is not None,
+        flat_index_path=args.flat_index_path,
+        quantization=args.quantize,
+        shard_by=args.shard_by
     )
\ No newline at end of file
@@ -0,0 +1,180 @@
+import os
+import json
+import sqlite3
+import threading
+
+
+# lean 인덱스에서 Chroma 메타데이터로 남기는 필드 (필터링 용도)
+LEAN_METADATA_FIELDS = ["doc_id", "session", "committee", "field", "date", "date_int", "content_hash"]
+
+DOC_STORE_FILENAME = "doc_store.sqlite"
+
+# Chroma DB 디렉터리에 lean 여부와 문서 저장소 위치를 기록하는 파일
+INDEX_INFO_FILENAME = "index_info.json"
+
+
+def default_doc_store_path(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        str: Chroma DB 디렉터리 안의 문서 저장소 경로
+    """
+    return os.path.join(chroma_path, DOC_STORE_FILENAME)
+
+
+def index_info_path(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        str: Chroma DB 디렉터리 안의 인덱스 정보 파일 경로
+    """
+    return os.path.join(chroma_path, INDEX_INFO_FILENAME)
+
+
+def load_index_info(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        dict: {"lean": bool, "doc_store_path": str 또는 None} (기록이 없으면 None)
+    """
+    path = index_info_path(chroma_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_index_info(chroma_path, lean, doc_store_path=None):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        lean (bool): lean 인덱스 여부
+        doc_store_path (str, optional): lean 인덱스의 문서 저장소 경로 (Chroma DB 디렉터리 기준 상대 경로로 기록)
+    """
+    info = {"lean": bool(lean), "doc_store_path": None}
+    if lean and doc_store_path:
+        info["doc_store_path"] = os.path.relpath(os.path.abspath(doc_store_path), os.path.abspath(chroma_path))
+    os.makedirs(chroma_path, exist_ok=True)
+    path = index_info_path(chroma_path)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def resolve_doc_store_path(chroma_path, info):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        info (dict): load_index_info의 인덱스 정보
+
+    Returns:
+        str: lean 인덱스의 문서 저장소 경로 (lean 인덱스가 아니면 None)
+    """
+    if not info or not info.get("lean"):
+        return None
+    if info.get("doc_store_path"):
+        return os.path.join(chroma_path, info["doc_store_path"])
+    return default_doc_store_path(chroma_path)
+
+
+def lean_metadata(metadata):
+    """
+    Args:
+        metadata (dict): 전체 메타데이터
+
+    Returns:
+        dict: 필터링에 필요한 필드만 남긴 메타데이터
+    """
+    return {field: metadata[field] for field in LEAN_METADATA_FIELDS if field in metadata}
+
+
+class DocStore:
+    """
+    문서 본문과 전체 메타데이터를 id로 조회하는 SQLite 문서 저장소
+    lean 인덱스에서는 Chroma에 필터링 필드만 두고, 무거운 텍스트는 이곳에서 필요한 문서만 읽음
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # 여러 Streamlit 세션이 공유하는 검색기에서 사용하므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, document TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def put_many(self, ids, documents, metadatas):
+        """
+        Args:
+            ids (list): 문서 id 리스트
+            documents (list): 문서 본문 리스트
+            metadatas (list): 전체 메타데이터 리스트
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO docs (doc_id, document, metadata) VALUES (?, ?, ?)",
+            [
+                (doc_id, document, json.dumps(metadata, ensure_ascii=False))
+                for doc_id, document, metadata in zip(ids, documents, metadatas)
+            ]
+        )
+        self.conn.commit()
+
+    def delete(self, ids):
+        """
+        Args:
+            ids (list): 삭제할 문서 id 리스트
+        """
+        self.conn.executemany("DELETE FROM docs WHERE doc_id = ?", [(doc_id,) for doc_id in ids])
+        self.conn.commit()
+
+    def get_many(self, ids):
+        """
+        Args:
+            ids (list): 조회할 문서 id 리스트
+
+        Returns:
+            dict: {문서 id: (문서 본문, 전체 메타데이터)}
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" * len(ids))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT doc_id, document, metadata FROM docs WHERE doc_id IN ({placeholders})", ids
+            ).fetchall()
+        return {doc_id: (document, json.loads(metadata)) for doc_id, document, metadata in rows}
+
+    def close(self):
+        self.conn.close()
+
+
+def hydrate_results(results, doc_store):
+    """
+    lean 인덱스 검색 결과의 본문과 메타데이터를 문서 저장소에서 채움
+
+    Args:
+        results (list): (Document, score) 형태의 검색 결과
+        doc_store (DocStore): 문서 저장소
+
+    Returns:
+        tuple: 검색된 문서의 컨텍스트와 가장 유사한 문서의 전체 메타데이터
+    """
+    ids = [doc.metadata.get("doc_id") for doc, _ in results]
+    records = doc_store.get_many(doc_id for doc_id in ids if doc_id)
+    context = " ".join(records[doc_id][0] for doc_id in ids if doc_id in records)
+    top_id = ids[0]
+    metadata = records[top_id][1] if top_id in records else results[0][0].metadata
+    return context, metadata
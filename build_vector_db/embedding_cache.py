@@ -0,0 +1,168 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+
+def normalize_text(text):
+    """
+    HuggingFaceEmbeddings.embed_documents와 같은 전처리 (줄바꿈을 공백으로 바꿈)
+    임베딩 파이프라인과 캐시 키가 모두 이 결과를 기준으로 하여 어느 경로로 임베딩해도 같은 벡터가 나옴
+
+    Args:
+        text (str): 원문 텍스트
+
+    Returns:
+        str: 임베딩할 텍스트
+    """
+    return text.replace("\n", " ")
+
+
+class EmbeddingCache:
+    """
+    (모델 이름, 텍스트 해시)를 키로 임베딩을 디스크에 저장하는 캐시
+    벡터는 모델별 float32 행렬 파일에 이어 붙여 memory-map으로 읽고,
+    텍스트 해시와 행 번호의 대응은 SQLite 인덱스에 저장
+    """
+
+    def __init__(self, cache_dir, model_name):
+        """
+        Args:
+            cache_dir (str): 캐시 루트 디렉터리
+            model_name (str): 임베딩 모델 이름 (모델마다 별도 디렉터리에 저장)
+        """
+        self.model_name = model_name
+        self.cache_dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        # 임베딩 파이프라인의 여러 스레드에서 함께 사용하므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS vectors (text_hash TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+        row = self.conn.execute("SELECT value FROM info WHERE key = 'dim'").fetchone()
+        self.dim = int(row[0]) if row else None
+        self.hits = 0
+        self.misses = 0
+        self._matrix = None
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _num_rows(self):
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _get_matrix(self, min_rows):
+        if self._matrix is None or self._matrix.shape[0] < min_rows:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._num_rows(), self.dim))
+        return self._matrix
+
+    def get_many(self, texts, chunk_size=500):
+        """
+        Args:
+            texts (list): 조회할 텍스트 리스트
+            chunk_size (int): 한 번의 쿼리로 조회할 해시 수
+
+        Returns:
+            list: 텍스트별 임베딩 (np.ndarray) 또는 캐시에 없으면 None
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        rows = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        results = [None] * len(texts)
+        with self._lock:
+            for i in range(0, len(unique_hashes), chunk_size):
+                chunk = unique_hashes[i:i + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                rows.update(self.conn.execute(f"SELECT text_hash, row FROM vectors WHERE text_hash IN ({placeholders})", chunk))
+
+            if rows:
+                matrix = self._get_matrix(max(rows.values()) + 1)
+                for i, text_hash in enumerate(hashes):
+                    if text_hash in rows:
+                        results[i] = np.array(matrix[rows[text_hash]])
+            found = sum(1 for vector in results if vector is not None)
+            self.hits += found
+            self.misses += len(texts) - found
+        return results
+
+    def put_many(self, texts, vectors):
+        """
+        Args:
+            texts (list): 텍스트 리스트
+            vectors (list): 텍스트별 임베딩
+        """
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._append(texts, vectors)
+
+    def _append(self, texts, vectors):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('dim', ?)", (str(self.dim),))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self.dim}")
+
+        # 벡터를 먼저 기록한 뒤 인덱스를 커밋하여, 중단되더라도 인덱스가 없는 행만 남도록 함
+        # 기록 도중 중단되어 남은 불완전한 마지막 행은 잘라내어 새 행이 행 번호와 어긋나지 않게 함
+        start_row = self._num_rows()
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(start_row * self.dim * 4)
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO vectors (text_hash, row) VALUES (?, ?)",
+            [(self.text_hash(text), start_row + i) for i, text in enumerate(texts)]
+        )
+        self.conn.commit()
+
+    def stats(self):
+        """
+        Returns:
+            dict: 캐시 적중 수, 미적중 수, 적중률
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    EmbeddingCache를 먼저 조회하고, 캐시에 없는 텍스트만 원래 임베딩 모델로 계산하는 Embeddings 래퍼
+    """
+
+    def __init__(self, embeddings, cache):
+        """
+        Args:
+            embeddings: 실제 임베딩 모델 (langchain Embeddings)
+            cache (EmbeddingCache): 임베딩 캐시
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        texts = [normalize_text(text) for text in texts]
+        cached = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if missing:
+            computed = self.embeddings.embed_documents(missing)
+            self.cache.put_many(missing, computed)
+            computed_by_text = dict(zip(missing, computed))
+            cached = [computed_by_text[text] if vector is None else vector for text, vector in zip(texts, cached)]
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in cached]
+
+    def embed_query(self, text):
+        # 질의는 문서 캐시에 저장하지 않음 (문서 임베딩만 재사용 대상)
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,156 @@
+import time
+import queue
+import threading
+import numpy as np
+import torch
+from embedding_cache import normalize_text
+
+
+# 파이프라인 단계 사이에서 입력이 끝났음을 알리는 표시
+_DONE = object()
+
+
+class StageStats:
+    """
+    파이프라인 단계별 처리 문서 수와 작업 시간
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.docs = 0
+        self.busy_seconds = 0.0
+
+    def docs_per_sec(self):
+        return self.docs / self.busy_seconds if self.busy_seconds else 0.0
+
+    def __str__(self):
+        return f"{self.name}: {self.docs} docs, busy {self.busy_seconds:.1f}s, {self.docs_per_sec():.1f} docs/sec"
+
+
+def _run_stage(name, stats, input_queue, output_queue, work, errors):
+    """
+    입력 큐에서 배치를 받아 work를 적용하고 출력 큐로 넘기는 스레드 본체
+    """
+    try:
+        while True:
+            item = input_queue.get()
+            if item is _DONE or errors:
+                break
+            start = time.perf_counter()
+            result = work(item)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.docs += len(item["ids"])
+            if output_queue is not None:
+                output_queue.put(result)
+    except Exception as e:
+        errors.append((name, e))
+    finally:
+        if output_queue is not None:
+            output_queue.put(_DONE)
+        # 앞 단계가 막히지 않도록 남은 입력을 비움
+        while item is not _DONE:
+            item = input_queue.get()
+
+
+def run_embedding_pipeline(ids, documents, metadatas, sentence_model, collection, batch_size=64,
+                           queue_size=4, num_processes=0, cache=None, store_documents=True):
+    """
+    토크나이즈, 임베딩, Chroma 삽입 단계를 크기가 제한된 큐로 연결해 동시에 실행
+    (CPU가 Chroma 쓰기를 기다리며 쉬지 않도록 각 단계를 별도 스레드에서 처리)
+
+    Args:
+        ids (list): 문서 id 리스트
+        documents (list): 문서 리스트
+        metadatas (list): 메타데이터 리스트
+        sentence_model: SentenceTransformer 모델 (HuggingFaceEmbeddings.client)
+        collection: 문서를 삽입할 Chroma collection
+        batch_size (int): 배치당 문서 수 (기본값: 64)
+        queue_size (int): 단계 사이 큐에 대기할 수 있는 최대 배치 수 (기본값: 4)
+        num_processes (int): 0보다 크면 CPU 멀티프로세스 풀로 임베딩
+        cache (EmbeddingCache, optional): 임베딩 캐시 (캐시에 있는 문서는 임베딩하지 않음)
+        store_documents (bool): False이면 Chroma에 본문 대신 빈 문자열을 저장 (lean 인덱스)
+
+    Returns:
+        list: 단계별 StageStats
+    """
+    tokenize_stats = StageStats("tokenize")
+    encode_stats = StageStats("encode")
+    insert_stats = StageStats("insert")
+    source_queue = queue.Queue(maxsize=queue_size)
+    tokenized_queue = queue.Queue(maxsize=queue_size)
+    encoded_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    pool = None
+    if num_processes > 0:
+        pool = sentence_model.start_multi_process_pool(target_devices=["cpu"] * num_processes)
+
+    def tokenize(batch):
+        # HuggingFaceEmbeddings.embed_documents와 같은 전처리를 거쳐야 같은 벡터가 나옴 (Chroma에는 원문을 저장)
+        batch["texts"] = [normalize_text(document) for document in batch["documents"]]
+        vectors = cache.get_many(batch["texts"]) if cache else [None] * len(batch["texts"])
+        batch["vectors"] = vectors
+        batch["missing"] = [i for i, vector in enumerate(vectors) if vector is None]
+        if batch["missing"] and pool is None:
+            batch["features"] = sentence_model.tokenize([batch["texts"][i] for i in batch["missing"]])
+        return batch
+
+    def encode(batch):
+        if batch["missing"]:
+            texts = [batch["texts"][i] for i in batch["missing"]]
+            if pool is not None:
+                computed = sentence_model.encode_multi_process(texts, pool, batch_size=batch_size)
+            else:
+                # 토크나이저 출력에는 텐서가 아닌 값이 섞일 수 있으므로 텐서만 장치로 옮김
+                features = {key: value.to(sentence_model.device) if torch.is_tensor(value) else value
+                            for key, value in batch.pop("features").items()}
+                with torch.inference_mode():
+                    computed = sentence_model(features)["sentence_embedding"].float().cpu().numpy()
+            if cache:
+                cache.put_many(texts, computed)
+            for i, vector in zip(batch["missing"], computed):
+                batch["vectors"][i] = vector
+        return batch
+
+    def insert(batch):
+        collection.add(
+            ids=batch["ids"],
+            embeddings=np.asarray(batch["vectors"], dtype=np.float32).tolist(),
+            metadatas=batch["metadatas"],
+            documents=batch["documents"] if store_documents else [""] * len(batch["ids"])
+        )
+
+    threads = [
+        threading.Thread(target=_run_stage, args=("tokenize", tokenize_stats, source_queue, tokenized_queue, tokenize, errors)),
+        threading.Thread(target=_run_stage, args=("encode", encode_stats, tokenized_queue, encoded_queue, encode, errors)),
+        threading.Thread(target=_run_stage, args=("insert", insert_stats, encoded_queue, None, insert, errors))
+    ]
+    start = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for i in range(0, len(ids), batch_size):
+            if errors:
+                break
+            source_queue.put({
+                "ids": ids[i:i + batch_size],
+                "documents": documents[i:i + batch_size],
+                "metadatas": metadatas[i:i + batch_size]
+            })
+        source_queue.put(_DONE)
+        for thread in threads:
+            thread.join()
+    finally:
+        if pool is not None:
+            sentence_model.stop_multi_process_pool(pool)
+
+    if errors:
+        name, error = errors[0]
+        raise RuntimeError(f"Embedding pipeline failed in {name} stage: {error}") from error
+
+    elapsed = time.perf_counter() - start
+    stage_stats = [tokenize_stats, encode_stats, insert_stats]
+    print(f"Embedding pipeline: {len(ids)} docs in {elapsed:.1f}s ({len(ids) / max(elapsed, 1e-9):.1f} docs/sec)")
+    for stats in stage_stats:
+        print(f"  {stats}")
+    return stage_stats
@@ -0,0 +1,414 @@
+import os
+import json
+import threading
+import numpy as np
+
+
+FLAT_INDEX_DIRNAME = "flat_index"
+
+# 검색 조건으로 사용하는 메타데이터 필드 (메모리에 열 단위로 보관)
+FILTER_FIELDS = ["committee", "field", "session"]
+
+# 1차 검색용 양자화 코드 (int8: 차원별 스케일의 8비트 정수, binary: 코퍼스 평균을 뺀 부호 비트를 8개씩 묶은 uint8)
+QUANTIZATION_MODES = ("int8", "binary")
+
+# Chroma(langchain 기본값)와 같은 거리: 정규화하지 않은 임베딩의 제곱 L2 거리
+DISTANCE_METRIC = "l2"
+
+# 양자화 코드로 찾은 후보를 float16 벡터로 다시 계산할 배수 (k * 배수개 후보)
+DEFAULT_RESCORE_FACTORS = {"int8": 4, "binary": 10}
+
+# uint8 값별 1 비트 수 (binary 코드의 해밍 거리 계산)
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def default_flat_index_path(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        str: Chroma DB 디렉터리 안의 flat 인덱스 경로
+    """
+    return os.path.join(chroma_path, FLAT_INDEX_DIRNAME)
+
+
+def squared_norms(vectors):
+    """
+    Args:
+        vectors (np.ndarray): (n, dim) 임베딩 행렬
+
+    Returns:
+        np.ndarray: 행별 제곱 L2 노름 (float32)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return np.einsum("ij,ij->i", vectors, vectors)
+
+
+def squared_l2_distances(queries, vectors):
+    """
+    Args:
+        queries (np.ndarray): (m, dim) 질의 임베딩
+        vectors (np.ndarray): (n, dim) 문서 임베딩
+
+    Returns:
+        np.ndarray: (m, n) 제곱 L2 거리 행렬 (Chroma의 l2 거리와 같은 값)
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    distances = squared_norms(queries)[:, None] + squared_norms(vectors)[None, :] - 2.0 * (queries @ vectors.T)
+    return np.maximum(distances, 0.0)
+
+
+def quantize_int8(matrix):
+    """
+    Args:
+        matrix (np.ndarray): 임베딩 행렬
+
+    Returns:
+        tuple: (int8 코드 행렬, 차원별 float32 스케일)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.maximum(np.abs(matrix).max(axis=0), 1e-12) / 127.0
+    codes = np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(matrix, center=None):
+    """
+    Args:
+        matrix (np.ndarray): 임베딩 행렬
+        center (np.ndarray, optional): 부호를 구하기 전에 뺄 차원별 코퍼스 평균
+            (임베딩은 차원마다 치우쳐 있어 0 기준 부호만으로는 대부분의 비트가 같아짐)
+
+    Returns:
+        np.ndarray: 차원별 부호 비트를 묶은 (n, dim / 8) uint8 행렬
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if center is not None:
+        matrix = matrix - center
+    return np.packbits(matrix > 0, axis=1)
+
+
+def write_flat_index(index_dir, ids, documents, metadatas, vectors, model_name, quantization=None):
+    """
+    float16 임베딩 행렬, 행별 제곱 노름, 문서 레코드, 레코드 위치, 필터링 필드를 파일로 저장
+    (검색 결과와 거리 값이 Chroma와 같도록 정규화하지 않은 임베딩을 제곱 L2 거리로 비교)
+    (임시 파일에 쓴 뒤 교체하여 검색 중인 프로세스가 쓰다 만 파일을 읽지 않도록 함)
+
+    Args:
+        index_dir (str): flat 인덱스 디렉터리
+        ids (list): 문서 id 리스트
+        documents (list): 문서 본문 리스트
+        metadatas (list): 전체 메타데이터 리스트
+        vectors (np.ndarray): 문서별 임베딩
+        model_name (str): 임베딩 모델 이름
+        quantization (str, optional): "int8" 또는 "binary"이면 1차 검색용 양자화 코드도 저장
+    """
+    if quantization is not None and quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization: {quantization} (choose from {', '.join(QUANTIZATION_MODES)})")
+    os.makedirs(index_dir, exist_ok=True)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    matrix = vectors.astype(np.float16)
+
+    offsets = []
+    columns = {field: [] for field in FILTER_FIELDS}
+    columns["date_int"] = []
+    records_path = os.path.join(index_dir, "records.jsonl")
+    with open(records_path + ".tmp", "wb") as f:
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            offsets.append(f.tell())
+            record = {"id": doc_id, "document": document, "metadata": metadata}
+            f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            for field in FILTER_FIELDS:
+                columns[field].append(str(metadata.get(field, "")))
+            columns["date_int"].append(int(metadata.get("date_int") or 0))
+
+    # 필터링 필드는 본문 없이 따로 저장하여 인덱스를 열 때 전체 레코드를 읽지 않도록 함
+    columns_path = os.path.join(index_dir, "columns.json")
+    with open(columns_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(columns, f, ensure_ascii=False)
+
+    vectors_path = os.path.join(index_dir, "vectors.npy")
+    norms_path = os.path.join(index_dir, "norms.npy")
+    offsets_path = os.path.join(index_dir, "offsets.npy")
+    with open(vectors_path + ".tmp", "wb") as f:
+        np.save(f, matrix)
+    # 거리 계산에 쓰는 노름은 실제로 비교하는 float16 벡터에서 계산
+    with open(norms_path + ".tmp", "wb") as f:
+        np.save(f, squared_norms(matrix))
+    with open(offsets_path + ".tmp", "wb") as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    paths = [records_path, columns_path, vectors_path, norms_path, offsets_path]
+
+    # 양자화 코드는 float16이 아닌 float32 행렬에서 만듦
+    if quantization is not None:
+        codes_path = os.path.join(index_dir, f"codes.{quantization}.npy")
+        if quantization == "int8":
+            codes, scales = quantize_int8(vectors)
+            scales_path = os.path.join(index_dir, "scales.npy")
+            with open(scales_path + ".tmp", "wb") as f:
+                np.save(f, scales)
+            paths.append(scales_path)
+        else:
+            # 질의도 같은 평균을 빼서 부호를 구하도록 평균을 함께 저장
+            mean = vectors.mean(axis=0) if len(vectors) else np.zeros(0, dtype=np.float32)
+            codes = quantize_binary(vectors, center=mean)
+            mean_path = os.path.join(index_dir, "mean.npy")
+            with open(mean_path + ".tmp", "wb") as f:
+                np.save(f, mean.astype(np.float32))
+            paths.append(mean_path)
+        with open(codes_path + ".tmp", "wb") as f:
+            np.save(f, codes)
+        paths.append(codes_path)
+
+    info_path = os.path.join(index_dir, "info.json")
+    with open(info_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "count": len(ids),
+            "dim": int(matrix.shape[1]) if len(ids) else 0,
+            "metric": DISTANCE_METRIC,
+            "quantization": quantization
+        }, f)
+    paths.append(info_path)
+
+    for path in paths:
+        os.replace(path + ".tmp", path)
+    print(f"Flat index: {len(ids)} vectors ({matrix.nbytes / 1024 ** 2:.1f} MB float16) saved to {index_dir}")
+
+
+class FlatIndex:
+    """
+    memory-map한 float16 임베딩 행렬을 행렬 곱으로 전수 비교하는 정확한(exact) 검색 인덱스 (Chroma와 같은 제곱 L2 거리)
+    문서 본문과 메타데이터는 디스크에 두고 검색된 상위 k개 행만 읽으며, 필터링 필드는 처음 필터링할 때 메모리에 올림
+    양자화 코드가 있으면 코드만 메모리에 올려 1차 검색하고, 후보만 float16 벡터로 다시 계산
+    """
+
+    def __init__(self, index_dir, block_size=16384, rescore_factor=None):
+        """
+        Args:
+            index_dir (str): write_flat_index로 만든 디렉터리
+            block_size (int): 한 번에 float32로 변환해 곱할 행 수 (메모리 사용량 제한)
+            rescore_factor (int, optional): 양자화 1차 검색에서 k의 몇 배를 후보로 남길지 (기본값: int8 4, binary 10)
+        """
+        self.index_dir = index_dir
+        self.block_size = block_size
+        with open(os.path.join(index_dir, "info.json"), "r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        if self.info.get("metric") != DISTANCE_METRIC:
+            raise ValueError(f"Flat index at {index_dir} uses cosine on normalized vectors; rebuild it with build_chroma --flat_index")
+        self.matrix = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.norms = np.load(os.path.join(index_dir, "norms.npy"))
+        self.offsets = np.load(os.path.join(index_dir, "offsets.npy"))
+        self._records_file = open(os.path.join(index_dir, "records.jsonl"), "rb")
+        self._lock = threading.Lock()
+
+        # 양자화 코드는 1차 검색에서 전부 읽으므로 memory-map 대신 메모리에 올림
+        self.quantization = self.info.get("quantization")
+        self.codes = None
+        self.scales = None
+        self.mean = None
+        if self.quantization:
+            self.codes = np.load(os.path.join(index_dir, f"codes.{self.quantization}.npy"))
+            if self.quantization == "int8":
+                self.scales = np.load(os.path.join(index_dir, "scales.npy"))
+            else:
+                self.mean = np.load(os.path.join(index_dir, "mean.npy"))
+        self.rescore_factor = rescore_factor or DEFAULT_RESCORE_FACTORS.get(self.quantization, 1)
+        self.columns = None
+        self.date_ints = None
+
+    def _load_columns(self):
+        # 필터링 필드는 열 단위 배열로 보관하여 조건을 벡터 연산으로 평가
+        with self._lock:
+            if self.columns is not None:
+                return
+            with open(os.path.join(self.index_dir, "columns.json"), "r", encoding="utf-8") as f:
+                columns = json.load(f)
+            self.date_ints = np.asarray(columns.pop("date_int"), dtype=np.int64)
+            self.columns = {field: np.asarray(columns[field], dtype=object) for field in FILTER_FIELDS}
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def filter_mask(self, filters):
+        """
+        Args:
+            filters (dict): 정규화된 검색 조건 ({필드: 값 리스트}, date_from/date_to는 YYYYMMDD 정수)
+
+        Returns:
+            np.ndarray: 조건을 만족하는 행의 boolean mask (조건이 없으면 None)
+        """
+        if not filters:
+            return None
+        self._load_columns()
+        mask = np.ones(len(self), dtype=bool)
+        for field in FILTER_FIELDS:
+            if field in filters:
+                mask &= np.isin(self.columns[field], filters[field])
+        if "date_from" in filters:
+            mask &= self.date_ints >= filters["date_from"]
+        if "date_to" in filters:
+            mask &= self.date_ints <= filters["date_to"]
+        return mask
+
+    def search(self, query_vectors, k=2, filters=None, exact=False, rescore_factor=None):
+        """
+        Args:
+            query_vectors (list): 질의 임베딩 리스트
+            k (int): 질의마다 반환할 문서 개수
+            filters (dict, optional): 정규화된 검색 조건 (filter_mask 참고)
+            exact (bool): True이면 양자화 코드가 있어도 float16 행렬 전체와 비교
+            rescore_factor (int, optional): 이번 검색에서만 사용할 후보 배수
+
+        Returns:
+            list: 질의별 (행 번호, 제곱 L2 거리) 리스트, 거리 오름차순
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(len(query_vectors), -1)
+        mask = self.filter_mask(filters)
+        rows = np.flatnonzero(mask) if mask is not None else None
+        num_candidates = len(rows) if rows is not None else len(self)
+        k = min(k, num_candidates)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if self.codes is None or exact:
+            best_rows, best_scores = self._block_top_k(queries, rows, num_candidates, k, self._score_float16)
+        else:
+            # 양자화 코드로 후보를 고른 뒤 float16 벡터로 정확한 거리를 다시 계산
+            num_rescore = min(k * (rescore_factor or self.rescore_factor), num_candidates)
+            score_codes = self._score_int8 if self.quantization == "int8" else self._score_binary
+            candidate_rows, _ = self._block_top_k(queries, rows, num_candidates, num_rescore, score_codes)
+            best_rows, best_scores = self._rescore(queries, candidate_rows, k)
+
+        # 점수(2 q·x - |x|^2)에 질의 노름을 더해 Chroma와 같은 제곱 L2 거리로 변환
+        query_norms = squared_norms(queries)
+        return [
+            [(int(row), max(float(query_norm - score), 0.0)) for row, score in zip(query_rows, query_scores)]
+            for query_rows, query_scores, query_norm in zip(best_rows, best_scores, query_norms)
+        ]
+
+    # 점수는 클수록 가까운 2 q·x - |x|^2 (질의마다 |q|^2만 다른 음의 제곱 L2 거리)
+    def _score_float16(self, queries, selector):
+        return 2.0 * (queries @ np.asarray(self.matrix[selector], dtype=np.float32).T) - self.norms[selector]
+
+    def _score_int8(self, queries, selector):
+        # 차원별 스케일을 질의 쪽에 곱해 코드 행렬은 float32 변환만 하도록 함
+        return 2.0 * ((queries * self.scales) @ self.codes[selector].astype(np.float32).T) - self.norms[selector]
+
+    def _score_binary(self, queries, selector):
+        # 해밍 거리가 작을수록 유사하므로 음수로 바꿔 점수로 사용
+        codes = self.codes[selector]
+        distances = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for i, query_bits in enumerate(quantize_binary(queries, center=self.mean)):
+            distances[i] = _POPCOUNT[codes ^ query_bits].sum(axis=1, dtype=np.int32)
+        return -distances
+
+    def _block_top_k(self, queries, rows, num_candidates, k, score_block):
+        """
+        후보 행을 블록 단위로 점수화하고 블록별 상위 k개만 남겨 병합
+
+        Returns:
+            tuple: 질의별 상위 k개 (행 번호 행렬, 점수 행렬), 점수 내림차순
+        """
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, num_candidates, self.block_size):
+            if rows is None:
+                block_rows = np.arange(start, min(start + self.block_size, num_candidates))
+                scores = score_block(queries, slice(start, start + self.block_size))
+            else:
+                block_rows = rows[start:start + self.block_size]
+                scores = score_block(queries, block_rows)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                block_rows = block_rows[top]
+            else:
+                block_rows = np.broadcast_to(block_rows, scores.shape)
+            best_rows = np.concatenate([best_rows, block_rows], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+
+        order = np.argsort(-best_scores, axis=1)[:, :k]
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def _rescore(self, queries, candidate_rows, k):
+        best_rows = []
+        best_scores = []
+        for query, rows in zip(queries, candidate_rows):
+            # memory-map에서 후보 행만 읽도록 정렬된 행 번호로 조회
+            rows = np.sort(rows)
+            scores = 2.0 * (np.asarray(self.matrix[rows], dtype=np.float32) @ query) - self.norms[rows]
+            order = np.argsort(-scores)[:k]
+            best_rows.append(rows[order])
+            best_scores.append(scores[order])
+        return best_rows, best_scores
+
+    def memory_report(self):
+        """
+        Returns:
+            dict: float32 기준, float16 행렬, 양자화 코드의 크기 (MB)
+        """
+        num_rows, dim = self.matrix.shape
+        report = {
+            "float32_mb": num_rows * dim * 4 / 1024 ** 2,
+            "float16_mb": self.matrix.nbytes / 1024 ** 2
+        }
+        if self.codes is not None:
+            extra = self.scales if self.scales is not None else self.mean
+            report["codes_mb"] = (self.codes.nbytes + (extra.nbytes if extra is not None else 0)) / 1024 ** 2
+        return report
+
+    def get_record(self, row):
+        """
+        Args:
+            row (int): 행 번호
+
+        Returns:
+            dict: {"id", "document", "metadata"} 레코드
+        """
+        with self._lock:
+            self._records_file.seek(int(self.offsets[row]))
+            line = self._records_file.readline()
+        return json.loads(line)
+
+    def close(self):
+        self._records_file.close()
+
+
+def evaluate_quantization(index, vectors, k=10, num_queries=200, seed=0):
+    """
+    코퍼스에서 뽑은 문서 벡터를 질의로 사용하여 float32 제곱 L2 전수 비교 대비 recall@k와 메모리 절감량을 계산
+    (질의 문서 자신은 두 결과에서 모두 제외)
+
+    Args:
+        index (FlatIndex): 양자화 코드가 있는 flat 인덱스
+        vectors (np.ndarray): 인덱스를 만든 원래 임베딩 (float32 기준)
+        k (int): recall을 계산할 상위 문서 수
+        num_queries (int): 질의로 사용할 문서 수
+        seed (int): 질의 샘플링 시드
+
+    Returns:
+        dict: 메모리 크기(MB), 1차 검색만 했을 때와 재계산 후의 recall@k
+    """
+    baseline = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(baseline), size=min(num_queries, len(baseline)), replace=False)
+    queries = baseline[sample]
+
+    top = np.argsort(squared_l2_distances(queries, baseline), axis=1)[:, :k + 1]
+    expected = [set([row for row in rows if row != query_row][:k]) for rows, query_row in zip(top.tolist(), sample.tolist())]
+
+    def recall(results):
+        total = 0.0
+        for hits, query_row, truth in zip(results, sample.tolist(), expected):
+            found = [row for row, _ in hits if row != query_row][:k]
+            total += len(truth.intersection(found)) / max(len(truth), 1)
+        return total / len(results)
+
+    report = index.memory_report()
+    report["recall_first_pass"] = recall(index.search(queries, k + 1, rescore_factor=1))
+    report["recall_rescored"] = recall(index.search(queries, k + 1))
+    report["k"] = k
+    return report
@@ -1,7 +1,13 @@
+import os
+import sys
+import time
 import argparse
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import Chroma
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot"))
+from retriever import Retriever, read_query_file
+
 
 def test_vector_db(chroma_path, embeddings_model_name, query, k=3):
     """
@@ -28,21 +34,55 @@ def test_vector_db(chroma_path, embeddings_model_name, query, k=3):
         print("-" * 50)
 
 
-def main(chroma_path, query, k=3):
+def test_vector_db_batch(chroma_path, embeddings_model_name, queries, k=3):
+    """
+    여러 쿼리를 한 번의 배치 임베딩과 한 번의 검색 호출로 수행
+
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        embeddings_model_name (str): HuggingFace Embedding 모델명
+        queries (list): 검색할 쿼리 문장 리스트
+        k (int): 쿼리마다 반환할 유사 문서의 수 (기본값: 3)
+    """
+    print("Loading Chroma Vector DB...")
+    retriever = Retriever(chroma_path, embeddings_model_name)
+    retriever.warm_up()
+
+    print(f"Performing batched similarity search for {len(queries)} queries")
+    start = time.perf_counter()
+    batch_results = retriever.search_batch(queries, k=k)
+    elapsed = time.perf_counter() - start
+
+    for query, results in zip(queries, batch_results):
+        print(f"\nQuery: '{query}'")
+        for i, (result, score) in enumerate(results):
+            print(f"  Result {i + 1} (score {score:.4f}):", result.metadata.get("title", result.metadata.get("doc_id", "")))
+    print("-" * 50)
+    print(f"{len(queries)} queries in {elapsed:.2f}s ({len(queries) / max(elapsed, 1e-9):.1f} queries/sec)")
+    print(retriever.cache_report())
+
+
+def main(chroma_path, query=None, k=3, query_file=None):
     """
     Args:
         chroma_path (str): Chroma DB 저장 경로
         query (str): 검색할 쿼리 문장
         k (int, optional): 반환할 유사 문서의 수 (기본값: 3)
+        query_file (str, optional): 한 줄에 하나의 쿼리가 적힌 파일 (배치 검색)
     """
     embeddings_model_name = "jhgan/ko-sroberta-multitask"
-    test_vector_db(chroma_path, embeddings_model_name, query, k)
+    if query_file:
+        test_vector_db_batch(chroma_path, embeddings_model_name, read_query_file(query_file), k)
+    else:
+        test_vector_db(chroma_path, embeddings_model_name, query, k)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Chroma Vector DB 쿼리 테스트 스크립트")
     parser.add_argument('--chroma_path', type=str, required=True, help='Chroma DB 저장 경로')
-    parser.add_argument('--query', type=str, required=True, help='테스트 쿼리 문장')
+    query_group = parser.add_mutually_exclusive_group(required=True)
+    query_group.add_argument('--query', type=str, help='테스트 쿼리 문장')
+    query_group.add_argument('--query_file', type=str, help='한 줄에 하나의 쿼리가 적힌 파일 (배치 검색)')
     parser.add_argument('--k', type=int, default=3, help='유사 문서 검색에서 반환할 문서 개수 (기본값: 3)')
 
     args = parser.parse_args()
@@ -50,5 +90,6 @@ if __name__ == "__main__":
     main(
         chroma_path=args.chroma_path, 
         query=args.query, 
-        k=args.k
+        k=args.k,
+        query_file=args.query_file
     )
\ No newline at end of file
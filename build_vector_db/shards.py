@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+
+
+SHARD_MANIFEST_FILENAME = "shards.json"
+
+# 샤드를 나눌 수 있는 메타데이터 필드
+SHARD_KEYS = ("session", "committee")
+
+
+def shard_manifest_path(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        str: Chroma DB 디렉터리 안의 샤드 manifest 경로
+    """
+    return os.path.join(chroma_path, SHARD_MANIFEST_FILENAME)
+
+
+def load_shard_manifest(chroma_path):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+
+    Returns:
+        dict: {"shard_by": [...], "shards": {컬렉션 이름: {"values": {...}, "count": n}}} (샤드 인덱스가 아니면 None)
+    """
+    path = shard_manifest_path(chroma_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_shard_manifest(chroma_path, manifest):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        manifest (dict): 샤드 manifest
+    """
+    path = shard_manifest_path(chroma_path)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def shard_collection_name(values):
+    """
+    Args:
+        values (dict): 샤드 필드 값 (예: {"session": "21", "committee": "법제사법위원회"})
+
+    Returns:
+        str: Chroma 컬렉션 이름 (한글은 컬렉션 이름에 쓸 수 없으므로 값의 해시 사용)
+    """
+    payload = json.dumps(values, ensure_ascii=False, sort_keys=True)
+    return "shard-" + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def group_by_shard(metadatas, shard_by):
+    """
+    Args:
+        metadatas (list): 문서별 메타데이터
+        shard_by (list): 샤드를 나눌 필드 (SHARD_KEYS 중)
+
+    Returns:
+        dict: {컬렉션 이름: (샤드 필드 값, 문서 인덱스 리스트)}
+    """
+    groups = {}
+    for i, metadata in enumerate(metadatas):
+        values = {key: str(metadata.get(key, "")) for key in shard_by}
+        name = shard_collection_name(values)
+        groups.setdefault(name, (values, []))[1].append(i)
+    return groups
+
+
+def select_shards(manifest, filters):
+    """
+    검색 조건과 맞지 않는 샤드를 제외 (샤드 필드에 대한 조건만 사용)
+
+    Args:
+        manifest (dict): 샤드 manifest
+        filters (dict): 정규화된 검색 조건 ({필드: 값 리스트})
+
+    Returns:
+        list: 검색할 컬렉션 이름 리스트
+    """
+    filters = filters or {}
+    selected = []
+    for name, shard in manifest["shards"].items():
+        if all(value in filters[key] for key, value in shard["values"].items() if key in filters):
+            selected.append(name)
+    return selected
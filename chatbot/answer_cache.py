@@ -0,0 +1,177 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+
+
+def context_hash(context, metadata, context_token_budget=None):
+    """
+    같은 문서 id라도 본문이 바뀌었거나(--upsert) k, 검색 조건, 컨텍스트 예산이 달라 컨텍스트가 다르면
+    다른 값이 되는 캐시 키
+
+    Args:
+        context (str): 검색된 문서의 컨텍스트
+        metadata (dict): 가장 유사한 문서의 메타데이터 (content_hash 포함)
+        context_token_budget (int, optional): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
+
+    Returns:
+        str: 컨텍스트 해시 (sha256 hex)
+    """
+    digest = hashlib.sha256()
+    for part in (metadata.get("content_hash", ""), str(context_token_budget), context):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    """
+    (가장 유사한 문서 id, 컨텍스트 해시, 질의 임베딩)을 키로 생성된 답변을 저장하는 SQLite 의미 캐시
+    같은 컨텍스트로 답한 이전 질의 중 코사인 유사도가 기준 이상인 질의가 있으면 그 답변을 재사용
+    """
+
+    def __init__(self, db_path, threshold=0.95, ttl_seconds=None, max_entries=10000):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로
+            threshold (float): 캐시된 답변을 재사용할 최소 코사인 유사도
+            ttl_seconds (float, optional): 답변 유효 시간 (None이면 만료 없음)
+            max_entries (int): 보관할 최대 답변 수 (넘으면 가장 오래 사용하지 않은 답변부터 삭제)
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Streamlit 세션들이 공유하므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, doc_id TEXT NOT NULL, context_hash TEXT NOT NULL DEFAULT '', "
+            "query TEXT NOT NULL, vector BLOB NOT NULL, answer TEXT NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        # 컨텍스트 해시가 없던 캐시 파일은 열을 추가 (기존 답변은 빈 해시로 남아 재사용되지 않고 삭제됨)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(answers)")]
+        if "context_hash" not in columns:
+            self.conn.execute("ALTER TABLE answers ADD COLUMN context_hash TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("DROP INDEX IF EXISTS answers_doc_id")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS answers_doc_context ON answers (doc_id, context_hash)")
+        self.conn.commit()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, doc_id, context_key, query_vector):
+        """
+        Args:
+            doc_id (str): 가장 유사한 문서의 id
+            context_key (str): 답변에 사용한 컨텍스트의 해시 (context_hash)
+            query_vector (list): 질의 임베딩
+
+        Returns:
+            str: 캐시된 답변 (기준 이상으로 유사한 이전 질의가 없으면 None)
+        """
+        query = self._normalize(query_vector)
+        now = time.time()
+        with self._lock:
+            sql = "SELECT id, vector, answer FROM answers WHERE doc_id = ? AND context_hash = ?"
+            params = [doc_id, context_key]
+            if self.ttl_seconds is not None:
+                sql += " AND created_at >= ?"
+                params.append(now - self.ttl_seconds)
+            best_id, best_answer, best_score = None, None, self.threshold
+            for row_id, vector, answer in self.conn.execute(sql, params):
+                score = float(np.frombuffer(vector, dtype=np.float32) @ query)
+                if score >= best_score:
+                    best_id, best_answer, best_score = row_id, answer, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE answers SET last_used_at = ? WHERE id = ?", (now, best_id))
+            self.conn.commit()
+            return best_answer
+
+    def put(self, doc_id, context_key, query_text, query_vector, answer):
+        """
+        Args:
+            doc_id (str): 가장 유사한 문서의 id
+            context_key (str): 답변에 사용한 컨텍스트의 해시 (context_hash)
+            query_text (str): 사용자 질의
+            query_vector (list): 질의 임베딩
+            answer (str): 생성된 답변
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO answers (doc_id, context_hash, query, vector, answer, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, context_key, query_text, self._normalize(query_vector).tobytes(), answer, now, now)
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds is not None:
+            self.conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.conn.execute(
+            "DELETE FROM answers WHERE id NOT IN (SELECT id FROM answers ORDER BY last_used_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+
+    def get_or_generate(self, doc_id, context_key, query_text, query_vector, generate):
+        """
+        캐시된 답변이 있으면 반환하고, 없으면 generate()로 생성한 답변을 저장 후 반환
+
+        Args:
+            doc_id (str): 가장 유사한 문서의 id (None이면 캐시를 사용하지 않음)
+            context_key (str): 답변에 사용한 컨텍스트의 해시 (context_hash)
+            query_text (str): 사용자 질의
+            query_vector (list): 질의 임베딩
+            generate (callable): 답변을 생성하는 함수
+
+        Returns:
+            tuple: (답변, 캐시 적중 여부)
+        """
+        if doc_id is None:
+            return generate(), False
+        answer = self.lookup(doc_id, context_key, query_vector)
+        if answer is not None:
+            return answer, True
+        answer = generate()
+        # 생성 실패로 빈 답변이 나오면 저장하지 않음
+        if answer:
+            self.put(doc_id, context_key, query_text, query_vector, answer)
+        return answer, False
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def stats(self):
+        """
+        Returns:
+            dict: 적중 수, 미적중 수, 적중률, 저장된 답변 수
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0, "size": len(self)}
+
+    def report(self):
+        """
+        Returns:
+            str: 답변 캐시 적중률 보고
+        """
+        stats = self.stats()
+        return (f"Answer cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%} hit rate, {stats['size']} answers)")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from prompt_builder import DEFAULT_CONTEXT_TOKEN_BUDGET, build_messages
+from generation_backend import create_generation_backend
+
+
+# 이 코드 이상의 HTTP 상태 코드(서버 오류)는 재시도
+MIN_RETRYABLE_STATUS_CODE = 500
+
+
+class TokenBucket:
+    """
+    분당 토큰 한도(tokens per minute)를 지키도록 요청 시작을 늦추는 토큰 버킷
+    """
+
+    def __init__(self, tokens_per_minute):
+        """
+        Args:
+            tokens_per_minute (int): 분당 최대 토큰 수 (버킷 용량이자 1분 동안 채워지는 양)
+        """
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        # 먼저 기다리기 시작한 요청이 먼저 토큰을 가져가도록 잠금으로 순서 유지
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount):
+        """
+        Args:
+            amount (int): 이번 요청이 사용할 것으로 예상되는 토큰 수 (버킷 용량보다 크면 용량만큼)
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+def is_retryable(error):
+    """
+    Args:
+        error (Exception): 생성 중 발생한 예외
+
+    Returns:
+        bool: openai의 연결 오류, 시간 초과, 속도 제한, 5xx 서버 오류이면 True (코드 오류 등 그 밖의 예외는 False)
+    """
+    try:
+        import openai
+    except ImportError:
+        # openai가 없으면 스텁 백엔드이므로 재시도할 API 오류가 없음
+        return False
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= MIN_RETRYABLE_STATUS_CODE
+
+
+def backoff_seconds(attempt, base=1.0, maximum=60.0):
+    """
+    Args:
+        attempt (int): 지금까지 실패한 횟수 (1부터)
+        base (float): 첫 재시도 대기 시간(초)
+        maximum (float): 최대 대기 시간(초)
+
+    Returns:
+        float: 지수적으로 늘어나는 대기 시간 (동시에 실패한 요청이 몰리지 않도록 0.5~1배 임의 조정)
+    """
+    return min(maximum, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def compact_completed(output_file):
+    """
+    이전 실행의 결과 파일을 오류 없이 답변된 레코드만 질의 번호당 하나씩 남기도록 다시 쓰기
+    (이어서 실행하면 실패했던 질의의 새 결과가 추가되므로, 정리하지 않으면 같은 번호의 레코드가 여러 개 남음)
+
+    Args:
+        output_file (str): 이전 실행의 결과 JSONL 경로
+
+    Returns:
+        set: 오류 없이 답변이 저장된 질의 번호 집합
+    """
+    if not os.path.exists(output_file):
+        return set()
+    completed = {}
+    with open(output_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단되면서 잘린 마지막 줄은 다시 처리
+                continue
+            if "index" in record and not record.get("error"):
+                # 같은 번호의 답변이 여러 개이면 마지막 답변을 사용
+                completed.pop(record["index"], None)
+                completed[record["index"]] = record
+
+    with open(output_file + ".tmp", 'w', encoding='utf-8') as f:
+        for record in completed.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(output_file + ".tmp", output_file)
+    return set(completed)
+
+
+class BatchAnswerer:
+    """
+    검색은 배치 단위로 하고, 답변 생성은 동시 요청 수와 분당 토큰 한도 안에서 비동기로 처리
+    """
+
+    def __init__(self, retriever, generator, k=2, filters=None, concurrency=16, tokens_per_minute=None, max_retries=5,
+                 context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, retry_base=1.0):
+        """
+        Args:
+            retriever (Retriever): 모든 질의가 공유하는 검색기
+            generator: 답변 생성 백엔드 (generation_backend.create_generation_backend)
+            k (int): 검색할 문서 개수
+            filters (dict, optional): 모든 질의에 적용할 검색 조건
+            concurrency (int): 동시에 진행할 최대 생성 요청 수
+            tokens_per_minute (int, optional): 분당 최대 토큰 수 (None이면 제한 없음)
+            max_retries (int): 요청당 최대 재시도 횟수
+            context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
+            retry_base (float): 첫 재시도 대기 시간(초)
+        """
+        self.retriever = retriever
+        self.generator = generator
+        self.k = k
+        self.filters = filters
+        self.concurrency = concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.context_token_budget = context_token_budget
+        self.retry_base = retry_base
+        self.max_answer_tokens = getattr(generator, "max_tokens", 400)
+        self.retries = 0
+        self.failures = 0
+
+    async def _generate(self, executor, bucket, messages, prompt_tokens):
+        """
+        Returns:
+            tuple: (답변, 시도 횟수)
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            attempt += 1
+            if bucket is not None:
+                # 답변 길이는 미리 알 수 없으므로 최대 토큰 수로 예상
+                await bucket.acquire(prompt_tokens + self.max_answer_tokens)
+            try:
+                # 생성 백엔드는 동기 API이므로 동시 요청 수만큼의 스레드에서 실행
+                answer = await loop.run_in_executor(executor, self.generator.complete, messages)
+                return answer, attempt
+            except Exception as e:
+                if attempt > self.max_retries or not is_retryable(e):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_seconds(attempt, self.retry_base))
+
+    async def _answer_one(self, executor, bucket, index, query_text, result, write):
+        record = {"index": index, "query": query_text}
+        if result is None:
+            record["error"] = "No relevant context found."
+            write(record)
+            return
+
+        context, metadata = result
+        messages, report = build_messages(query_text, context, metadata, self.context_token_budget)
+        record.update({"doc_id": metadata.get("doc_id"), "title": metadata.get("title"),
+                       "prompt_tokens": report["prompt_tokens"]})
+        start = time.perf_counter()
+        try:
+            record["answer"], record["attempts"] = await self._generate(executor, bucket, messages,
+                                                                       report["prompt_tokens"])
+        except Exception as e:
+            self.failures += 1
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency"] = round(time.perf_counter() - start, 3)
+        write(record)
+
+    async def run(self, queries, output_file, retrieval_batch_size=256, skip=None, progress_every=100):
+        """
+        Args:
+            queries (list): 질의 리스트
+            output_file (str): 결과 JSONL 경로 (끝나는 순서대로 한 줄씩 추가)
+            retrieval_batch_size (int): 한 번에 임베딩하고 검색할 질의 수
+            skip (set, optional): 이미 처리해서 건너뛸 질의 번호
+            progress_every (int): 진행 상황을 출력할 완료 건수 간격
+
+        Returns:
+            dict: 처리 건수, 실패 건수, 재시도 횟수, 소요 시간
+        """
+        skip = skip or set()
+        pending = [(i, query) for i, query in enumerate(queries) if i not in skip]
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.tokens_per_minute) if self.tokens_per_minute else None
+        tasks = []
+        done = 0
+        start = time.perf_counter()
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        with open(output_file, 'a', encoding='utf-8') as f, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=1) as retrieval_executor:
+
+            def write(record):
+                # 기록은 이벤트 루프에서만 하므로 잠금이 필요 없음
+                nonlocal done
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                done += 1
+                if done % progress_every == 0 or done == len(pending):
+                    elapsed = time.perf_counter() - start
+                    print(f"{done}/{len(pending)} answered ({done / max(elapsed, 1e-9):.1f} queries/sec, "
+                          f"{self.retries} retries, {self.failures} failures)")
+
+            for batch_start in range(0, len(pending), retrieval_batch_size):
+                batch = pending[batch_start:batch_start + retrieval_batch_size]
+                # 검색은 별도 스레드에서 배치로 실행해 앞선 배치의 생성 요청과 겹치게 함
+                results = await loop.run_in_executor(
+                    retrieval_executor, self.retriever.query_batch, [query for _, query in batch], self.k, self.filters
+                )
+                for (index, query_text), result in zip(batch, results):
+                    # 진행 중인 요청이 concurrency개면 하나가 끝날 때까지 다음 요청을 만들지 않음
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(self._answer_one(executor, bucket, index, query_text, result, write))
+                    task.add_done_callback(lambda _: semaphore.release())
+                    tasks.append(task)
+            await asyncio.gather(*tasks)
+
+        return {"answered": done, "failures": self.failures, "retries": self.retries,
+                "seconds": time.perf_counter() - start}
+
+
+def main(chroma_path, query_file, output_file, k=2, filters=None, backend="chroma", generation_backend="openai",
+         base_url=None, stub_latency=0.5, stub_tokens_per_second=50.0, concurrency=16, tokens_per_minute=None,
+         max_retries=5, retrieval_batch_size=256, context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, resume=False):
+    """
+    질의 파일의 모든 질의에 대한 답변을 동시에 생성해 JSONL로 저장 (main_rag.py의 단일 질의 흐름을 대량 평가용으로 실행)
+
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        query_file (str): 한 줄에 하나의 질의가 적힌 파일 경로
+        output_file (str): 결과 JSONL 경로
+        k (int): 검색할 문서 개수
+        filters (dict, optional): 모든 질의에 적용할 검색 조건
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
+        generation_backend (str): 답변 생성 백엔드 ("openai" 또는 "stub")
+        base_url (str, optional): OpenAI 호환 API 주소
+        stub_latency (float): stub 백엔드의 첫 토큰까지의 지연 시간(초)
+        stub_tokens_per_second (float): stub 백엔드의 토큰 생성 속도
+        concurrency (int): 동시에 진행할 최대 생성 요청 수
+        tokens_per_minute (int, optional): 분당 최대 토큰 수
+        max_retries (int): 요청당 최대 재시도 횟수
+        retrieval_batch_size (int): 한 번에 임베딩하고 검색할 질의 수
+        context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
+        resume (bool): 결과 파일에 이미 답변이 있는 질의는 건너뜀 (실패한 결과는 지우고 다시 처리)
+    """
+    from retriever import get_retriever, read_query_file
+
+    queries = read_query_file(query_file)
+    skip = set()
+    if resume:
+        skip = compact_completed(output_file)
+    elif os.path.exists(output_file):
+        os.remove(output_file)
+    print(f"Loaded {len(queries)} queries from {query_file}" + (f" ({len(skip)} already answered)" if skip else ""))
+
+    retriever = get_retriever(chroma_path, backend=backend)
+    # 재시도는 BatchAnswerer가 토큰 버킷과 함께 관리하므로 openai 클라이언트의 자체 재시도는 끔
+    generator = create_generation_backend(generation_backend, base_url=base_url, stub_latency=stub_latency,
+                                          stub_tokens_per_second=stub_tokens_per_second, max_retries=0)
+    answerer = BatchAnswerer(retriever, generator, k=k, filters=filters, concurrency=concurrency,
+                             tokens_per_minute=tokens_per_minute, max_retries=max_retries,
+                             context_token_budget=context_token_budget)
+    summary = asyncio.run(answerer.run(queries, output_file, retrieval_batch_size, skip))
+
+    print(f"{summary['answered']}개 질의 처리 완료: {summary['seconds']:.1f}s "
+          f"({summary['answered'] / max(summary['seconds'], 1e-9):.1f} queries/sec), "
+          f"{summary['retries']} retries, {summary['failures']} failures")
+    print(retriever.cache_report())
+    print(f"Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="질의 파일의 답변을 비동기로 동시에 생성해 JSONL로 저장하는 스크립트")
+    parser.add_argument('--chroma_path', type=str, required=True, help='Chroma DB 저장 경로')
+    parser.add_argument('--query_file', type=str, required=True, help='한 줄에 하나의 질의가 적힌 파일')
+    parser.add_argument('--output_file', type=str, required=True, help='결과 JSONL 경로 (끝나는 순서대로 저장)')
+    parser.add_argument('--k', type=int, default=2, help='검색할 문서 개수 (기본값: 2)')
+    parser.add_argument('--committee', type=str, help='검색할 소관위원회 (예: 법제사법위원회)')
+    parser.add_argument('--field', type=str, help='검색할 법 종류')
+    parser.add_argument('--session', type=str, nargs='+', help='검색할 국회 회기 (예: 20 21)')
+    parser.add_argument('--date_from', type=str, help='보고서 게시일 시작 (YYYY-MM-DD)')
+    parser.add_argument('--date_to', type=str, help='보고서 게시일 끝 (YYYY-MM-DD)')
+    parser.add_argument('--backend', type=str, choices=['chroma', 'flat'], default='chroma', help='검색 백엔드 (기본값: chroma)')
+    parser.add_argument('--generation_backend', type=str, choices=['openai', 'stub'], default='openai',
+                        help='답변 생성 백엔드 (stub: API 호출 없이 정해진 답변 반환, 기본값: openai)')
+    parser.add_argument('--base_url', type=str, default=None,
+                        help='OpenAI 호환 API 주소 (예: stub_server.py의 http://127.0.0.1:8001/v1)')
+    parser.add_argument('--stub_latency', type=float, default=0.5, help='stub 백엔드의 첫 토큰까지의 지연 시간(초) (기본값: 0.5)')
+    parser.add_argument('--stub_tokens_per_second', type=float, default=50.0, help='stub 백엔드의 토큰 생성 속도 (기본값: 50)')
+    parser.add_argument('--concurrency', type=int, default=16, help='동시에 진행할 최대 생성 요청 수 (기본값: 16)')
+    parser.add_argument('--tokens_per_minute', type=int, default=None, help='분당 최대 토큰 수 (기본값: 제한 없음)')
+    parser.add_argument('--max_retries', type=int, default=5, help='요청당 최대 재시도 횟수 (기본값: 5)')
+    parser.add_argument('--retrieval_batch_size', type=int, default=256, help='한 번에 임베딩하고 검색할 질의 수 (기본값: 256)')
+    parser.add_argument('--context_token_budget', type=int, default=DEFAULT_CONTEXT_TOKEN_BUDGET,
+                        help=f'프롬프트에 넣을 컨텍스트의 최대 토큰 수 (기본값: {DEFAULT_CONTEXT_TOKEN_BUDGET})')
+    parser.add_argument('--resume', action='store_true',
+                        help='결과 파일에 이미 답변이 있는 질의는 건너뜀 (실패한 결과는 지우고 다시 처리)')
+
+    args = parser.parse_args()
+
+    main(
+        chroma_path=args.chroma_path,
+        query_file=args.query_file,
+        output_file=args.output_file,
+        k=args.k,
+        filters={
+            "committee": args.committee,
+            "field": args.field,
+            "session": args.session,
+            "date_from": args.date_from,
+            "date_to": args.date_to
+        },
+        backend=args.backend,
+        generation_backend=args.generation_backend,
+        base_url=args.base_url,
+        stub_latency=args.stub_latency,
+        stub_tokens_per_second=args.stub_tokens_per_second,
+        concurrency=args.concurrency,
+        tokens_per_minute=args.tokens_per_minute,
+        max_retries=args.max_retries,
+        retrieval_batch_size=args.retrieval_batch_size,
+        context_token_budget=args.context_token_budget,
+        resume=args.resume
+    )
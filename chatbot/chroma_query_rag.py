@@ -1,33 +1,21 @@
-from langchain.vectorstores import Chroma
-from langchain.embeddings import HuggingFaceEmbeddings
+from retriever import get_retriever
 
-# HuggingFace Embeddings 모델 설정
-embeddings = HuggingFaceEmbeddings(
-    model_name="jhgan/ko-sroberta-multitask",
-    model_kwargs={"device": "cuda"}
-)
 
-def query_rag(chroma_path, query_text, k=2):
+def query_rag(chroma_path, query_text, k=2, doc_store_path=None, filters=None, backend="chroma", flat_index_path=None):
     """
-    Chroma DB에서 유사한 문서를 검색
+    Chroma DB에서 유사한 문서를 검색 (임베딩 모델과 DB는 프로세스당 한 번만 로드)
 
     Args:
         chroma_path (str): Chroma DB 저장 경로
         query_text (str): 검색할 질의 문장
         k (int): 반환할 문서 개수
+        doc_store_path (str, optional): lean 인덱스의 문서 저장소 경로 (기본값: 구축할 때 index_info.json에 기록된 경로, lean 인덱스일 때만 사용)
+        filters (dict, optional): 위원회(committee), 법 종류(field), 회기(session), 기간(date_from, date_to) 조건
+        backend (str): 검색 백엔드 ("chroma" 또는 memory-map 행렬을 전수 비교하는 "flat")
+        flat_index_path (str, optional): flat 백엔드의 인덱스 경로 (기본값: chroma_path/flat_index)
 
     Returns:
         tuple: 검색된 문서의 컨텍스트와 메타데이터
     """
-    # Chroma DB 로드
-    db = Chroma(persist_directory=chroma_path, embedding_function=embeddings)
-
-    # 유사한 문서 검색
-    results = db.similarity_search_with_score(query_text, k=k)
-    if not results:
-        raise ValueError("No relevant context found.")
-
-    # 컨텍스트와 메타데이터 추출
-    context = " ".join([doc.page_content for doc, _ in results])
-    metadata = results[0][0].metadata  # 가장 유사한 문서의 메타데이터
-    return context, metadata
\ No newline at end of file
+    retriever = get_retriever(chroma_path, doc_store_path=doc_store_path, backend=backend, flat_index_path=flat_index_path)
+    return retriever.query(query_text, k=k, filters=filters)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import re
+import time
+from prompt_builder import GENERATION_MODEL
+
+
+GENERATION_BACKENDS = ("openai", "stub")
+
+# 스텁이 돌려주는 기본 답변 (실제 답변과 비슷한 길이)
+DEFAULT_STUB_ANSWER = (
+    "의안정보시스템에 게시된 법률안 검토 보고서에 따르면, 이 법률안은 소관위원회에서 심사한 법률안입니다. "
+    "검토 보고서는 개정안의 취지와 주요 내용을 설명하고, 현행 제도의 문제점과 개선 방향을 제시하고 있습니다. "
+    "최종적으로 이 법안은 해당 발의로 개정되었습니다. "
+    "이 법안에 대해 더 자세히 알아보시려면, 의안정보시스템에서 관련 키워드를 검색해 보시기 바랍니다. "
+    "► 의안정보시스템 바로가기 : https://likms.assembly.go.kr/bill/main.do"
+)
+
+
+def split_stub_tokens(text):
+    """
+    Args:
+        text (str): 답변
+
+    Returns:
+        list: 공백 단위로 나눈 토큰 리스트 (뒤의 공백 포함, 이어 붙이면 원문)
+    """
+    return re.findall(r"\S+\s*", text)
+
+
+class OpenAIBackend:
+    """
+    OpenAI 호환 Chat Completions API로 답변을 생성하는 백엔드
+    (base_url을 지정하면 stub_server.py 같은 호환 서버 사용)
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=GENERATION_MODEL, max_tokens=400, temperature=0.7, max_retries=None):
+        """
+        Args:
+            api_key (str, optional): OpenAI API 키 (없으면 OPENAI_API_KEY 환경 변수 또는 openai.api_key 사용)
+            base_url (str, optional): OpenAI 호환 API 주소 (예: http://127.0.0.1:8001/v1)
+            model (str): 생성 모델
+            max_tokens (int): 답변 최대 토큰 수
+            temperature (float): 샘플링 온도
+            max_retries (int, optional): openai 클라이언트의 자체 재시도 횟수 (None이면 클라이언트 기본값)
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self._client = None
+
+    def _get_client(self):
+        # openai는 처음 생성할 때 import (스텁만 쓰는 환경에서는 설치하지 않아도 됨)
+        if self._client is None:
+            import openai
+            if self.api_key is None and self.base_url is None and self.max_retries is None:
+                # 모듈 전역 클라이언트는 호출 시점의 openai.api_key를 따름 (Streamlit 앱에서 키 설정)
+                self._client = openai
+            else:
+                # 스텁 서버는 키를 확인하지 않지만 클라이언트는 키가 필요 (주소가 없으면 OPENAI_API_KEY 사용)
+                kwargs = {} if self.max_retries is None else {"max_retries": self.max_retries}
+                api_key = self.api_key or ("stub" if self.base_url else None)
+                self._client = openai.OpenAI(api_key=api_key, base_url=self.base_url, **kwargs)
+        return self._client
+
+    def complete(self, messages):
+        """
+        Args:
+            messages (list): 채팅 메시지 리스트
+
+        Returns:
+            str: 생성된 답변
+        """
+        completion = self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        return completion.choices[0].message.content.strip()
+
+    def stream(self, messages):
+        """
+        Args:
+            messages (list): 채팅 메시지 리스트
+
+        Yields:
+            str: 생성된 답변 조각
+        """
+        stream = self._get_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class StubBackend:
+    """
+    API를 호출하지 않고 정해진 답변을 지연 시간과 토큰 속도에 맞춰 돌려주는 백엔드 (부하 테스트용)
+    """
+
+    def __init__(self, latency=0.5, tokens_per_second=50.0, answer=DEFAULT_STUB_ANSWER, max_tokens=400):
+        """
+        Args:
+            latency (float): 첫 토큰까지의 지연 시간(초)
+            tokens_per_second (float): 토큰 생성 속도 (0 이하이면 지연 없이 한 번에 반환)
+            answer (str): 돌려줄 답변
+            max_tokens (int): 답변 최대 토큰 수
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.max_tokens = max_tokens
+        self.tokens = split_stub_tokens(answer)[:max_tokens]
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def complete(self, messages):
+        """
+        Args:
+            messages (list): 채팅 메시지 리스트 (사용하지 않음)
+
+        Returns:
+            str: 정해진 답변
+        """
+        time.sleep(self.latency + self._token_delay() * len(self.tokens))
+        return "".join(self.tokens).strip()
+
+    def stream(self, messages):
+        """
+        Args:
+            messages (list): 채팅 메시지 리스트 (사용하지 않음)
+
+        Yields:
+            str: 정해진 답변의 토큰
+        """
+        time.sleep(self.latency)
+        for i, token in enumerate(self.tokens):
+            if i:
+                time.sleep(self._token_delay())
+            yield token
+
+
+def create_generation_backend(name="openai", api_key=None, base_url=None, stub_latency=0.5, stub_tokens_per_second=50.0,
+                              max_retries=None):
+    """
+    Args:
+        name (str): 생성 백엔드 ("openai" 또는 "stub")
+        api_key (str, optional): OpenAI API 키
+        base_url (str, optional): OpenAI 호환 API 주소 (stub_server.py를 가리키면 HTTP 포함 부하 테스트)
+        stub_latency (float): 스텁의 첫 토큰까지의 지연 시간(초)
+        stub_tokens_per_second (float): 스텁의 토큰 생성 속도
+        max_retries (int, optional): openai 클라이언트의 자체 재시도 횟수 (직접 재시도하는 호출자는 0)
+
+    Returns:
+        OpenAIBackend | StubBackend: 생성 백엔드
+    """
+    if name == "openai":
+        return OpenAIBackend(api_key=api_key, base_url=base_url, max_retries=max_retries)
+    if name == "stub":
+        return StubBackend(latency=stub_latency, tokens_per_second=stub_tokens_per_second)
+    raise ValueError(f"Unknown generation backend: {name} (choose from {', '.join(GENERATION_BACKENDS)})")
@@ -1,20 +1,59 @@
+import time
 import argparse
-from chroma_query_rag import query_rag
-from answer_generator import generate_answer
+from prompt_builder import DEFAULT_CONTEXT_TOKEN_BUDGET
+from generation_backend import create_generation_backend
 
-def main(chroma_path, query_text, k):
+def print_stream(chunks, timings=None):
+    """
+    Args:
+        chunks (iterable): 스트리밍으로 생성되는 답변 조각
+        timings (dict, optional): stream_answer가 기록하는 지연 시간 (있으면 답변 뒤에 출력)
+
+    Returns:
+        str: 조각을 도착하는 대로 출력한 뒤 합친 전체 답변
+    """
+    from answer_generator import format_latency
+
+    parts = []
+    try:
+        for chunk in chunks:
+            print(chunk, end="", flush=True)
+            parts.append(chunk)
+    finally:
+        # 답변 줄을 끝낸 뒤 지연 시간 출력 (생성이 중간에 실패해도 출력)
+        print()
+        if timings is not None:
+            print(format_latency(timings))
+    return "".join(parts).strip()
+
+def main(chroma_path, query_text, k, startup_report=False, filters=None, backend="chroma", answer_cache=None,
+         stream=False, context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, generation_backend=None):
     """
     Args:
         chroma_path (str): Chroma DB 저장 경로
         query_text (str): 사용자 질의
         k (int): 검색할 문서 개수
+        startup_report (bool): 시작 단계별 소요 시간 출력 여부
+        filters (dict, optional): 위원회, 법 종류, 회기, 기간 검색 조건
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
+        answer_cache (AnswerCache, optional): 비슷한 이전 질의의 답변을 재사용하는 의미 캐시
+        stream (bool): 답변을 생성되는 대로 출력하고 첫 토큰까지의 시간과 전체 시간 기록
+        context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
+        generation_backend (optional): 답변 생성 백엔드 (없으면 OpenAI)
     """
+    # 검색/생성 모듈은 인자 검증이 끝난 뒤에 import (--help나 인자 오류에서는 로드하지 않음)
+    start = time.perf_counter()
+    from chroma_query_rag import query_rag
+    from answer_generator import generate_answer, stream_answer
+    from retriever import get_retriever
+    import_seconds = time.perf_counter() - start
+
     print(f"사용자 질의: {query_text}")
     print(f"Chroma DB 경로: {chroma_path}")
 
     # Chroma DB에서 문서 검색
     try:
-        context, metadata = query_rag(chroma_path, query_text, k=k)
+        context, metadata = query_rag(chroma_path, query_text, k=k, filters=filters, backend=backend)
         print("\n 검색된 문서 컨텍스트 및 메타데이터:")
         print(context)
         print(metadata)
@@ -22,21 +61,151 @@ def main(chroma_path, query_text, k):
         print(e)
         return
 
-    # 답변 생성
+    if startup_report:
+        print(f"\nModule import {import_seconds:.2f}s")
+        print(get_retriever(chroma_path, backend=backend).startup_report())
+
+    # 답변 생성 (같은 문서가 검색된 비슷한 이전 질의가 있으면 캐시된 답변 사용)
     print("\n답변 생성 중...")
-    answer = generate_answer(query_text, context, metadata)
-    print("\n최종 답변:")
-    print(answer)
+    timings = {}
+    if stream:
+        # 스트리밍은 생성하면서 바로 출력하므로 제목을 먼저 출력
+        print("\n최종 답변:")
+        generate = lambda: print_stream(stream_answer(query_text, context, metadata, timings,
+                                                         context_token_budget=context_token_budget,
+                                                         backend=generation_backend), timings)
+    else:
+        generate = lambda: generate_answer(query_text, context, metadata, context_token_budget, generation_backend)
+    try:
+        if answer_cache is not None:
+            from answer_cache import context_hash
+            query_vector = get_retriever(chroma_path, backend=backend).embed_queries([query_text])[0]
+            answer, hit = answer_cache.get_or_generate(metadata.get("doc_id"), context_hash(context, metadata, context_token_budget),
+                                                       query_text, query_vector, generate)
+        else:
+            answer, hit = generate(), False
+    except Exception as e:
+        # 스트리밍 도중 실패하면 출력된 일부 답변은 캐시하지 않고 종료
+        print(f"Error generating answer: {e}")
+        return
+    if hit or not stream:
+        print("\n최종 답변" + (" (캐시):" if hit else ":"))
+        print(answer)
+    if answer_cache is not None:
+        print(answer_cache.report())
+
+def main_batch(chroma_path, query_file, k, filters=None, backend="chroma", answer_cache=None,
+               context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, generation_backend=None):
+    """
+    질의 파일의 모든 질의를 한 번의 배치 임베딩과 검색으로 처리한 뒤 답변을 생성
+
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        query_file (str): 한 줄에 하나의 질의가 적힌 파일 경로
+        k (int): 검색할 문서 개수
+        filters (dict, optional): 모든 질의에 적용할 검색 조건
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
+        answer_cache (AnswerCache, optional): 비슷한 이전 질의의 답변을 재사용하는 의미 캐시
+        context_token_budget (int): 프롬프트에 넣을 컨텍스트의 최대 토큰 수
+        generation_backend (optional): 답변 생성 백엔드 (없으면 OpenAI)
+    """
+    from answer_generator import generate_answer
+    from retriever import get_retriever, read_query_file
+
+    queries = read_query_file(query_file)
+    retriever = get_retriever(chroma_path, backend=backend)
+
+    start = time.perf_counter()
+    retrieved = retriever.query_batch(queries, k=k, filters=filters)
+    elapsed = time.perf_counter() - start
+    print(f"{len(queries)}개 질의 검색 완료: {elapsed:.2f}s ({len(queries) / max(elapsed, 1e-9):.1f} queries/sec)")
+    print(retriever.cache_report())
+
+    # 질의 임베딩은 검색할 때 LRU 캐시에 들어갔으므로 다시 계산하지 않음
+    query_vectors = retriever.embed_queries(queries) if answer_cache is not None else [None] * len(queries)
+    generate_start = time.perf_counter()
+    for i, (query_text, query_vector, result) in enumerate(zip(queries, query_vectors, retrieved), start=1):
+        print(f"\n[{i}] 사용자 질의: {query_text}")
+        if result is None:
+            print("No relevant context found.")
+            continue
+        context, metadata = result
+        generate = lambda: generate_answer(query_text, context, metadata, context_token_budget, generation_backend)
+        if answer_cache is not None:
+            from answer_cache import context_hash
+            answer, hit = answer_cache.get_or_generate(metadata.get("doc_id"), context_hash(context, metadata, context_token_budget),
+                                                       query_text, query_vector, generate)
+        else:
+            answer, hit = generate(), False
+        print("최종 답변" + (" (캐시):" if hit else ":"))
+        print(answer)
+
+    generate_elapsed = time.perf_counter() - generate_start
+    total_elapsed = time.perf_counter() - start
+    print(f"\n{len(queries)}개 답변 생성 완료: {generate_elapsed:.2f}s, "
+          f"검색 포함 {total_elapsed:.2f}s ({len(queries) / max(total_elapsed, 1e-9):.2f} queries/sec)")
+    if answer_cache is not None:
+        print(answer_cache.report())
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Chroma RAG 기반 답변 생성 스크립트")
     parser.add_argument('--chroma_path', type=str, required=True, help='Chroma DB 저장 경로')
-    parser.add_argument('--query', type=str, required=True, help='사용자 질의 문장')
+    query_group = parser.add_mutually_exclusive_group(required=True)
+    query_group.add_argument('--query', type=str, help='사용자 질의 문장')
+    query_group.add_argument('--query_file', type=str, help='한 줄에 하나의 질의가 적힌 파일 (배치 검색)')
     parser.add_argument('--k', type=int, default=2, help='검색할 문서 개수 (기본값: 2)')
+    parser.add_argument('--startup_report', action='store_true', help='import, 모델 로드, 인덱스 열기 단계별 소요 시간 출력')
+    parser.add_argument('--committee', type=str, help='검색할 소관위원회 (예: 법제사법위원회)')
+    parser.add_argument('--field', type=str, help='검색할 법 종류')
+    parser.add_argument('--session', type=str, nargs='+', help='검색할 국회 회기 (예: 20 21)')
+    parser.add_argument('--date_from', type=str, help='보고서 게시일 시작 (YYYY-MM-DD)')
+    parser.add_argument('--date_to', type=str, help='보고서 게시일 끝 (YYYY-MM-DD)')
+    parser.add_argument('--backend', type=str, choices=['chroma', 'flat'], default='chroma',
+                        help='검색 백엔드 (flat: build_chroma --flat_index로 만든 행렬 전수 비교, 기본값: chroma)')
+    parser.add_argument('--answer_cache', type=str, default=None, help='답변 의미 캐시 SQLite 경로 (비슷한 질의의 답변 재사용)')
+    parser.add_argument('--cache_threshold', type=float, default=0.95, help='캐시된 답변을 재사용할 최소 코사인 유사도 (기본값: 0.95)')
+    parser.add_argument('--cache_ttl', type=float, default=None, help='캐시된 답변의 유효 시간(초) (기본값: 만료 없음)')
+    parser.add_argument('--cache_max_entries', type=int, default=10000, help='캐시에 보관할 최대 답변 수 (기본값: 10000)')
+    parser.add_argument('--stream', action='store_true', help='답변을 생성되는 대로 출력하고 첫 토큰까지의 시간과 전체 시간 출력')
+    parser.add_argument('--context_token_budget', type=int, default=DEFAULT_CONTEXT_TOKEN_BUDGET,
+                        help=f'프롬프트에 넣을 컨텍스트의 최대 토큰 수 (기본값: {DEFAULT_CONTEXT_TOKEN_BUDGET})')
+    parser.add_argument('--generation_backend', type=str, choices=['openai', 'stub'], default='openai',
+                        help='답변 생성 백엔드 (stub: API 호출 없이 정해진 답변 반환, 기본값: openai)')
+    parser.add_argument('--base_url', type=str, default=None,
+                        help='OpenAI 호환 API 주소 (예: stub_server.py의 http://127.0.0.1:8001/v1)')
+    parser.add_argument('--stub_latency', type=float, default=0.5, help='stub 백엔드의 첫 토큰까지의 지연 시간(초) (기본값: 0.5)')
+    parser.add_argument('--stub_tokens_per_second', type=float, default=50.0, help='stub 백엔드의 토큰 생성 속도 (기본값: 50)')
 
     args = parser.parse_args()
-    main(
-        chroma_path=args.chroma_path,
-        query_text=args.query,
-        k=args.k
-    )
\ No newline at end of file
+    answer_cache = None
+    if args.answer_cache:
+        from answer_cache import AnswerCache
+        answer_cache = AnswerCache(args.answer_cache, threshold=args.cache_threshold, ttl_seconds=args.cache_ttl,
+                                   max_entries=args.cache_max_entries)
+    generation_backend = create_generation_backend(args.generation_backend, base_url=args.base_url,
+                                                   stub_latency=args.stub_latency,
+                                                   stub_tokens_per_second=args.stub_tokens_per_second)
+    filters = {
+        "committee": args.committee,
+        "field": args.field,
+        "session": args.session,
+        "date_from": args.date_from,
+        "date_to": args.date_to
+    }
+    if args.query_file:
+        main_batch(chroma_path=args.chroma_path, query_file=args.query_file, k=args.k, filters=filters,
+                   backend=args.backend, answer_cache=answer_cache, context_token_budget=args.context_token_budget,
+                   generation_backend=generation_backend)
+    else:
+        main(
+            chroma_path=args.chroma_path,
+            query_text=args.query,
+            k=args.k,
+            startup_report=args.startup_report,
+            filters=filters,
+            backend=args.backend,
+            answer_cache=answer_cache,
+            stream=args.stream,
+            context_token_budget=args.context_token_budget,
+            generation_backend=generation_backend
+        )
\ No newline at end of file
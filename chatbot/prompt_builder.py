@@ -0,0 +1,232 @@
+import re
+import math
+
+
+GENERATION_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = "메타데이터와 컨텍스트를 기반으로 사용자가 이해하기 쉬운 답변을 작성하십시오. 최종적으로 논리적인 흐름을 가진 답변을 제공하십시오 "
+
+# 프롬프트에 넣을 검색 컨텍스트의 기본 최대 토큰 수
+DEFAULT_CONTEXT_TOKEN_BUDGET = 1500
+
+# tiktoken 인코딩 (처음 사용할 때 로드, 설치되어 있지 않으면 False)
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(GENERATION_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # tiktoken이 없거나 인코딩 파일을 받을 수 없으면 근사치 사용
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    """
+    Args:
+        text (str): 토큰 수를 셀 문자열
+
+    Returns:
+        int: tiktoken 토큰 수 (tiktoken이 없으면 한글 등 비ASCII 문자는 1자당 1토큰, ASCII는 4자당 1토큰으로 근사)
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + math.ceil((len(text) - non_ascii) / 4)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Args:
+        text (str): 자를 문자열
+        max_tokens (int): 최대 토큰 수
+
+    Returns:
+        str: 토큰 수가 max_tokens 이하가 되도록 앞부분만 남긴 문자열
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        # 한글 한 글자가 여러 토큰으로 나뉜 경우 잘린 글자는 버림
+        return encoding.decode(encoding.encode(text)[:max_tokens]).rstrip("\ufffd")
+    # 근사 토큰 수는 앞부분 길이에 따라 단조 증가하므로 이진 탐색
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def split_sentences(text):
+    """
+    Args:
+        text (str): 검색된 문서 컨텍스트
+
+    Returns:
+        list: 문장 리스트 (마침표, 물음표, 느낌표 뒤의 공백과 줄바꿈에서 나눔)
+    """
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+|\n+", text or "") if sentence.strip()]
+
+
+def fit_context(context, token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET):
+    """
+    컨텍스트에서 중복 문장을 제거하고 토큰 예산 안에 들어가도록 뒤쪽 문장부터 잘라냄
+    (컨텍스트는 검색 순위 순서로 이어 붙여져 있으므로 덜 유사한 문서의 문장이 먼저 빠짐)
+    예산을 넘기는 문장은 통째로 버리지 않고 남은 예산만큼 앞부분을 남김
+
+    Args:
+        context (str): 검색된 문서 컨텍스트
+        token_budget (int): 컨텍스트의 최대 토큰 수 (None이면 자르지 않음)
+
+    Returns:
+        tuple: (정리된 컨텍스트, {"context_tokens_before", "context_tokens", "duplicate_sentences", "trimmed_sentences", "truncated_sentences"})
+    """
+    sentences = split_sentences(context)
+    seen = set()
+    unique = []
+    for sentence in sentences:
+        key = " ".join(sentence.split())
+        if key not in seen:
+            seen.add(key)
+            unique.append(sentence)
+
+    kept = []
+    used = 0
+    truncated = 0
+    for sentence in unique:
+        tokens = count_tokens(sentence) + 1
+        if token_budget is not None and used + tokens > token_budget:
+            # 구두점 없이 긴 문단도 컨텍스트가 비지 않도록 남은 예산만큼 잘라서 포함
+            partial = truncate_to_tokens(sentence, token_budget - used - 1).strip()
+            if partial:
+                kept.append(partial)
+                truncated = 1
+            break
+        kept.append(sentence)
+        used += tokens
+
+    fitted = " ".join(kept)
+    return fitted, {
+        "context_tokens_before": count_tokens(context or ""),
+        "context_tokens": count_tokens(fitted),
+        "duplicate_sentences": len(sentences) - len(unique),
+        "trimmed_sentences": len(unique) - len(kept),
+        "truncated_sentences": truncated
+    }
+
+
+def build_prompt(query_text, context, metadata):
+    """
+    첫 문장에 포함되는 제목, 회기, 소관위원회, 게시일은 Metadata 항목에서 반복하지 않음
+
+    Args:
+        query_text (str): 사용자 질의
+        context (str): 검색된 문서의 컨텍스트 (fit_context로 정리된 컨텍스트)
+        metadata (dict): 관련 메타데이터
+
+    Returns:
+        str: GPT 모델에 전달할 프롬프트
+    """
+    # Title과 발의자 정보 처리
+    title = metadata.get('title', 'N/A')
+    proposer_info = ""
+    if "(" in title and ")" in title:
+        proposer_info = title[title.find("(")+1:title.find(")")]
+        title_without_proposer = title[:title.find("(")].strip()
+    else:
+        title_without_proposer = title
+
+    # 회기 정보 처리
+    session = metadata.get('session', 'N/A')
+    session_info = f"{session}대 국회" if session != "N/A" else "국회 회기 정보 없음"
+
+    # Terminology와 Terminology_en 키워드 선택
+    terminology = metadata.get('terminology', '').split(", ")
+    terminology_en = metadata.get('terminology_en', '').split(", ")
+    selected_korean_term = terminology[0] if terminology else "N/A"
+    selected_english_term = terminology_en[0] if terminology_en else "N/A"
+
+    # 첫 문장 구성
+    first_sentence = f"의안정보시스템에 {metadata.get('date', 'N/A')}에 게시된 법률안 검토 보고서에 따르면, '{title_without_proposer}'은 "
+    if proposer_info:
+        first_sentence += f"{proposer_info}이 발의하였으며, "
+    first_sentence += f"{metadata.get('committee', 'N/A')}에서 소관하는 법률안으로 {session_info}에서 공개되었습니다."
+
+    # 검색 사이트
+    search_site = 'https://likms.assembly.go.kr/bill/main.do'
+
+    # 프롬프트 설계 
+    prompt = f"""
+    Metadata:
+    Amendment: {metadata.get('amendment', 'N/A')}
+    Enactment: {metadata.get('enactment', 'N/A')}
+    Terminology: {metadata.get('terminology', 'N/A')}
+    Terminology_en: {metadata.get('terminology_en', 'N/A')}
+
+    Instruction:
+    1. 아래 첫 문장을 기반으로 예시와 같이 답변을 시작하십시오:
+       "{first_sentence}"
+    - 예시: "의안정보시스템에 2020년 5월 29일 게시된 법률안 검토 보고서에 따르면, '성폭력범죄의 처벌 등에 관한 특례법 일부개정법률안'은 고용진 의원 등 10인이 발의하였으며, 법제사법위원회에서 소관하는 법률안으로 21대 국회에서 공개되었습니다."
+    2. 질문에 충실히 답변하며, 질문에 대한 답변은 Context의 핵심 내용을 간결히 참고하여 제공합니다.
+    3. 질문에 대한 답변 이후에, Amendment와 Enactment 값을 활용하여, 이 법안이 개정되었다면, 해당 발의로 개정되었음만 언급합니다. 마찬가지로 제정되었으면, 해당 발의로 제정되었음만 언급합니다. 개정되지 않거나 제정되지 않았다면 생략합니다. 
+    - 예시: "최종적으로 이 법안은 해당 발의로 개정되었습니다."
+    4. 마지막으로 Terminology와 Terminology_en에서 관련 키워드를 하나씩 선택하여, 추가 검색을 유도하는 문장을 작성하십시오.
+       - 예: "이 법안에 대해 더 자세히 알아보시려면, 의안정보시스템에서  '{selected_korean_term}'과(와) '{selected_english_term}'를 검색해 보시기 바랍니다. ► 의안정보시스템 바로가기 : {search_site}"
+
+    Context:
+    {context}
+
+    Question:
+    {query_text}
+
+    Answer:
+    """
+    return prompt
+
+
+def build_messages(query_text, context, metadata, context_token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET):
+    """
+    CLI와 Streamlit 앱이 함께 사용하는 채팅 메시지 구성
+
+    Args:
+        query_text (str): 사용자 질의
+        context (str): 검색된 문서의 컨텍스트
+        metadata (dict): 관련 메타데이터
+        context_token_budget (int): 컨텍스트의 최대 토큰 수
+
+    Returns:
+        tuple: (채팅 메시지 리스트, 프롬프트 토큰 보고 dict)
+    """
+    fitted_context, report = fit_context(context, context_token_budget)
+    prompt = build_prompt(query_text, fitted_context, metadata)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    report["prompt_tokens"] = sum(count_tokens(message["content"]) for message in messages)
+    return messages, report
+
+
+def format_prompt_report(report):
+    """
+    Args:
+        report (dict): build_messages의 프롬프트 토큰 보고
+
+    Returns:
+        str: 한 줄 요약
+    """
+    return (f"Prompt tokens: {report['prompt_tokens']} (context {report['context_tokens_before']} -> "
+            f"{report['context_tokens']}, {report['duplicate_sentences']} duplicate / "
+            f"{report['trimmed_sentences']} trimmed / {report['truncated_sentences']} truncated sentences)")
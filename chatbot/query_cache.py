@@ -0,0 +1,77 @@
+import unicodedata
+import threading
+from collections import OrderedDict
+
+
+def normalize_query(query_text):
+    """
+    Args:
+        query_text (str): 사용자 질의
+
+    Returns:
+        str: 유니코드 정규화(NFC), 공백 정리, 소문자화를 거친 질의 (캐시 키)
+    """
+    return " ".join(unicodedata.normalize("NFC", query_text).split()).lower()
+
+
+class QueryEmbeddingCache:
+    """
+    정규화한 질의 문장을 키로 질의 임베딩을 보관하는 크기 제한 LRU 캐시
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Args:
+            maxsize (int): 보관할 최대 질의 수 (0이면 캐시 사용 안 함)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query_text):
+        """
+        Args:
+            query_text (str): 사용자 질의
+
+        Returns:
+            list: 캐시된 임베딩 (없으면 None)
+        """
+        key = normalize_query(query_text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query_text, vector):
+        """
+        Args:
+            query_text (str): 사용자 질의
+            vector (list): 질의 임베딩
+        """
+        if self.maxsize <= 0:
+            return
+        key = normalize_query(query_text)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 적중 수, 미적중 수, 적중률, 현재 크기
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries)
+        }
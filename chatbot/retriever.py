@@ -0,0 +1,402 @@
+import os
+import sys
+import time
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "build_vector_db"))
+from doc_store import DocStore, hydrate_results, load_index_info, resolve_doc_store_path
+from shards import load_shard_manifest, select_shards
+from query_cache import QueryEmbeddingCache
+
+
+DEFAULT_EMBEDDING_MODEL = "jhgan/ko-sroberta-multitask"
+
+# chroma: Chroma DB 검색, flat: memory-map한 float16 행렬 전수 비교 (build_chroma --flat_index로 생성)
+RETRIEVAL_BACKENDS = ("chroma", "flat")
+
+# 샤드 인덱스에서 동시에 검색할 최대 컬렉션 수
+MAX_SHARD_SEARCH_WORKERS = 8
+
+
+def resolve_device(device="auto"):
+    """
+    Args:
+        device (str): "auto", "cpu" 또는 "cuda"
+
+    Returns:
+        str: "auto"이면 GPU 사용 가능 여부에 따라 "cuda" 또는 "cpu", 그 외에는 입력 그대로
+    """
+    if device != "auto":
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def read_query_file(query_file):
+    """
+    Args:
+        query_file (str): 한 줄에 하나의 질의가 적힌 텍스트 파일 경로
+
+    Returns:
+        list: 빈 줄을 제외한 질의 리스트
+    """
+    with open(query_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def normalize_filters(filters):
+    """
+    구조화된 검색 조건을 백엔드에서 공통으로 쓰는 형태로 정리
+
+    Args:
+        filters (dict): committee, field, session (문자열 또는 리스트), date_from, date_to (YYYYMMDD 정수 또는 날짜 문자열)
+
+    Returns:
+        dict: 값이 있는 조건만 남긴 {필드: 문자열 리스트}와 date_from/date_to 정수 (조건이 없으면 빈 dict)
+    """
+    normalized = {}
+    for key in ("committee", "field", "session"):
+        value = (filters or {}).get(key)
+        if value is None or value == "" or value == []:
+            continue
+        # 메타데이터의 회기 등은 문자열로 저장되어 있으므로 문자열로 맞춤
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        normalized[key] = [str(item) for item in values]
+    for key in ("date_from", "date_to"):
+        value = (filters or {}).get(key)
+        if value:
+            normalized[key] = _date_filter_value(value)
+    return normalized
+
+
+def _date_filter_value(value):
+    if isinstance(value, int):
+        return value
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    if len(digits) != 8:
+        raise ValueError(f"Invalid date filter: {value} (expected YYYY-MM-DD or YYYYMMDD)")
+    return int(digits)
+
+
+def build_where(filters):
+    """
+    구조화된 검색 조건을 Chroma where 절로 변환
+
+    Args:
+        filters (dict): 검색 조건 (normalize_filters 참고)
+
+    Returns:
+        dict: Chroma where 절 (조건이 없으면 None)
+    """
+    normalized = normalize_filters(filters)
+    clauses = []
+    for key in ("committee", "field", "session"):
+        if key in normalized:
+            values = normalized[key]
+            clauses.append({key: values[0]} if len(values) == 1 else {key: {"$in": values}})
+
+    # 기간 조건은 숫자 비교만 지원하므로 date_int(YYYYMMDD) 필드로 비교
+    for key, operator in (("date_from", "$gte"), ("date_to", "$lte")):
+        if key in normalized:
+            clauses.append({"date_int": {operator: normalized[key]}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class Retriever:
+    """
+    임베딩 모델과 인덱스(Chroma DB 또는 flat 인덱스)를 한 번만 열어 여러 질의에 재사용하는 검색기
+    """
+
+    def __init__(self, chroma_path, model_name=DEFAULT_EMBEDDING_MODEL, device="auto", doc_store_path=None,
+                 query_cache_size=1024, backend="chroma", flat_index_path=None, embeddings=None):
+        """
+        Args:
+            chroma_path (str): Chroma DB 저장 경로
+            model_name (str): HuggingFace Embedding 모델명
+            device (str): "auto", "cpu" 또는 "cuda" (auto이면 로드할 때 결정)
+            doc_store_path (str, optional): lean 인덱스의 문서 저장소 경로 (기본값: 구축할 때 index_info.json에 기록된 경로)
+            query_cache_size (int): 질의 임베딩 LRU 캐시 크기 (0이면 사용 안 함)
+            backend (str): 검색 백엔드 ("chroma" 또는 "flat")
+            flat_index_path (str, optional): flat 백엔드의 인덱스 경로 (기본값: chroma_path/flat_index)
+            embeddings (optional): 이미 로드한 임베딩 모델 (여러 검색기가 모델 하나를 공유할 때)
+        """
+        if backend not in RETRIEVAL_BACKENDS:
+            raise ValueError(f"Unknown retrieval backend: {backend} (choose from {', '.join(RETRIEVAL_BACKENDS)})")
+        self.chroma_path = chroma_path
+        self.model_name = model_name
+        self.device = device
+        self.doc_store_path = doc_store_path
+        self.backend = backend
+        self.flat_index_path = flat_index_path
+        self.embeddings = embeddings
+        self.db = None
+        self.shard_manifest = None
+        self._executor = None
+        self.doc_store = None
+        self.timings = {}
+        self.query_cache = QueryEmbeddingCache(query_cache_size)
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self.db is not None:
+            return
+        with self._lock:
+            if self.db is not None:
+                return
+            # 무거운 라이브러리는 첫 검색 시점에 import
+            start = time.perf_counter()
+            from langchain.docstore.document import Document
+            from langchain.embeddings import HuggingFaceEmbeddings
+            from langchain.vectorstores import Chroma
+            self._document_class = Document
+            self.device = resolve_device(self.device)
+            self.timings["import"] = time.perf_counter() - start
+
+            # HuggingFace Embeddings 모델 설정
+            if self.embeddings is None:
+                start = time.perf_counter()
+                self.embeddings = HuggingFaceEmbeddings(
+                    model_name=self.model_name,
+                    model_kwargs={"device": self.device}
+                )
+                self.timings["model_load"] = time.perf_counter() - start
+
+            # 인덱스 로드 (flat 인덱스는 본문과 전체 메타데이터를 함께 저장하므로 문서 저장소가 필요 없음)
+            start = time.perf_counter()
+            if self.backend == "flat":
+                from flat_index import FlatIndex, default_flat_index_path
+                self.db = FlatIndex(self.flat_index_path or default_flat_index_path(self.chroma_path))
+            else:
+                # lean 여부는 구축할 때 기록한 인덱스 정보로 판단 (남아 있는 문서 저장소 파일만으로는 사용하지 않음)
+                info = load_index_info(self.chroma_path)
+                if info and info.get("lean"):
+                    self.doc_store_path = self.doc_store_path or resolve_doc_store_path(self.chroma_path, info)
+                    if not os.path.exists(self.doc_store_path):
+                        raise FileNotFoundError(f"Lean index requires its document store: {self.doc_store_path}")
+                    self.doc_store = DocStore(self.doc_store_path)
+                manifest = load_shard_manifest(self.chroma_path)
+                if manifest:
+                    # 샤드 인덱스이면 {컬렉션 이름: Chroma}를 열고 검색은 스레드 풀로 나눠 실행
+                    self.shard_manifest = manifest
+                    self._executor = ThreadPoolExecutor(max_workers=min(MAX_SHARD_SEARCH_WORKERS, len(manifest["shards"])) or 1)
+                    self.db = {
+                        name: Chroma(persist_directory=self.chroma_path, embedding_function=self.embeddings, collection_name=name)
+                        for name in manifest["shards"]
+                    }
+                else:
+                    self.db = Chroma(persist_directory=self.chroma_path, embedding_function=self.embeddings)
+            self.timings["index_open"] = time.perf_counter() - start
+
+    def warm_up(self):
+        """
+        모델과 DB를 로드하고 검색을 한 번 실행하여 첫 질의도 이후 질의와 같은 속도로 처리되도록 준비
+        """
+        self._ensure_loaded()
+        start = time.perf_counter()
+        self.search_by_vectors(self.embeddings.embed_documents(["법률안"]), k=1)
+        self.timings["warm_up"] = time.perf_counter() - start
+
+    def startup_report(self):
+        """
+        Returns:
+            str: 단계별(import, 모델 로드, 인덱스 열기, 예열) 시작 시간 보고
+        """
+        if not self.timings:
+            return "Retriever not loaded yet"
+        parts = [f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()]
+        return f"Retriever startup ({self.backend}) on {self.device}: " + ", ".join(parts) + f" (total {sum(self.timings.values()):.2f}s)"
+
+    def embed_queries(self, queries):
+        """
+        질의 임베딩을 LRU 캐시에서 찾고, 없는 질의만 한 번의 배치로 임베딩
+
+        Args:
+            queries (list): 질의 리스트
+
+        Returns:
+            list: 질의별 임베딩
+        """
+        self._ensure_loaded()
+        vectors = [self.query_cache.get(query_text) for query_text in queries]
+        missing = list(dict.fromkeys(query_text for query_text, vector in zip(queries, vectors) if vector is None))
+        if missing:
+            computed = dict(zip(missing, self.embeddings.embed_documents(missing)))
+            for query_text, vector in computed.items():
+                self.query_cache.put(query_text, vector)
+            vectors = [computed[query_text] if vector is None else vector for query_text, vector in zip(queries, vectors)]
+        return vectors
+
+    def search_by_vectors(self, vectors, k=2, filters=None):
+        """
+        Args:
+            vectors (list): 질의 임베딩 리스트
+            k (int): 질의마다 반환할 문서 개수
+            filters (dict, optional): 검색 조건 (build_where 참고), 벡터 검색 전에 Chroma에서 후보를 좁힘
+
+        Returns:
+            list: 질의별 (Document, score) 검색 결과 리스트 (score는 거리, 작을수록 유사)
+        """
+        self._ensure_loaded()
+        if self.backend == "flat":
+            return self._search_flat(vectors, k, filters)
+        if self.shard_manifest is not None:
+            return self._search_shards(vectors, k, filters)
+        return self._query_collection(self.db._collection, vectors, k, build_where(filters))
+
+    def _query_collection(self, collection, vectors, k, where):
+        query_kwargs = {}
+        if where is not None:
+            query_kwargs["where"] = where
+        response = collection.query(
+            query_embeddings=vectors,
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+            **query_kwargs
+        )
+        batch_results = []
+        for documents, metadatas, distances in zip(response["documents"], response["metadatas"], response["distances"]):
+            batch_results.append([
+                (self._document_class(page_content=document or "", metadata=metadata or {}), distance)
+                for document, metadata, distance in zip(documents, metadatas, distances)
+            ])
+        return batch_results
+
+    def _search_shards(self, vectors, k, filters):
+        # 샤드 필드 조건에 맞는 샤드만 검색하고, 샤드별 상위 k개를 거리순으로 병합
+        names = select_shards(self.shard_manifest, normalize_filters(filters))
+        if not names:
+            return [[] for _ in vectors]
+        where = build_where(filters)
+        if len(names) == 1:
+            return self._query_collection(self.db[names[0]]._collection, vectors, k, where)
+
+        shard_results = list(self._executor.map(
+            lambda name: self._query_collection(self.db[name]._collection, vectors, k, where), names
+        ))
+        return [
+            heapq.nsmallest(k, [hit for results in per_query for hit in results], key=lambda hit: hit[1])
+            for per_query in zip(*shard_results)
+        ]
+
+    def _search_flat(self, vectors, k, filters):
+        batch_results = []
+        for hits in self.db.search(vectors, k, normalize_filters(filters)):
+            results = []
+            for row, distance in hits:
+                # 검색된 행의 레코드만 디스크에서 읽음 (거리는 Chroma와 같은 제곱 L2 거리)
+                record = self.db.get_record(row)
+                document = self._document_class(page_content=record["document"], metadata=record["metadata"])
+                results.append((document, distance))
+            batch_results.append(results)
+        return batch_results
+
+    def search(self, query_text, k=2, filters=None):
+        """
+        Args:
+            query_text (str): 검색할 질의 문장
+            k (int): 반환할 문서 개수
+            filters (dict, optional): 검색 조건 (위원회, 법 종류, 회기, 기간)
+
+        Returns:
+            list: (Document, score) 형태의 검색 결과
+        """
+        return self.search_batch([query_text], k, filters)[0]
+
+    def search_batch(self, queries, k=2, filters=None):
+        """
+        Args:
+            queries (list): 검색할 질의 리스트
+            k (int): 질의마다 반환할 문서 개수
+            filters (dict, optional): 모든 질의에 적용할 검색 조건
+
+        Returns:
+            list: 질의별 (Document, score) 검색 결과 리스트
+        """
+        if not queries:
+            return []
+        return self.search_by_vectors(self.embed_queries(queries), k, filters)
+
+    def _to_context(self, results):
+        if not results:
+            raise ValueError("No relevant context found.")
+
+        # lean 인덱스이면 검색된 문서의 본문과 메타데이터를 문서 저장소에서 채움
+        if self.doc_store is not None:
+            return hydrate_results(results, self.doc_store)
+
+        # 컨텍스트와 메타데이터 추출
+        context = " ".join([doc.page_content for doc, _ in results])
+        metadata = results[0][0].metadata  # 가장 유사한 문서의 메타데이터
+        return context, metadata
+
+    def query(self, query_text, k=2, filters=None):
+        """
+        Args:
+            query_text (str): 검색할 질의 문장
+            k (int): 반환할 문서 개수
+            filters (dict, optional): 검색 조건 (위원회, 법 종류, 회기, 기간)
+
+        Returns:
+            tuple: 검색된 문서의 컨텍스트와 메타데이터
+        """
+        # 유사한 문서 검색
+        return self._to_context(self.search(query_text, k, filters))
+
+    def query_batch(self, queries, k=2, filters=None):
+        """
+        여러 질의를 한 번의 배치 임베딩과 한 번의 검색 호출로 처리
+
+        Args:
+            queries (list): 검색할 질의 리스트
+            k (int): 질의마다 반환할 문서 개수
+            filters (dict, optional): 모든 질의에 적용할 검색 조건
+
+        Returns:
+            list: 질의별 (컨텍스트, 메타데이터), 검색 결과가 없으면 None
+        """
+        contexts = []
+        for results in self.search_batch(queries, k, filters):
+            contexts.append(self._to_context(results) if results else None)
+        return contexts
+
+    def cache_report(self):
+        """
+        Returns:
+            str: 질의 임베딩 캐시 적중률 보고
+        """
+        stats = self.query_cache.stats()
+        return (f"Query embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%} hit rate, {stats['size']} entries)")
+
+
+# 프로세스 안에서 공유하는 검색기 (chroma_path, 모델, 장치별로 하나씩)
+_retrievers = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(chroma_path, model_name=DEFAULT_EMBEDDING_MODEL, device="auto", doc_store_path=None, query_cache_size=1024,
+                  backend="chroma", flat_index_path=None):
+    """
+    Args:
+        chroma_path (str): Chroma DB 저장 경로
+        model_name (str): HuggingFace Embedding 모델명
+        device (str): "auto", "cpu" 또는 "cuda"
+        doc_store_path (str, optional): lean 인덱스의 문서 저장소 경로
+        query_cache_size (int): 새로 만들 때 사용할 질의 임베딩 캐시 크기
+        backend (str): 검색 백엔드 ("chroma" 또는 "flat")
+        flat_index_path (str, optional): flat 백엔드의 인덱스 경로
+
+    Returns:
+        Retriever: 같은 설정이면 이전에 만든 검색기를 그대로 반환
+    """
+    key = (os.path.abspath(chroma_path), model_name, device, doc_store_path, backend, flat_index_path)
+    with _retrievers_lock:
+        if key not in _retrievers:
+            _retrievers[key] = Retriever(chroma_path, model_name, device, doc_store_path, query_cache_size,
+                                         backend, flat_index_path)
+        return _retrievers[key]
@@ -0,0 +1,165 @@
+import json
+import time
+import uuid
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from generation_backend import DEFAULT_STUB_ANSWER, StubBackend
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI Chat Completions API의 /v1/chat/completions만 흉내 내는 요청 처리기
+    (server.backend의 정해진 답변을 일반 응답 또는 SSE 스트림으로 반환)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # 부하 테스트 중 요청마다 로그를 출력하지 않음
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+
+        # 재시도 동작을 확인할 수 있도록 일정 비율로 429 응답
+        if random.random() < self.server.error_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}})
+            return
+
+        backend = self.server.backend
+        completion_id = "chatcmpl-stub-" + uuid.uuid4().hex[:12]
+        model = request.get("model", self.server.model)
+        if request.get("stream"):
+            self._stream(backend, request.get("messages", []), completion_id, model)
+            return
+
+        answer = backend.complete(request.get("messages", []))
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in request.get("messages", [])) // 4
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(backend.tokens),
+                      "total_tokens": prompt_tokens + len(backend.tokens)}
+        })
+
+    def _stream(self, backend, messages, completion_id, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # 길이를 미리 알 수 없으므로 스트림이 끝나면 연결을 닫음
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        for token in backend.stream(messages):
+            send({"content": token})
+        send({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def create_server(host="127.0.0.1", port=8001, latency=0.5, tokens_per_second=50.0, answer=DEFAULT_STUB_ANSWER,
+                  error_rate=0.0, model="gpt-4o-mini"):
+    """
+    Args:
+        host (str): 바인딩 주소
+        port (int): 포트 (0이면 빈 포트 자동 선택)
+        latency (float): 첫 토큰까지의 지연 시간(초)
+        tokens_per_second (float): 요청당 토큰 생성 속도
+        answer (str): 돌려줄 답변
+        error_rate (float): 429 오류로 응답할 요청 비율
+        model (str): 응답에 표시할 모델 이름
+
+    Returns:
+        ThreadingHTTPServer: 요청마다 스레드를 만드는 스텁 서버
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.backend = StubBackend(latency=latency, tokens_per_second=tokens_per_second, answer=answer)
+    server.error_rate = error_rate
+    server.model = model
+    server.requests = 0
+    return server
+
+
+def main(host, port, latency, tokens_per_second, answer_file=None, error_rate=0.0):
+    """
+    Args:
+        host (str): 바인딩 주소
+        port (int): 포트
+        latency (float): 첫 토큰까지의 지연 시간(초)
+        tokens_per_second (float): 요청당 토큰 생성 속도
+        answer_file (str, optional): 돌려줄 답변이 담긴 텍스트 파일 (없으면 기본 답변)
+        error_rate (float): 429 오류로 응답할 요청 비율
+    """
+    answer = DEFAULT_STUB_ANSWER
+    if answer_file:
+        with open(answer_file, 'r', encoding='utf-8') as f:
+            answer = f.read().strip()
+
+    server = create_server(host, port, latency, tokens_per_second, answer, error_rate)
+    print(f"Stub OpenAI server listening on http://{host}:{server.server_port}/v1 "
+          f"(latency {latency:.2f}s, {tokens_per_second:.0f} tokens/sec, {len(server.backend.tokens)} tokens per answer)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {server.requests} requests")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="부하 테스트용 OpenAI 호환 스텁 서버 (정해진 답변 반환)")
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='바인딩 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8001, help='포트 (기본값: 8001)')
+    parser.add_argument('--latency', type=float, default=0.5, help='첫 토큰까지의 지연 시간(초) (기본값: 0.5)')
+    parser.add_argument('--tokens_per_second', type=float, default=50.0, help='요청당 토큰 생성 속도 (기본값: 50)')
+    parser.add_argument('--answer_file', type=str, default=None, help='돌려줄 답변이 담긴 텍스트 파일')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='429 오류로 응답할 요청 비율 (재시도 테스트용, 기본값: 0)')
+
+    args = parser.parse_args()
+
+    main(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        answer_file=args.answer_file,
+        error_rate=args.error_rate
+    )
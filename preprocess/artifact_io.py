@@ -0,0 +1,199 @@
+import os
+import json
+
+
+# 지원하는 중간 산출물 형식 (확장자로 판별)
+ARTIFACT_FORMATS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".parquet": "parquet"
+}
+
+
+def detect_format(path):
+    """
+    파일 확장자로 산출물 형식을 판별
+
+    Args:
+        path (str): 산출물 파일 경로
+
+    Returns:
+        str: 'json', 'jsonl', 'parquet' 중 하나
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in ARTIFACT_FORMATS:
+        raise ValueError(f"Unsupported artifact format '{ext}' for {path} (expected one of {', '.join(ARTIFACT_FORMATS)})")
+    return ARTIFACT_FORMATS[ext]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet artifacts require pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def _project(record, columns):
+    if columns is None:
+        return record
+    return {column: record[column] for column in columns if column in record}
+
+
+def iter_records(path, columns=None, batch_size=1024):
+    """
+    산출물 파일의 레코드를 하나씩 반환
+
+    Args:
+        path (str): 산출물 파일 경로
+        columns (list, optional): 읽을 컬럼 목록 (None이면 전체 컬럼, 레코드에 없는 컬럼은 키가 빠짐)
+        batch_size (int): Parquet 파일을 읽을 때의 배치 크기
+
+    Yields:
+        dict: 레코드 (Parquet은 레코드에 없던 키가 null 컬럼으로 저장되므로 null 값은 빼고 반환)
+    """
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        # Parquet은 요청한 컬럼만 디스크에서 읽음
+        _, pq = _import_pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        if columns is not None:
+            # 어떤 레코드에도 없던 컬럼은 파일에 없으므로 JSON과 같이 빠진 키로 처리
+            columns = [column for column in columns if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            for record in batch.to_pylist():
+                yield {key: value for key, value in record.items() if value is not None}
+    elif fmt == "jsonl":
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield _project(json.loads(line), columns)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for record in data:
+            yield _project(record, columns)
+
+
+def load_records(path, columns=None):
+    """
+    Args:
+        path (str): 산출물 파일 경로
+        columns (list, optional): 읽을 컬럼 목록 (None이면 전체 컬럼)
+
+    Returns:
+        list: 레코드 리스트
+    """
+    return list(iter_records(path, columns))
+
+
+class RecordWriter:
+    """
+    산출물 형식에 맞게 레코드를 순차적으로 기록하는 writer
+
+    JSON Lines는 레코드를 받는 대로 기록하고, JSON은 호환성을 위해 닫을 때 한 번에 배열로 기록함
+    Parquet은 모든 레코드의 컬럼을 합친 스키마가 필요하므로 임시 JSON Lines 파일에 기록하면서
+    배치별로 추론한 스키마를 합치고, 닫을 때 그 스키마로 변환함
+    """
+
+    def __init__(self, path, batch_size=1024):
+        """
+        Args:
+            path (str): 저장할 파일 경로
+            batch_size (int): Parquet row group으로 묶을 레코드 수
+        """
+        self.path = path
+        self.format = detect_format(path)
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer = []
+        self._file = None
+        self._spool_path = None
+        # 지금까지 기록한 레코드에서 추론한 Parquet 스키마 (값이 모두 null인 컬럼은 null 타입)
+        self._schema = None
+        if self.format == "jsonl":
+            self._file = open(path, 'w', encoding='utf-8')
+        elif self.format == "parquet":
+            self._spool_path = path + ".spool.jsonl"
+            self._file = open(self._spool_path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        """
+        Args:
+            record (dict): 기록할 레코드
+        """
+        self.count += 1
+        if self.format in ("jsonl", "parquet"):
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.format == "jsonl":
+            return
+        self._buffer.append(record)
+        if self.format == "parquet" and len(self._buffer) >= self.batch_size:
+            self._merge_parquet_schema()
+
+    def write_many(self, records):
+        """
+        Args:
+            records (iterable): 기록할 레코드들
+        """
+        for record in records:
+            self.write(record)
+
+    def _merge_parquet_schema(self):
+        if not self._buffer:
+            return
+        pa, _ = _import_pyarrow()
+        # Table.from_pylist는 첫 레코드의 키만 보므로 배치 전체의 키를 합친 struct 타입으로 추론
+        schema = pa.schema(list(pa.array(self._buffer).type))
+        # 앞선 배치에서 값이 모두 null이었던 컬럼(빈 리스트 포함)은 값이 있는 배치의 타입으로 정함
+        self._schema = schema if self._schema is None else pa.unify_schemas([self._schema, schema],
+                                                                             promote_options="permissive")
+        self._buffer = []
+
+    def _write_parquet(self):
+        self._merge_parquet_schema()
+        pa, pq = _import_pyarrow()
+        # 레코드가 없으면 컬럼 없는 빈 파일을 만들어 다시 읽을 수 있게 함
+        schema = self._schema if self._schema is not None else pa.schema([])
+        with pq.ParquetWriter(self.path, schema, compression="zstd") as writer:
+            batch = []
+            with open(self._spool_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    batch.append(json.loads(line))
+                    if len(batch) >= self.batch_size:
+                        # 배치에 없는 컬럼은 null로 채움
+                        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                        batch = []
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema) if batch else schema.empty_table())
+        os.remove(self._spool_path)
+
+    def close(self):
+        if self.format == "jsonl":
+            self._file.close()
+        elif self.format == "parquet":
+            self._file.close()
+            self._write_parquet()
+        else:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self._buffer, f, ensure_ascii=False)
+            self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def save_records(records, path):
+    """
+    레코드를 파일 확장자에 맞는 형식으로 저장
+
+    Args:
+        records (iterable): 저장할 레코드들
+        path (str): 저장할 파일 경로 (.json, .jsonl, .parquet)
+    """
+    with RecordWriter(path) as writer:
+        writer.write_many(records)
+    print(f"Data successfully saved to {path}")
@@ -0,0 +1,196 @@
+import zlib
+import argparse
+from itertools import combinations
+import numpy as np
+from artifact_io import load_records, save_records
+
+
+# 문자 n-gram 크기 (몇 단어만 다른 요약문을 잡기 위해 단어 대신 문자 단위로 비교)
+SHINGLE_SIZE = 5
+
+# MinHash 순열에 사용하는 메르센 소수와 32비트 해시 범위
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Args:
+        text (str): 법률안 요약문
+        size (int): 문자 n-gram 크기
+
+    Returns:
+        set: 공백을 정리한 문장의 문자 n-gram 집합
+    """
+    text = " ".join(str(text or "").split())
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """
+    n-gram 집합을 고정 길이 MinHash 서명으로 변환 (서명이 같은 위치의 비율이 Jaccard 유사도의 추정값)
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        """
+        Args:
+            num_perm (int): 해시 순열 수 (서명 길이)
+            seed (int): 순열 계수 시드 (같은 시드끼리만 서명을 비교할 수 있음)
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """
+        Args:
+            shingle_set (set): 문자 n-gram 집합
+
+        Returns:
+            np.ndarray: (num_perm,) uint64 서명 (집합이 비어 있으면 None)
+        """
+        if not shingle_set:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        # uint64 곱셈의 overflow는 해시 계산의 일부로 허용
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+
+
+def lsh_candidate_pairs(signatures, group_keys, bands):
+    """
+    서명을 band로 나눠 같은 그룹 안에서 한 band라도 완전히 같은 문서 쌍을 후보로 선택
+
+    Args:
+        signatures (list): 문서별 MinHash 서명 (없으면 None)
+        group_keys (list): 문서별 그룹 키 (다른 그룹끼리는 비교하지 않음)
+        bands (int): band 수 (num_perm을 나누어 떨어져야 함)
+
+    Returns:
+        set: 후보 문서 인덱스 쌍
+    """
+    num_perm = next(len(signature) for signature in signatures if signature is not None)
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+    rows = num_perm // bands
+
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        for i, (signature, group_key) in enumerate(zip(signatures, group_keys)):
+            if signature is None:
+                continue
+            key = (group_key, signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            pairs.update(combinations(members, 2))
+    return pairs
+
+
+def cluster_near_duplicates(data, threshold=0.8, num_perm=128, bands=16, group_fields=("committee", "session")):
+    """
+    요약문이 거의 같은 법률안을 클러스터로 묶음
+
+    Args:
+        data (list): 법률안 레코드 리스트
+        threshold (float): 같은 클러스터로 묶을 최소 추정 Jaccard 유사도
+        num_perm (int): MinHash 서명 길이
+        bands (int): LSH band 수
+        group_fields (tuple): 값이 모두 같은 법률안끼리만 비교할 필드 (빈 값이면 전체 비교)
+
+    Returns:
+        list: 클러스터별 레코드 인덱스 리스트 (입력 순서)
+    """
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(shingles(item.get("paragraph", ""))) for item in data]
+    group_keys = [tuple(str(item.get(field, "")) for field in group_fields) for item in data]
+
+    parent = list(range(len(data)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if any(signature is not None for signature in signatures):
+        for i, j in lsh_candidate_pairs(signatures, group_keys, bands):
+            # 후보 쌍은 서명 전체로 유사도를 다시 추정해 기준 이상인 경우만 연결
+            if np.mean(signatures[i] == signatures[j]) >= threshold:
+                parent[find(j)] = find(i)
+
+    clusters = {}
+    for i in range(len(data)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def collapse_duplicates(data, clusters):
+    """
+    클러스터마다 대표 법률안 하나만 남기고 나머지 법률안의 id를 대표의 메타데이터로 붙임
+    (대표는 보고서 게시일이 가장 최근인 법률안, 같으면 먼저 나온 법률안)
+
+    Args:
+        data (list): 법률안 레코드 리스트
+        clusters (list): 클러스터별 레코드 인덱스 리스트
+
+    Returns:
+        list: duplicate_ids, duplicate_count 필드가 추가된 대표 레코드 리스트
+    """
+    collapsed = []
+    for members in clusters:
+        representative = max(members, key=lambda i: (str(data[i].get("date", "")), -i))
+        record = dict(data[representative])
+        record["duplicate_ids"] = [str(data[i].get("id", "")) for i in members if i != representative]
+        record["duplicate_count"] = len(members) - 1
+        collapsed.append(record)
+    return collapsed
+
+
+def main(input_file, output_file, threshold=0.8, num_perm=128, bands=16, group_fields=("committee", "session")):
+    """
+    Args:
+        input_file (str): 전처리된 데이터 파일 경로 (.json/.jsonl/.parquet)
+        output_file (str): 중복을 합친 데이터 저장 경로
+        threshold (float): 같은 클러스터로 묶을 최소 추정 Jaccard 유사도
+        num_perm (int): MinHash 서명 길이
+        bands (int): LSH band 수
+        group_fields (tuple): 값이 모두 같은 법률안끼리만 비교할 필드
+    """
+    data = load_records(input_file)
+    print(f"Loaded {len(data)} records from {input_file}")
+
+    clusters = cluster_near_duplicates(data, threshold, num_perm, bands, group_fields)
+    collapsed = collapse_duplicates(data, clusters)
+    duplicated = [members for members in clusters if len(members) > 1]
+    print(f"Near-duplicate clusters: {len(duplicated)} "
+          f"(largest {max((len(members) for members in duplicated), default=0)} bills)")
+    print(f"Collapsed {len(data)} -> {len(collapsed)} records ({len(data) - len(collapsed)} duplicates removed)")
+
+    save_records(collapsed, output_file)
+    print(f"Deduplicated data saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="요약문이 거의 같은 법률안을 MinHash/LSH로 묶어 대표 법률안만 남기는 스크립트")
+    parser.add_argument('--input_file', type=str, required=True, help='전처리된 데이터 파일 경로 (.json/.jsonl/.parquet)')
+    parser.add_argument('--output_file', type=str, required=True, help='중복을 합친 데이터 저장 경로 (.json/.jsonl/.parquet)')
+    parser.add_argument('--threshold', type=float, default=0.8, help='같은 클러스터로 묶을 최소 Jaccard 유사도 (기본값: 0.8)')
+    parser.add_argument('--num_perm', type=int, default=128, help='MinHash 서명 길이 (기본값: 128)')
+    parser.add_argument('--bands', type=int, default=16, help='LSH band 수, num_perm의 약수 (기본값: 16)')
+    parser.add_argument('--group_by', type=str, nargs='*', default=["committee", "session"],
+                        help='값이 같은 법률안끼리만 비교할 필드 (기본값: committee session, 비우면 전체 비교)')
+
+    args = parser.parse_args()
+
+    main(
+        input_file=args.input_file,
+        output_file=args.output_file,
+        threshold=args.threshold,
+        num_perm=args.num_perm,
+        bands=args.bands,
+        group_fields=tuple(args.group_by)
+    )
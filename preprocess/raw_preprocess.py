@@ -1,6 +1,22 @@
 import os
 import json
 import argparse
+import hashlib
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+from artifact_io import RecordWriter, detect_format, save_records
+
+
+# 최종 데이터에 포함할 위원회 및 회기
+SELECTED_COMMITTEES = [
+    "민생경제안정특별위원회", "법제사법위원회", "정무위원회", "보건복지위원회",
+    "환경노동위원회", "국토교통위원회", "행정안전위원회", "교육문화체육관광위원회",
+    "여성가족위원회", "기획재정위원회",
+    "농림축산식품해양수산위원회", "예산결산특별위원회",
+    "아동·여성대상성폭력대책특별위원회"
+]
+SELECTED_SESSIONS = ["20", "21"]
 
 
 def load_json_from_folder(input_folder):
@@ -77,17 +93,6 @@ def process_all_data(data_list):
     return processed_data
 
 
-def save_to_json(data, output_file):
-    """
-    Args:
-        data (list or dict): 저장할 데이터
-        output_file (str): 저장할 파일 경로
-    """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-    print(f"Data successfully saved to {output_file}")
-
-
 def filter_data(data, selected_committees, selected_sessions):
     """
     위원회 및 회기를 기준으로 데이터를 필터링
@@ -108,17 +113,303 @@ def filter_data(data, selected_committees, selected_sessions):
     return filtered_data
 
 
-def main(input_folder, merged_output_file, final_output_file):
+def list_json_files(input_folder):
+    """
+    폴더 내의 모든 JSON 파일 경로를 정렬된 순서로 반환
+
+    Args:
+        input_folder (str): JSON 파일이 저장된 폴더 경로
+
+    Returns:
+        list: JSON 파일 경로 리스트
+    """
+    file_paths = []
+    for root, _, files in os.walk(input_folder):
+        for file_name in files:
+            if file_name.endswith('.json'):
+                file_paths.append(os.path.join(root, file_name))
+    return sorted(file_paths)
+
+
+def load_records_from_file(file_path):
+    """
+    단일 JSON 파일을 로드하여 레코드 리스트로 반환
+
+    Args:
+        file_path (str): JSON 파일 경로
+
+    Returns:
+        list: 파일에 포함된 레코드 리스트 (읽을 수 없는 파일이면 빈 리스트)
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON in file {file_path}: {e}")
+            return []
+    if isinstance(data, list):  # 파일의 데이터가 리스트인 경우
+        return data
+    if isinstance(data, dict):  # 파일의 데이터가 단일 객체인 경우
+        return [data]
+    print(f"Skipping file {os.path.basename(file_path)}: Unexpected JSON structure.")
+    return []
+
+
+def process_file(file_path, selected_committees, selected_sessions, keep_raw=False):
+    """
+    단일 파일을 로드하여 전처리와 필터링까지 수행 (프로세스 풀 작업 단위)
+
+    Args:
+        file_path (str): JSON 파일 경로
+        selected_committees (set): 필터링할 위원회 목록
+        selected_sessions (set): 필터링할 회기 목록
+        keep_raw (bool): 병합 파일 작성을 위해 원본 레코드도 반환할지 여부
+
+    Returns:
+        tuple: (원본 레코드 리스트, 전처리 및 필터링된 레코드 리스트)
+    """
+    raw_records = load_records_from_file(file_path)
+    filtered_records = []
+    for data in raw_records:
+        item = process_data(data)
+        if item and item["committee"] in selected_committees and item["session"] in selected_sessions:
+            filtered_records.append(item)
+    return (raw_records if keep_raw else []), filtered_records
+
+
+def write_jsonl_records(records, f):
+    """
+    Args:
+        records (list): 기록할 레코드 리스트
+        f: 쓰기 모드로 열린 파일 객체
+    """
+    for record in records:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def stream_preprocess(input_folder, final_output_file, merged_output_file=None,
+                      selected_committees=SELECTED_COMMITTEES, selected_sessions=SELECTED_SESSIONS,
+                      num_workers=None, chunksize=4):
+    """
+    파일 단위로 병렬 파싱, 전처리, 필터링을 수행하고 결과를 도착하는 대로 기록
+    JSON Lines 또는 Parquet으로 저장하면 말뭉치 크기와 관계없이 메모리 사용량이 일정
+
+    Args:
+        input_folder (str): 원본 데이터의 폴더 경로
+        final_output_file (str): 최종 전처리된 데이터 파일 경로 (.jsonl 권장)
+        merged_output_file (str, optional): 병합된 원본 데이터를 기록할 파일 경로
+        selected_committees (list): 필터링할 위원회 목록
+        selected_sessions (list): 필터링할 회기 목록
+        num_workers (int, optional): 프로세스 수 (기본값: CPU 코어 수)
+        chunksize (int): 각 프로세스에 한 번에 전달할 파일 수 (기본값: 4)
+
+    Returns:
+        int: 최종 파일에 기록된 레코드 수
+    """
+    file_paths = list_json_files(input_folder)
+    print(f"Found {len(file_paths)} JSON files, processing with {num_workers or os.cpu_count()} workers...")
+
+    worker = partial(
+        process_file,
+        selected_committees=set(selected_committees),
+        selected_sessions=set(selected_sessions),
+        keep_raw=merged_output_file is not None
+    )
+
+    merged_writer = RecordWriter(merged_output_file) if merged_output_file else None
+    try:
+        with RecordWriter(final_output_file) as final_writer, Pool(num_workers) as pool:
+            # imap은 파일 순서를 유지하면서 결과가 준비되는 대로 반환
+            for raw_records, filtered_records in pool.imap(worker, file_paths, chunksize=chunksize):
+                if merged_writer:
+                    merged_writer.write_many(raw_records)
+                final_writer.write_many(filtered_records)
+    finally:
+        if merged_writer:
+            merged_writer.close()
+
+    if merged_writer:
+        print(f"Merged {merged_writer.count} records into {merged_output_file}")
+    print(f"Total records after filtering: {final_writer.count}")
+    print(f"Data successfully saved to {final_output_file}")
+    return final_writer.count
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """
+    Args:
+        file_path (str): 해시를 계산할 파일 경로
+        chunk_size (int): 한 번에 읽을 바이트 수
+
+    Returns:
+        str: 파일 내용의 SHA-256 해시
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    Args:
+        manifest_path (str): 매니페스트 파일 경로
+
+    Returns:
+        dict: 매니페스트 (파일이 없으면 빈 매니페스트)
+    """
+    if not os.path.exists(manifest_path):
+        return {"filters": None, "files": {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_path):
+    """
+    Args:
+        manifest (dict): 저장할 매니페스트
+        manifest_path (str): 매니페스트 파일 경로
+    """
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def incremental_preprocess(input_folder, final_output_file, manifest_path=None,
+                           selected_committees=SELECTED_COMMITTEES, selected_sessions=SELECTED_SESSIONS,
+                           num_workers=None):
+    """
+    매니페스트(파일 경로, 크기, 수정 시각, 내용 해시)를 기준으로 새로 추가되거나 변경된 파일만 다시 처리하고,
+    기존 JSON Lines 결과에 이어 붙여 최종 파일을 갱신 (삭제된 파일의 레코드는 제거)
+
+    최종 파일의 레코드는 원본 파일의 상대 경로 순서로 묶여 있으며,
+    매니페스트에 파일별 레코드 수를 기록해 변경되지 않은 파일의 줄은 그대로 복사함
+
+    Args:
+        input_folder (str): 원본 데이터의 폴더 경로
+        final_output_file (str): 최종 전처리된 JSON Lines 파일 경로
+        manifest_path (str, optional): 매니페스트 경로 (기본값: final_output_file + '.manifest.json')
+        selected_committees (list): 필터링할 위원회 목록
+        selected_sessions (list): 필터링할 회기 목록
+        num_workers (int, optional): 변경된 파일을 처리할 프로세스 수
+
+    Returns:
+        dict: 추가/변경/삭제/유지된 파일 수
+    """
+    if detect_format(final_output_file) != "jsonl":
+        raise ValueError("Incremental mode requires a JSON Lines (.jsonl) output file")
+    manifest_path = manifest_path or final_output_file + ".manifest.json"
+    filters = {"committees": list(selected_committees), "sessions": list(selected_sessions)}
+
+    manifest = load_manifest(manifest_path)
+    if manifest.get("filters") != filters or not os.path.exists(final_output_file):
+        # 필터 조건이 바뀌었거나 기존 결과가 없으면 전체를 다시 처리
+        manifest = {"filters": filters, "files": {}}
+    old_entries = manifest["files"]
+
+    # 현재 파일 목록과 매니페스트 비교
+    current_entries = {}
+    changed = []
+    unchanged = set()
+    for file_path in list_json_files(input_folder):
+        rel_path = os.path.relpath(file_path, input_folder)
+        stat = os.stat(file_path)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+        old_entry = old_entries.get(rel_path)
+        if old_entry and old_entry["size"] == entry["size"] and old_entry["mtime"] == entry["mtime"]:
+            entry["sha256"] = old_entry["sha256"]
+        else:
+            entry["sha256"] = file_sha256(file_path)
+        if old_entry and old_entry["sha256"] == entry["sha256"]:
+            entry["records"] = old_entry["records"]
+            unchanged.add(rel_path)
+        else:
+            changed.append(rel_path)
+        current_entries[rel_path] = entry
+
+    deleted = [rel_path for rel_path in old_entries if rel_path not in current_entries]
+    stats = {
+        "added": sum(1 for rel_path in changed if rel_path not in old_entries),
+        "changed": sum(1 for rel_path in changed if rel_path in old_entries),
+        "deleted": len(deleted),
+        "unchanged": len(unchanged)
+    }
+    print(f"Files added: {stats['added']}, changed: {stats['changed']}, "
+          f"deleted: {stats['deleted']}, unchanged: {stats['unchanged']}")
+
+    if not changed and not deleted:
+        save_manifest({"filters": filters, "files": current_entries}, manifest_path)
+        print(f"{final_output_file} is already up to date")
+        return stats
+
+    worker = partial(
+        process_file,
+        selected_committees=set(selected_committees),
+        selected_sessions=set(selected_sessions)
+    )
+    changed.sort()
+    tmp_output_file = final_output_file + ".tmp"
+    total_records = 0
+
+    old_f = open(final_output_file, 'r', encoding='utf-8') if old_entries else None
+    try:
+        with open(tmp_output_file, 'w', encoding='utf-8') as new_f, Pool(num_workers) as pool:
+            # 변경된 파일은 경로 순서대로 처리 결과가 도착하므로 병합 순회와 함께 소비
+            changed_results = pool.imap(worker, [os.path.join(input_folder, p) for p in changed])
+            for rel_path in sorted(set(old_entries) | set(current_entries)):
+                old_lines = []
+                if rel_path in old_entries:
+                    old_lines = list(islice(old_f, old_entries[rel_path]["records"]))
+
+                if rel_path in unchanged:
+                    new_f.writelines(old_lines)
+                    total_records += len(old_lines)
+                elif rel_path in current_entries:
+                    _, filtered_records = next(changed_results)
+                    write_jsonl_records(filtered_records, new_f)
+                    current_entries[rel_path]["records"] = len(filtered_records)
+                    total_records += len(filtered_records)
+    finally:
+        if old_f:
+            old_f.close()
+
+    os.replace(tmp_output_file, final_output_file)
+    save_manifest({"filters": filters, "files": current_entries}, manifest_path)
+    print(f"Total records after filtering: {total_records}")
+    print(f"Data successfully saved to {final_output_file}")
+    return stats
+
+
+def main(input_folder, merged_output_file, final_output_file, stream=False, num_workers=None,
+         incremental=False, manifest_path=None):
     """
     Args:
         input_folder (str): 원본 데이터의 폴더 경로
         merged_output_file (str): 중간 병합 데이터 파일 경로
         final_output_file (str): 최종 전처리된 데이터 파일 경로
+        stream (bool): 스트리밍 모드 사용 여부 (결과를 도착하는 대로 기록)
+        num_workers (int, optional): 스트리밍/증분 모드의 프로세스 수
+        incremental (bool): 증분 모드 사용 여부 (변경된 파일만 다시 처리, JSON Lines로 기록)
+        manifest_path (str, optional): 증분 모드의 매니페스트 경로
     """
+    if incremental:
+        if merged_output_file:
+            print("Incremental mode does not maintain the merged file; skipping merged output.")
+        print("Updating preprocessed data incrementally...")
+        incremental_preprocess(input_folder, final_output_file, manifest_path, num_workers=num_workers)
+        return
+
+    if stream:
+        print("Streaming JSON files from input folder...")
+        stream_preprocess(input_folder, final_output_file, merged_output_file, num_workers=num_workers)
+        return
+
     #모든 하위 폴더 내의 모든 파일을 하나로 병합
     print("Merging all JSON files from input folder...")
     merged_data = load_json_from_folder(input_folder)
-    save_to_json(merged_data, merged_output_file)
+    save_records(merged_data, merged_output_file)
     
     #데이터 전처리
     print("Processing merged data...")
@@ -126,29 +417,30 @@ def main(input_folder, merged_output_file, final_output_file):
     
     #데이터 필터링
     print("Filtering processed data...")
-    selected_committees = [
-        "민생경제안정특별위원회", "법제사법위원회", "정무위원회", "보건복지위원회",
-        "환경노동위원회", "국토교통위원회", "행정안전위원회", "교육문화체육관광위원회",
-        "여성가족위원회", "기획재정위원회",
-        "농림축산식품해양수산위원회", "예산결산특별위원회",
-        "아동·여성대상성폭력대책특별위원회"
-    ]
-    selected_sessions = ["20", "21"]
-    
-    filtered_data = filter_data(processed_data, selected_committees, selected_sessions)
-    save_to_json(filtered_data, final_output_file)
+    filtered_data = filter_data(processed_data, SELECTED_COMMITTEES, SELECTED_SESSIONS)
+    save_records(filtered_data, final_output_file)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Data Preprocessing Script")
     parser.add_argument('--input_folder', type=str, required=True, help='Path to the folder containing input JSON files')
-    parser.add_argument('--merged_output_file', type=str, required=True, help='Path to save merged JSON file')
-    parser.add_argument('--final_output_file', type=str, required=True, help='Path to save final preprocessed JSON file')
+    parser.add_argument('--merged_output_file', type=str, default=None, help='Path to save merged data (.json/.jsonl/.parquet, optional in --stream/--incremental mode)')
+    parser.add_argument('--final_output_file', type=str, required=True, help='Path to save final preprocessed data (.json/.jsonl/.parquet)')
+    parser.add_argument('--stream', action='store_true', help='Parse files in a process pool and write records as they arrive')
+    parser.add_argument('--num_workers', type=int, default=None, help='Number of worker processes for --stream/--incremental (default: CPU count)')
+    parser.add_argument('--incremental', action='store_true', help='Reprocess only new or changed files using a content-hash manifest')
+    parser.add_argument('--manifest_path', type=str, default=None, help='Path to the manifest for --incremental (default: <final_output_file>.manifest.json)')
 
     args = parser.parse_args()
+    if not (args.stream or args.incremental) and not args.merged_output_file:
+        parser.error("--merged_output_file is required unless --stream or --incremental is set")
     
     main(
         input_folder=args.input_folder, 
         merged_output_file=args.merged_output_file, 
-        final_output_file=args.final_output_file
+        final_output_file=args.final_output_file,
+        stream=args.stream,
+        num_workers=args.num_workers,
+        incremental=args.incremental,
+        manifest_path=args.manifest_path
     )
\ No newline at end of file
@@ -1,29 +1,64 @@
 import os
 import json
+import time
+import random
+import hashlib
 import argparse
+import multiprocessing
 import torch
 from transformers import MarianMTModel, MarianTokenizer
+from artifact_io import load_records, save_records
+from translation_memory import TranslationMemory
 
 
-def initial_translation_model(model_name="Helsinki-NLP/opus-mt-ko-en"):
+DEFAULT_MODEL_NAME = "Helsinki-NLP/opus-mt-ko-en"
+
+
+# 번역 모델 실행 방식 (fp32: 원본 모델, int8: Linear 레이어 동적 양자화, CPU 전용)
+TRANSLATION_BACKENDS = ("fp32", "int8")
+
+
+def initial_translation_model(model_name=DEFAULT_MODEL_NAME, backend="fp32", device=None):
     """
     번역 모델과 토크나이저를 초기화
     
     Args:
         model_name (str): 사용할 번역 모델의 이름 (기본값: 'Helsinki-NLP/opus-mt-ko-en')
+        backend (str): 'fp32' 또는 'int8' (기본값: 'fp32')
+        device (str, optional): fp32 모델을 올릴 장치 (기본값: GPU가 있으면 'cuda', 없으면 'cpu')
         
     Returns:
-        tuple: 초기화된 tokenizer, model
+        tuple: 초기화된 tokenizer, model, device
     """
+    if backend not in TRANSLATION_BACKENDS:
+        raise ValueError(f"Unknown translation backend '{backend}' (expected one of {', '.join(TRANSLATION_BACKENDS)})")
     tokenizer = MarianTokenizer.from_pretrained(model_name)
     model = MarianMTModel.from_pretrained(model_name)
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = model.to(device)
-    print(f"Translation model loaded on {device}")
+    if backend == "int8":
+        # 동적 양자화는 CPU에서만 동작
+        device = "cpu"
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        model = model.to(device)
+    model.eval()
+    print(f"Translation model loaded on {device} ({backend})")
     return tokenizer, model, device
 
 
-def translate_to_eng(batch_texts, tokenizer, model, device):
+def translation_memory_key(model_name, backend="fp32"):
+    """
+    Args:
+        model_name (str): 번역 모델 이름
+        backend (str): 번역 모델 실행 방식
+
+    Returns:
+        str: 번역 메모리에서 결과를 구분하는 모델 키 (fp32는 모델 이름 그대로)
+    """
+    return model_name if backend == "fp32" else f"{model_name}:{backend}"
+
+
+def translate_to_eng(batch_texts, tokenizer, model, device, num_beams=4, max_new_tokens=None, greedy=False):
     """
     한국어 키워드의 배치를 영어로 번역
     
@@ -32,43 +67,342 @@ def translate_to_eng(batch_texts, tokenizer, model, device):
         tokenizer: 번역 모델의 토크나이저
         model: 번역 모델
         device (str): 'cuda' 또는 'cpu'
+        num_beams (int): 빔 서치의 빔 개수 (기본값: 4)
+        max_new_tokens (int, optional): 생성할 최대 토큰 수 (None이면 max_length=512)
+        greedy (bool): True이면 빔 서치 없이 greedy decoding
         
     Returns:
         list: 번역된 영어 키워드의 리스트
     """
     inputs = tokenizer(batch_texts, return_tensors="pt", max_length=512, truncation=True, padding=True).to(device)
-    outputs = model.generate(inputs["input_ids"], max_length=512, num_beams=4, early_stopping=True)
-    translated_texts = [tokenizer.decode(output, skip_special_tokens=True) for output in outputs]
+    generate_kwargs = {"num_beams": 1 if greedy else num_beams}
+    if generate_kwargs["num_beams"] > 1:
+        generate_kwargs["early_stopping"] = True
+    if max_new_tokens:
+        generate_kwargs["max_new_tokens"] = max_new_tokens
+    else:
+        generate_kwargs["max_length"] = 512
+    with torch.inference_mode():
+        outputs = model.generate(**inputs, **generate_kwargs)
+    translated_texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
     return translated_texts
 
 
-def translate_terminology(data, tokenizer, model, device, batch_size=32):
+def build_length_batches(texts, tokenizer, max_tokens=4096, max_batch_size=64):
     """
-    terminology 필드를 영어로 번역하여 terminology_en 필드에 추가
-    
+    입력을 토큰 길이순으로 정렬한 뒤, 패딩을 포함한 토큰 수가 max_tokens를 넘지 않도록 배치를 구성
+
     Args:
-        data (list): JSON 데이터의 리스트
+        texts (list): 번역할 텍스트의 리스트
+        tokenizer: 번역 모델의 토크나이저
+        max_tokens (int): 배치당 최대 토큰 수 (가장 긴 입력 길이 x 배치 크기)
+        max_batch_size (int): 배치당 최대 텍스트 수
+
+    Returns:
+        list: 원본 인덱스 리스트의 배치 리스트
+    """
+    lengths = [len(ids) for ids in tokenizer(texts, max_length=512, truncation=True)["input_ids"]]
+    order = sorted(range(len(texts)), key=lambda idx: lengths[idx])
+
+    batches = []
+    current_batch = []
+    current_max = 0
+    for idx in order:
+        batch_max = max(current_max, lengths[idx])
+        if current_batch and (batch_max * (len(current_batch) + 1) > max_tokens or len(current_batch) >= max_batch_size):
+            batches.append(current_batch)
+            current_batch = []
+            batch_max = lengths[idx]
+        current_batch.append(idx)
+        current_max = batch_max
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
+def translate_texts(texts, tokenizer, model, device, max_tokens=4096, max_batch_size=64, **decode_kwargs):
+    """
+    길이별로 묶은 동적 배치로 텍스트를 번역하고 원래 순서로 복원
+
+    Args:
+        texts (list): 번역할 텍스트의 리스트
         tokenizer: 번역 모델의 토크나이저
         model: 번역 모델
         device (str): 'cuda' 또는 'cpu'
-        batch_size (int): 배치 크기 (기본값: 32)
-        
+        max_tokens (int): 배치당 최대 토큰 수 (기본값: 4096)
+        max_batch_size (int): 배치당 최대 텍스트 수 (기본값: 64)
+        **decode_kwargs: translate_to_eng에 전달할 디코딩 설정 (num_beams, max_new_tokens, greedy)
+
+    Returns:
+        list: 입력 순서와 같은 번역 결과 리스트
+    """
+    if not texts:
+        return []
+    start = time.perf_counter()
+    batches = build_length_batches(texts, tokenizer, max_tokens, max_batch_size)
+    translated = [None] * len(texts)
+    for batch in batches:
+        batch_results = translate_to_eng([texts[idx] for idx in batch], tokenizer, model, device, **decode_kwargs)
+        for idx, result in zip(batch, batch_results):
+            translated[idx] = result
+    elapsed = time.perf_counter() - start
+    print(f"Translated {len(texts)} terms in {len(batches)} batches, {elapsed:.1f}s "
+          f"({len(texts) / max(elapsed, 1e-9):.1f} terms/sec)")
+    return translated
+
+
+def split_terms(terminology):
+    """
+    Args:
+        terminology (str): 콤마(", ")로 연결된 용어 문자열
+
+    Returns:
+        list: 빈 값을 제외한 용어 리스트
+    """
+    return [term.strip() for term in (terminology or "").split(", ") if term.strip()]
+
+
+def collect_unique_terms(data):
+    """
+    Args:
+        data (list): JSON 데이터의 리스트
+
+    Returns:
+        list: 전체 데이터에 등장하는 고유 용어 리스트 (처음 등장한 순서 유지)
+    """
+    unique_terms = {}
+    for item in data:
+        for term in split_terms(item.get("terminology", "")):
+            unique_terms.setdefault(term, None)
+    return list(unique_terms)
+
+
+class LocalTranslator:
+    """
+    현재 프로세스에서 번역 모델을 실행하는 번역기 (모델은 첫 호출 시 로드)
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL_NAME, backend="fp32", **translate_kwargs):
+        """
+        Args:
+            model_name (str): 번역 모델 이름
+            backend (str): 번역 모델 실행 방식 ('fp32' 또는 'int8')
+            **translate_kwargs: translate_texts에 전달할 배치/디코딩 설정
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.translate_kwargs = translate_kwargs
+        self.tokenizer = None
+        self.model = None
+        self.device = None
+
+    def __call__(self, texts):
+        """
+        Args:
+            texts (list): 번역할 텍스트의 리스트
+
+        Returns:
+            list: 입력 순서와 같은 번역 결과 리스트
+        """
+        if self.model is None:
+            print("Initializing translation model...")
+            self.tokenizer, self.model, self.device = initial_translation_model(self.model_name, self.backend)
+        return translate_texts(texts, self.tokenizer, self.model, self.device, **self.translate_kwargs)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# 샤드 번역 워커 프로세스마다 하나씩 생성되는 번역기
+_worker_translator = None
+
+
+def _init_shard_worker(model_name, backend, num_threads, translate_kwargs):
+    global _worker_translator
+    torch.set_num_threads(num_threads)
+    _worker_translator = LocalTranslator(model_name, backend, **translate_kwargs)
+
+
+def _translate_shard(shard):
+    shard_path, texts = shard
+    translations = _worker_translator(texts)
+    tmp_path = shard_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"texts": texts, "translations": translations}, f, ensure_ascii=False)
+    os.replace(tmp_path, shard_path)
+    return shard_path
+
+
+class ShardedTranslator:
+    """
+    입력을 샤드로 나누어 여러 워커 프로세스에서 번역하고, 완료된 샤드를 디스크에 체크포인트로 저장
+    같은 입력으로 다시 실행하면 이미 저장된 샤드는 건너뛰고 남은 샤드만 번역
+    """
+
+    def __init__(self, checkpoint_dir, model_name=DEFAULT_MODEL_NAME, backend="fp32", num_workers=2,
+                 threads_per_worker=None, shard_size=512, **translate_kwargs):
+        """
+        Args:
+            checkpoint_dir (str): 완료된 샤드를 저장할 디렉터리
+            model_name (str): 번역 모델 이름
+            backend (str): 번역 모델 실행 방식 ('fp32' 또는 'int8')
+            num_workers (int): 워커 프로세스 수 (워커마다 모델을 따로 로드)
+            threads_per_worker (int, optional): 워커당 torch 스레드 수 (기본값: CPU 코어 수 / 워커 수)
+            shard_size (int): 샤드당 텍스트 수
+            **translate_kwargs: translate_texts에 전달할 배치/디코딩 설정
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.model_name = model_name
+        self.backend = backend
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.shard_size = shard_size
+        self.translate_kwargs = translate_kwargs
+        self._pool = None
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _shard_path(self, texts):
+        # 모델, 실행 방식, 디코딩 설정, 입력이 모두 같을 때만 체크포인트를 재사용
+        key = json.dumps([self.model_name, self.backend, self.translate_kwargs, texts], ensure_ascii=False, sort_keys=True)
+        return os.path.join(self.checkpoint_dir, f"shard_{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    def _load_shard(self, shard_path, texts):
+        if not os.path.exists(shard_path):
+            return None
+        with open(shard_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        return checkpoint["translations"] if checkpoint["texts"] == texts else None
+
+    def __call__(self, texts):
+        """
+        Args:
+            texts (list): 번역할 텍스트의 리스트
+
+        Returns:
+            list: 입력 순서와 같은 번역 결과 리스트
+        """
+        shards = []
+        for start in range(0, len(texts), self.shard_size):
+            shard_texts = texts[start:start + self.shard_size]
+            shards.append((start, self._shard_path(shard_texts), shard_texts))
+
+        translated = [None] * len(texts)
+        # 내용이 같은 샤드는 체크포인트 경로도 같으므로 한 번만 번역하고 모든 위치에 채움
+        pending = {}
+        resumed = 0
+        for start, shard_path, shard_texts in shards:
+            translations = self._load_shard(shard_path, shard_texts)
+            if translations is None:
+                pending.setdefault(shard_path, (shard_texts, []))[1].append(start)
+            else:
+                translated[start:start + len(translations)] = translations
+                resumed += 1
+        print(f"Shards: {len(shards)}, resumed from checkpoint: {resumed}, to translate: {len(pending)} "
+              f"({sum(len(starts) for _, starts in pending.values())} ranges)")
+
+        if pending:
+            if self._pool is None:
+                print(f"Starting {self.num_workers} translation workers ({self.threads_per_worker} threads each)...")
+                self._pool = multiprocessing.get_context("spawn").Pool(
+                    self.num_workers,
+                    initializer=_init_shard_worker,
+                    initargs=(self.model_name, self.backend, self.threads_per_worker, self.translate_kwargs)
+                )
+            jobs = [(shard_path, shard_texts) for shard_path, (shard_texts, _) in pending.items()]
+            for done, shard_path in enumerate(self._pool.imap_unordered(_translate_shard, jobs), start=1):
+                shard_texts, starts = pending[shard_path]
+                translations = self._load_shard(shard_path, shard_texts)
+                for start in starts:
+                    translated[start:start + len(translations)] = translations
+                print(f"Shard {done}/{len(jobs)} done")
+        return translated
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def translate_terminology_with_memory(data, memory, translator, chunk_size=2048):
+    """
+    terminology를 용어 단위로 나누어 번역 메모리에 없는 용어만 번역한 뒤,
+    번역 메모리 조회 결과로 terminology_en 필드를 구성
+
+    Args:
+        data (list): JSON 데이터의 리스트
+        memory (TranslationMemory): 번역 메모리
+        translator: 텍스트 리스트를 번역 결과 리스트로 바꾸는 번역기 (LocalTranslator 또는 ShardedTranslator)
+        chunk_size (int): 번역 메모리에 나누어 저장할 용어 수 (기본값: 2048)
+
     Returns:
         list: 번역된 데이터 리스트
     """
-    processed_data = []
-    terminology_texts = [item.get("terminology", "") for item in data]  # 모든 용어 추출
-    
-    for i in range(0, len(terminology_texts), batch_size):
-        batch_texts = terminology_texts[i:i + batch_size]
-        translated_batch = translate_to_eng(batch_texts, tokenizer, model, device)
-        
-        for j, translated_keywords in enumerate(translated_batch):
-            idx = i + j
-            data[idx]["terminology_en"] = translated_keywords
-            processed_data.append(data[idx])
-    
-    return processed_data
+    terms = collect_unique_terms(data)
+    missing_terms = memory.missing(terms)
+    print(f"Unique terms: {len(terms)}, cached: {len(terms) - len(missing_terms)}, to translate: {len(missing_terms)}")
+
+    for i in range(0, len(missing_terms), chunk_size):
+        # 중간에 중단되어도 번역한 용어는 남도록 나누어 저장
+        chunk = missing_terms[i:i + chunk_size]
+        memory.add(dict(zip(chunk, translator(chunk))))
+
+    translations = memory.lookup(terms)
+    for item in data:
+        item["terminology_en"] = ", ".join(
+            translations[term] for term in split_terms(item.get("terminology", ""))
+        )
+    return data
+
+
+def compare_backends(texts, model_name=DEFAULT_MODEL_NAME, backends=TRANSLATION_BACKENDS, **translate_kwargs):
+    """
+    같은 입력을 여러 실행 방식으로 번역하여 fp32 대비 속도 향상과 결과가 달라진 비율을 비교
+    (int8 동적 양자화는 CPU에서만 동작하므로 fp32 기준도 CPU에서 실행하여 같은 장치끼리 비교)
+
+    Args:
+        texts (list): 비교에 사용할 텍스트 리스트
+        model_name (str): 번역 모델 이름
+        backends (tuple): 비교할 실행 방식 목록 (fp32 기준)
+        **translate_kwargs: translate_texts에 전달할 배치/디코딩 설정
+
+    Returns:
+        dict: 실행 방식별 {device, seconds, speedup, diff_ratio}
+    """
+    backends = ["fp32"] + [backend for backend in backends if backend != "fp32"]
+    outputs = {}
+    report = {}
+    for backend in backends:
+        tokenizer, model, device = initial_translation_model(model_name, backend, device="cpu")
+        translate_texts(texts[:8], tokenizer, model, device, **translate_kwargs)  # warm-up
+        start = time.perf_counter()
+        outputs[backend] = translate_texts(texts, tokenizer, model, device, **translate_kwargs)
+        report[backend] = {"device": device, "seconds": time.perf_counter() - start}
+        del model
+
+    baseline = outputs["fp32"]
+    for backend in backends:
+        diff_count = sum(1 for a, b in zip(baseline, outputs[backend]) if a != b)
+        report[backend]["speedup"] = report["fp32"]["seconds"] / max(report[backend]["seconds"], 1e-9)
+        report[backend]["diff_ratio"] = diff_count / max(len(texts), 1)
+
+    print(f"Backend comparison on {len(texts)} samples:")
+    for backend, result in report.items():
+        print(f"  {backend} ({result['device']}): {result['seconds']:.1f}s, speedup x{result['speedup']:.2f}, "
+              f"outputs differing from fp32: {result['diff_ratio']:.1%}")
+    return report
 
 
 def remove_duplicate_keywords(data):
@@ -91,57 +425,107 @@ def remove_duplicate_keywords(data):
     return data
 
 
-def save_to_json(data, output_file):
+def main(input_file, output_file, translation_memory=None, max_tokens=4096, max_batch_size=64,
+         num_beams=4, max_new_tokens=None, greedy=False, num_workers=1, threads_per_worker=None,
+         shard_size=512, checkpoint_dir=None, backend="fp32", compare_sample=0):
     """
     Args:
-        data (list): 저장할 데이터
-        output_file (str): 저장할 파일 경로
+        input_file (str): 전처리된 데이터 파일 경로
+        output_file (str): 최종 데이터 파일 경로
+        translation_memory (str, optional): 용어 단위 번역 메모리(SQLite) 경로
+        max_tokens (int): 배치당 최대 토큰 수
+        max_batch_size (int): 배치당 최대 텍스트 수
+        num_beams (int): 빔 서치의 빔 개수
+        max_new_tokens (int, optional): 생성할 최대 토큰 수
+        greedy (bool): greedy decoding 사용 여부
+        num_workers (int): 번역 워커 프로세스 수 (1보다 크면 샤드 번역)
+        threads_per_worker (int, optional): 워커당 torch 스레드 수
+        shard_size (int): 샤드당 텍스트 수
+        checkpoint_dir (str, optional): 샤드 체크포인트 디렉터리 (기본값: output_file + '.shards')
+        backend (str): 번역 모델 실행 방식 ('fp32' 또는 'int8')
+        compare_sample (int): 0보다 크면 해당 개수의 샘플로 실행 방식을 비교하고 종료
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-    print(f"Data successfully saved to {output_file}")
+    translate_kwargs = {
+        "max_tokens": max_tokens,
+        "max_batch_size": max_batch_size,
+        "num_beams": num_beams,
+        "max_new_tokens": max_new_tokens,
+        "greedy": greedy
+    }
 
+    if compare_sample:
+        data = load_records(input_file)
+        if translation_memory:
+            texts = collect_unique_terms(data)
+        else:
+            texts = [item.get("terminology", "") for item in data]
+        texts = random.Random(0).sample(texts, min(compare_sample, len(texts)))
+        compare_backends(texts, DEFAULT_MODEL_NAME, **translate_kwargs)
+        return
 
-def load_json_file(input_file):
-    """
-    Args:
-        input_file (str): 불러올 JSON 파일의 경로
-        
-    Returns:
-        list: 로드된 JSON 데이터의 리스트
-    """
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data
-
-
-def main(input_file, output_file):
+    if num_workers > 1 or checkpoint_dir:
+        translator = ShardedTranslator(
+            checkpoint_dir or output_file + ".shards", DEFAULT_MODEL_NAME, backend, num_workers,
+            threads_per_worker, shard_size, **translate_kwargs
+        )
+    else:
+        translator = LocalTranslator(DEFAULT_MODEL_NAME, backend, **translate_kwargs)
 
     print("Loading input data...")
-    data = load_json_file(input_file)
-    
-    print("Initializing translation model...")
-    tokenizer, model, device = initial_translation_model()
-    
-    print("Translating terminology to English...")
-    translated_data = translate_terminology(data, tokenizer, model, device)
+    data = load_records(input_file)
+
+    with translator:
+        if translation_memory:
+            print("Translating terminology to English with translation memory...")
+            with TranslationMemory(translation_memory, translation_memory_key(DEFAULT_MODEL_NAME, backend)) as memory:
+                translated_data = translate_terminology_with_memory(data, memory, translator)
+        else:
+            print("Translating terminology to English...")
+            terminology_texts = [item.get("terminology", "") for item in data]
+            for item, translated_keywords in zip(data, translator(terminology_texts)):
+                item["terminology_en"] = translated_keywords
+            translated_data = data
     
     print("Removing duplicate English keywords in terminology_en...")
     final_data = remove_duplicate_keywords(translated_data)
     
     print(f"Saving final data to {output_file}...")
-    save_to_json(final_data, output_file)
+    save_records(final_data, output_file)
     print("Data processing complete!")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Terminology Translation and Preprocessing Script")
-    parser.add_argument('--input_file', type=str, required=True, help='Path to the preprocessed JSON file')
-    parser.add_argument('--output_file', type=str, required=True, help='Path to save the final preprocessed JSON file')
+    parser.add_argument('--input_file', type=str, required=True, help='Path to the preprocessed data (.json/.jsonl/.parquet)')
+    parser.add_argument('--output_file', type=str, required=True, help='Path to save the final preprocessed data (.json/.jsonl/.parquet)')
+    parser.add_argument('--translation_memory', type=str, default=None, help='Path to the SQLite translation memory for term-level translation')
+    parser.add_argument('--max_tokens', type=int, default=4096, help='Token budget per batch including padding (default: 4096)')
+    parser.add_argument('--max_batch_size', type=int, default=64, help='Maximum number of texts per batch (default: 64)')
+    parser.add_argument('--num_beams', type=int, default=4, help='Number of beams for beam search (default: 4)')
+    parser.add_argument('--max_new_tokens', type=int, default=None, help='Maximum number of generated tokens (default: max_length=512)')
+    parser.add_argument('--greedy', action='store_true', help='Use greedy decoding instead of beam search')
+    parser.add_argument('--num_workers', type=int, default=1, help='Number of translation worker processes; >1 enables sharded translation (default: 1)')
+    parser.add_argument('--threads_per_worker', type=int, default=None, help='torch threads per worker (default: CPU count / num_workers)')
+    parser.add_argument('--shard_size', type=int, default=512, help='Number of texts per checkpointed shard (default: 512)')
+    parser.add_argument('--backend', type=str, default="fp32", choices=TRANSLATION_BACKENDS, help='Translation model backend (default: fp32)')
+    parser.add_argument('--compare_sample', type=int, default=0, help='Compare backends on N sampled inputs (speedup, differing outputs) and exit')
+    parser.add_argument('--checkpoint_dir', type=str, default=None, help='Directory for shard checkpoints; enables resume (default: <output_file>.shards)')
 
     args = parser.parse_args()
     
     main(
         input_file=args.input_file, 
-        output_file=args.output_file
+        output_file=args.output_file,
+        translation_memory=args.translation_memory,
+        max_tokens=args.max_tokens,
+        max_batch_size=args.max_batch_size,
+        num_beams=args.num_beams,
+        max_new_tokens=args.max_new_tokens,
+        greedy=args.greedy,
+        num_workers=args.num_workers,
+        threads_per_worker=args.threads_per_worker,
+        shard_size=args.shard_size,
+        checkpoint_dir=args.checkpoint_dir,
+        backend=args.backend,
+        compare_sample=args.compare_sample
     )
\ No newline at end of file
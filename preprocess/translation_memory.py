@@ -0,0 +1,80 @@
+import sqlite3
+
+
+class TranslationMemory:
+    """
+    용어 단위 번역 결과를 SQLite에 저장해 실행 간에 재사용하는 번역 메모리
+    번역 모델이 바뀌면 결과가 달라지므로 모델 이름별로 구분해 저장
+    """
+
+    def __init__(self, db_path, model_name):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로
+            model_name (str): 번역에 사용한 모델 이름
+        """
+        self.db_path = db_path
+        self.model_name = model_name
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "model TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+            "PRIMARY KEY (model, source))"
+        )
+        self.conn.commit()
+
+    def lookup(self, terms, chunk_size=500):
+        """
+        Args:
+            terms (list): 조회할 한국어 용어 리스트
+            chunk_size (int): 한 번의 쿼리로 조회할 용어 수
+
+        Returns:
+            dict: 저장된 번역 결과 {용어: 번역}
+        """
+        terms = list(terms)
+        found = {}
+        for i in range(0, len(terms), chunk_size):
+            chunk = terms[i:i + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT source, target FROM translations WHERE model = ? AND source IN ({placeholders})",
+                [self.model_name, *chunk]
+            )
+            found.update(rows)
+        return found
+
+    def missing(self, terms):
+        """
+        Args:
+            terms (list): 확인할 한국어 용어 리스트
+
+        Returns:
+            list: 아직 번역 메모리에 없는 용어 리스트 (입력 순서 유지)
+        """
+        found = self.lookup(terms)
+        return [term for term in terms if term not in found]
+
+    def add(self, translations):
+        """
+        Args:
+            translations (dict): 저장할 번역 결과 {용어: 번역}
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO translations (model, source, target) VALUES (?, ?, ?)",
+            [(self.model_name, source, target) for source, target in translations.items()]
+        )
+        self.conn.commit()
+
+    def __len__(self):
+        row = self.conn.execute("SELECT COUNT(*) FROM translations WHERE model = ?", (self.model_name,)).fetchone()
+        return row[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,45 @@
+import os
+import sys
+import pytest
+
+# 스크립트 디렉터리는 패키지가 아니므로 각 스크립트와 같은 방식으로 sys.path에 추가
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for dirname in ("preprocess", "build_vector_db", "chatbot"):
+    sys.path.append(os.path.join(ROOT, dirname))
+
+
+def _vocab():
+    # 한글 음절, 영문, 숫자를 글자 단위 WordPiece 토큰으로 갖는 어휘
+    chars = [chr(code) for code in range(0xAC00, 0xD7A4)]
+    chars += list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,·()[]-_!?")
+    return ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + [f"##{char}" for char in chars]
+
+
+@pytest.fixture(scope="session")
+def tiny_model_path(tmp_path_factory):
+    """
+    무작위로 초기화한 작은 BERT로 만든 sentence-transformers 모델 경로
+    (HuggingFaceEmbeddings에 모델 이름 대신 넘겨 네트워크 없이 구축/검색 경로를 실행)
+    """
+    pytest.importorskip("torch")
+    pytest.importorskip("sentence_transformers")
+    import torch
+    from transformers import BertConfig, BertModel, BertTokenizer
+    from sentence_transformers import SentenceTransformer, models
+
+    model_dir = str(tmp_path_factory.mktemp("tiny_bert"))
+    vocab_path = os.path.join(model_dir, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(_vocab()))
+    tokenizer = BertTokenizer(vocab_path, do_lower_case=False, tokenize_chinese_chars=False)
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(tokenizer.vocab), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=256)
+    BertModel(config).save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+
+    transformer = models.Transformer(model_dir, max_seq_length=256)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension())
+    path = os.path.join(model_dir, "sentence_model")
+    SentenceTransformer(modules=[transformer, pooling]).save(path)
+    return path
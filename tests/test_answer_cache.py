@@ -0,0 +1,94 @@
+import sqlite3
+import pytest
+
+import answer_cache
+from answer_cache import AnswerCache, context_hash
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "time", clock)
+    return clock
+
+
+def test_context_hash():
+    metadata = {"content_hash": "abc"}
+    assert context_hash("본문", metadata, 1500) == context_hash("본문", dict(metadata), 1500)
+    assert context_hash("본문", metadata, 1500) != context_hash("본문", metadata, 800)
+    assert context_hash("본문", metadata, 1500) != context_hash("다른 본문", metadata, 1500)
+    assert context_hash("본문", metadata, 1500) != context_hash("본문", {"content_hash": "def"}, 1500)
+
+
+def test_threshold_and_context_key(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite"), threshold=0.9)
+    cache.put("B1", "ctx", "임금 체불", [1.0, 0.0], "답변")
+    assert cache.lookup("B1", "ctx", [2.0, 0.1]) == "답변"
+    # 코사인 유사도가 기준보다 낮거나, 컨텍스트나 문서가 다르면 재사용하지 않음
+    assert cache.lookup("B1", "ctx", [1.0, 1.0]) is None
+    assert cache.lookup("B1", "other", [1.0, 0.0]) is None
+    assert cache.lookup("B2", "ctx", [1.0, 0.0]) is None
+    assert cache.stats() == {"hits": 1, "misses": 3, "hit_rate": 0.25, "size": 1}
+
+
+def test_ttl_and_lru_eviction(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite"), ttl_seconds=60, max_entries=2)
+    cache.put("B1", "ctx", "질의 1", [1.0, 0.0], "답변 1")
+    clock.now += 1
+    cache.put("B2", "ctx", "질의 2", [1.0, 0.0], "답변 2")
+    clock.now += 1
+    assert cache.lookup("B1", "ctx", [1.0, 0.0]) == "답변 1"
+    clock.now += 1
+    # 가장 오래 사용하지 않은 B2가 삭제됨
+    cache.put("B3", "ctx", "질의 3", [1.0, 0.0], "답변 3")
+    assert cache.lookup("B2", "ctx", [1.0, 0.0]) is None
+    assert len(cache) == 2
+
+    clock.now += 59
+    assert cache.lookup("B1", "ctx", [1.0, 0.0]) is None
+    assert cache.lookup("B3", "ctx", [1.0, 0.0]) == "답변 3"
+    # 만료된 답변은 다음 저장 때 삭제
+    cache.put("B4", "ctx", "질의 4", [1.0, 0.0], "답변 4")
+    assert len(cache) == 2
+
+
+def test_get_or_generate(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite"))
+    calls = []
+
+    def generate(answer):
+        return lambda: calls.append(answer) or answer
+
+    assert cache.get_or_generate("B1", "ctx", "질의", [1.0], generate("")) == ("", False)
+    assert cache.get_or_generate("B1", "ctx", "질의", [1.0], generate("답변")) == ("답변", False)
+    assert cache.get_or_generate("B1", "ctx", "질의", [1.0], generate("새 답변")) == ("답변", True)
+    assert cache.get_or_generate(None, "ctx", "질의", [1.0], generate("새 답변")) == ("새 답변", False)
+    assert calls == ["", "답변", "새 답변"]
+
+
+def test_old_cache_file_is_migrated(tmp_path, clock):
+    db_path = str(tmp_path / "answers.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE answers (id INTEGER PRIMARY KEY AUTOINCREMENT, doc_id TEXT NOT NULL, query TEXT NOT NULL, "
+        "vector BLOB NOT NULL, answer TEXT NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX answers_doc_id ON answers (doc_id)")
+    conn.execute("INSERT INTO answers (doc_id, query, vector, answer, created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                 ("B1", "질의", AnswerCache._normalize([1.0]).tobytes(), "예전 답변", 1000.0, 1000.0))
+    conn.commit()
+    conn.close()
+
+    # 컨텍스트 해시가 없는 예전 답변은 재사용하지 않음
+    cache = AnswerCache(db_path)
+    assert cache.lookup("B1", context_hash("본문", {}), [1.0]) is None
+    cache.put("B1", "ctx", "질의", [1.0], "새 답변")
+    assert cache.lookup("B1", "ctx", [1.0]) == "새 답변"
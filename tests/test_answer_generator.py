@@ -0,0 +1,52 @@
+import time
+import pytest
+
+from answer_generator import format_latency, generate_answer, stream_answer
+from main_rag import print_stream
+
+
+class ListBackend:
+    """정해진 조각을 지연 시간 뒤에 돌려주고, 지정하면 도중에 실패하는 테스트용 백엔드"""
+
+    def __init__(self, chunks, latency=0.0, fail_after=None):
+        self.chunks = chunks
+        self.latency = latency
+        self.fail_after = fail_after
+
+    def complete(self, messages):
+        if self.fail_after is not None:
+            raise RuntimeError("backend down")
+        return "".join(self.chunks).strip()
+
+    def stream(self, messages):
+        time.sleep(self.latency)
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield chunk
+
+
+def test_stream_answer_records_timings():
+    timings = {}
+    backend = ListBackend(["임금 ", "체불 ", "법안입니다."], latency=0.05)
+    chunks = list(stream_answer("질의", "본문", {}, timings, backend=backend))
+    assert chunks == ["임금 ", "체불 ", "법안입니다."]
+    assert 0.05 <= timings["ttft"] <= timings["total"]
+    assert format_latency(timings).startswith("Generation latency: first token 0.")
+    assert format_latency({}) == "Generation latency: first token n/a, total n/a"
+
+
+def test_stream_errors_propagate_after_partial_output(capsys):
+    timings = {}
+    backend = ListBackend(["임금 ", "체불 ", "법안입니다."], fail_after=2)
+    # 일부만 생성된 답변이 완성된 답변처럼 반환되지 않도록 오류를 다시 발생시킴
+    with pytest.raises(RuntimeError, match="connection reset"):
+        print_stream(stream_answer("질의", "본문", {}, timings, backend=backend), timings)
+    assert "ttft" in timings and "total" in timings
+    # 실패해도 출력된 답변 줄 뒤에 지연 시간을 출력
+    assert capsys.readouterr().out.endswith("임금 체불 \n" + format_latency(timings) + "\n")
+
+
+def test_generate_answer_returns_empty_on_error():
+    assert generate_answer("질의", "본문", {}, backend=ListBackend(["답변 "])) == "답변"
+    assert generate_answer("질의", "본문", {}, backend=ListBackend(["답변"], fail_after=0)) == ""
@@ -0,0 +1,51 @@
+import pytest
+from artifact_io import RecordWriter, load_records, save_records, detect_format
+
+pytest.importorskip("pyarrow")
+
+FORMATS = ["json", "jsonl", "parquet"]
+
+RECORDS = [
+    {"id": "B1", "title": "근로기준법 일부개정법률안", "terminology": "임금, 체불"},
+    {"id": "B2", "title": "도로교통법 일부개정법률안", "duplicate_ids": [], "duplicate_count": 0},
+    {"id": "B3", "title": "건축법 일부개정법률안", "duplicate_ids": ["B4", "B5"], "duplicate_count": 2, "terminology_en": "building"},
+]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip_keeps_missing_keys_missing(tmp_path, fmt):
+    path = str(tmp_path / f"records.{fmt}")
+    save_records(RECORDS, path)
+    assert load_records(path) == RECORDS
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_column_projection(tmp_path, fmt):
+    path = str(tmp_path / f"records.{fmt}")
+    save_records(RECORDS, path)
+    assert load_records(path, columns=["id", "terminology", "missing"]) == [
+        {"id": "B1", "terminology": "임금, 체불"}, {"id": "B2"}, {"id": "B3"}
+    ]
+
+
+def test_parquet_schema_unifies_across_batches(tmp_path):
+    # 첫 배치에는 빈 리스트와 없는 컬럼만 있고, 타입은 뒤 배치에서 정해짐
+    records = [{"id": str(i), "duplicate_ids": []} for i in range(5)]
+    records.append({"id": "5", "duplicate_ids": ["1"], "score": 1.5})
+    path = str(tmp_path / "records.parquet")
+    with RecordWriter(path, batch_size=2) as writer:
+        writer.write_many(records)
+    assert writer.count == 6
+    assert load_records(path) == records
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_empty_file_reads_back(tmp_path, fmt):
+    path = str(tmp_path / f"empty.{fmt}")
+    save_records([], path)
+    assert load_records(path) == []
+
+
+def test_unknown_extension():
+    with pytest.raises(ValueError):
+        detect_format("records.csv")
@@ -0,0 +1,81 @@
+import json
+import time
+import asyncio
+from batch_rag import BatchAnswerer, TokenBucket, compact_completed, is_retryable
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(tokens_per_minute=6000)  # 초당 100 토큰
+        start = time.monotonic()
+        await bucket.acquire(6000)
+        first = time.monotonic() - start
+        await bucket.acquire(50)
+        return first, time.monotonic() - start
+
+    first, total = asyncio.run(run())
+    assert first < 0.1
+    assert total >= 0.45
+
+
+def test_token_bucket_caps_request_at_capacity():
+    async def run():
+        bucket = TokenBucket(tokens_per_minute=60000)
+        start = time.monotonic()
+        await bucket.acquire(10 ** 9)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 0.1
+
+
+def test_programming_errors_are_not_retried():
+    assert not is_retryable(KeyError("index"))
+    assert not is_retryable(TypeError("bad argument"))
+
+
+class FakeRetriever:
+    def query_batch(self, queries, k, filters):
+        return [(f"{query} 관련 본문", {"doc_id": query}) for query in queries]
+
+
+class FlakyGenerator:
+    """지정한 질의에서 재시도하지 않는 오류를 내는 테스트용 생성 백엔드"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.prompts = []
+
+    def complete(self, messages):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if any(query in prompt for query in self.failing):
+            raise ValueError("bad response")
+        return "답변"
+
+
+def read_records(output_file):
+    with open(output_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_keeps_one_completed_record_per_query(tmp_path):
+    output_file = str(tmp_path / "answers.jsonl")
+    queries = ["임금 체불", "도로 교통", "건축 안전"]
+    first = BatchAnswerer(FakeRetriever(), FlakyGenerator(failing=["도로 교통"]), concurrency=2)
+    summary = asyncio.run(first.run(queries, output_file))
+    assert summary["answered"] == 3 and summary["failures"] == 1
+    # 중단되면서 잘린 마지막 줄
+    with open(output_file, 'a', encoding='utf-8') as f:
+        f.write('{"index": 2, "query": "건축')
+
+    assert compact_completed(output_file) == {0, 2}
+    assert sorted(record["index"] for record in read_records(output_file)) == [0, 2]
+
+    generator = FlakyGenerator()
+    second = BatchAnswerer(FakeRetriever(), generator, concurrency=2)
+    asyncio.run(second.run(queries, output_file, skip=compact_completed(output_file)))
+    assert len(generator.prompts) == 1 and "도로 교통" in generator.prompts[0]
+    records = read_records(output_file)
+    assert sorted(record["index"] for record in records) == [0, 1, 2]
+    assert all(record["answer"] == "답변" and "error" not in record for record in records)
+    assert compact_completed(str(tmp_path / "missing.jsonl")) == set()
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+
+from benchmark_retrieval import DEFAULT_SETTINGS, run_benchmark, sample_queries, synthetic_corpus
+
+
+def test_all_settings_timed_end_to_end(tmp_path, tiny_model_path):
+    data = synthetic_corpus(60)
+    queries = sample_queries([item["paragraph"] for item in data], 10)
+    report = run_benchmark(data, queries, str(tmp_path), k=3, model_name=tiny_model_path)
+
+    results = {result["setting"]: result for result in report["results"]}
+    assert list(results) == DEFAULT_SETTINGS
+    for result in results.values():
+        # 모든 설정의 지연 시간은 질의 임베딩과 인덱스 검색을 합한 시간
+        assert result["mean_ms"] == pytest.approx(result["embed_mean_ms"] + result["search_mean_ms"])
+        assert result["embed_mean_ms"] > 0 and result["search_mean_ms"] > 0
+    assert results["chroma"]["recall@3"] == pytest.approx(1.0)
+    assert results["flat"]["recall@3"] >= 0.9
+    # cached만 질의 임베딩 캐시 적중으로 측정
+    assert results["cached"]["embed_mean_ms"] < results["chroma"]["embed_mean_ms"]
@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+
+from langchain.vectorstores import Chroma
+from langchain.embeddings import HuggingFaceEmbeddings
+from build_chroma import build_vector_db, prepare_documents, assign_doc_ids, date_to_int
+
+
+def make_bills():
+    return [
+        {"id": "B1", "title": "근로기준법 일부개정법률안", "session": "21", "committee": "환경노동위원회", "field": "근로기준법",
+         "date": "2021-03-02", "terminology": "임금, 체불", "paragraph": "사업주가 임금을 체불하면 과태료를 부과함."},
+        {"id": "B2", "title": "도로교통법 일부개정법률안", "session": "21", "committee": "행정안전위원회", "field": "도로교통법",
+         "date": "2020.7.15", "terminology": "운전자", "paragraph": "어린이 보호구역에서 운전자의 주의 의무를 강화함."},
+        {"id": "B3", "title": "건축법 일부개정법률안", "session": "20", "committee": "국토교통위원회", "field": "건축법",
+         "date": "2019년 1월 9일", "terminology": "건축물", "paragraph": "노후 건축물의 안전 점검 주기를 단축함."},
+    ]
+
+
+def collection_contents(chroma_path, model_path):
+    db = Chroma(persist_directory=chroma_path, embedding_function=HuggingFaceEmbeddings(model_name=model_path))
+    stored = db._collection.get(include=["documents", "metadatas", "embeddings"])
+    return {doc_id: (document, metadata, embedding)
+            for doc_id, document, metadata, embedding in zip(stored["ids"], stored["documents"], stored["metadatas"],
+                                                             stored["embeddings"])}
+
+
+def test_stable_ids_and_dates():
+    assert assign_doc_ids([{"id": "B1"}, {"id": "B1"}, {"title": "제목", "date": "2020-01-01"}])[:2] == ["B1", "B1#2"]
+    assert assign_doc_ids([{"title": "제목", "date": "2020-01-01"}])[0].startswith("bill-")
+    assert [date_to_int(date) for date in ("2021-03-02", "2020.7.15", "2019년 1월 9일", "")] == [20210302, 20200715, 20190109, 0]
+    _, _, metadatas = prepare_documents(make_bills())
+    _, _, changed = prepare_documents([dict(make_bills()[0], paragraph="다른 내용")])
+    assert metadatas[0]["content_hash"] != changed[0]["content_hash"]
+
+
+@pytest.mark.parametrize("upsert", [False, True])
+def test_rebuild_replaces_changed_and_removed_bills(tmp_path, tiny_model_path, upsert):
+    chroma_path = str(tmp_path / "chroma")
+    bills = make_bills()
+    build_vector_db(bills, tiny_model_path, chroma_path)
+    before = collection_contents(chroma_path, tiny_model_path)
+    assert sorted(before) == ["B1", "B2", "B3"]
+
+    # B1 본문이 바뀌고, B3가 빠지고, B4가 새로 들어옴
+    bills[0]["paragraph"] = "사업주가 임금을 체불하면 명단을 공개함."
+    bills = bills[:2] + [dict(bills[2], id="B4", paragraph="공동주택 관리비 공개 대상을 확대함.")]
+    build_vector_db(bills, tiny_model_path, chroma_path, upsert=upsert)
+    after = collection_contents(chroma_path, tiny_model_path)
+
+    assert sorted(after) == ["B1", "B2", "B4"]
+    assert after["B1"][0] == bills[0]["paragraph"]
+    assert after["B1"][1]["paragraph"] == bills[0]["paragraph"]
+    assert after["B1"][2] != before["B1"][2]
+    assert after["B2"][2] == pytest.approx(before["B2"][2])
@@ -0,0 +1,44 @@
+from dedup_bills import MinHasher, shingles, cluster_near_duplicates, collapse_duplicates
+
+
+BASE = ("이 법률안은 근로기준법 일부개정법률안으로 사업주가 근로자에게 임금을 체불한 경우 과태료를 부과하고 "
+        "고용노동부장관이 체불 사업주의 명단을 공개할 수 있도록 하는 내용을 신설함.")
+OTHER = ("이 법률안은 도로교통법 일부개정법률안으로 어린이 보호구역에서 운전자의 주의 의무를 강화하고 "
+         "위반 시 범칙금을 상향하려는 것임.")
+
+
+def make_record(bill_id, paragraph, date="2021-01-01", committee="환경노동위원회", session="21"):
+    return {"id": bill_id, "paragraph": paragraph, "date": date, "committee": committee, "session": session}
+
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a, b = shingles(BASE), shingles(BASE.replace("과태료", "벌금"))
+    jaccard = len(a & b) / len(a | b)
+    estimate = (hasher.signature(a) == hasher.signature(b)).mean()
+    assert abs(estimate - jaccard) < 0.1
+
+
+def test_near_duplicates_are_clustered():
+    data = [
+        make_record("A", BASE),
+        make_record("B", OTHER),
+        make_record("C", BASE.replace("신설함.", "신설하려는 것임."), date="2021-03-01"),
+        make_record("D", BASE + " "),
+    ]
+    clusters = cluster_near_duplicates(data, threshold=0.8)
+    assert sorted(clusters) == [[0, 2, 3], [1]]
+
+    collapsed = collapse_duplicates(data, clusters)
+    assert len(collapsed) == 2
+    # 대표는 게시일이 가장 최근인 법률안
+    assert collapsed[0]["id"] == "C"
+    assert sorted(collapsed[0]["duplicate_ids"]) == ["A", "D"]
+    assert collapsed[0]["duplicate_count"] == 2
+    assert collapsed[1]["duplicate_ids"] == []
+
+
+def test_duplicates_in_other_groups_are_kept():
+    data = [make_record("A", BASE), make_record("B", BASE, committee="법제사법위원회")]
+    assert cluster_near_duplicates(data) == [[0], [1]]
+    assert cluster_near_duplicates(data, group_fields=()) == [[0, 1]]
@@ -0,0 +1,84 @@
+import os
+import pytest
+
+from doc_store import DocStore, hydrate_results, lean_metadata, load_index_info, resolve_doc_store_path, save_index_info
+
+
+class FakeDocument:
+    def __init__(self, metadata):
+        self.page_content = ""
+        self.metadata = metadata
+
+
+def test_doc_store_put_get_delete(tmp_path):
+    store = DocStore(str(tmp_path / "store" / "docs.sqlite"))
+    store.put_many(["B1", "B2"], ["본문 1", "본문 2"], [{"title": "제목 1"}, {"title": "제목 2"}])
+    store.put_many(["B1"], ["바뀐 본문"], [{"title": "바뀐 제목"}])
+    store.delete(["B2"])
+    assert store.get_many(["B1", "B2", "B3"]) == {"B1": ("바뀐 본문", {"title": "바뀐 제목"})}
+    assert store.get_many([]) == {}
+
+    # 검색 순서대로 본문을 잇고, 가장 유사한 문서의 전체 메타데이터를 사용
+    store.put_many(["B3"], ["본문 3"], [{"title": "제목 3"}])
+    results = [(FakeDocument({"doc_id": "B3"}), 0.1), (FakeDocument({"doc_id": "B1"}), 0.2)]
+    assert hydrate_results(results, store) == ("본문 3 바뀐 본문", {"title": "제목 3"})
+    # 저장소에 없는 문서는 Chroma의 lean 메타데이터로 대신함
+    assert hydrate_results([(FakeDocument({"doc_id": "B9"}), 0.1)], store) == ("", {"doc_id": "B9"})
+    store.close()
+
+
+def test_index_info(tmp_path):
+    chroma_path = str(tmp_path / "chroma")
+    assert load_index_info(chroma_path) is None
+    assert resolve_doc_store_path(chroma_path, None) is None
+
+    save_index_info(chroma_path, lean=True, doc_store_path=str(tmp_path / "docs.sqlite"))
+    info = load_index_info(chroma_path)
+    assert info == {"lean": True, "doc_store_path": os.path.join("..", "docs.sqlite")}
+    assert os.path.samefile(os.path.dirname(resolve_doc_store_path(chroma_path, info)), str(tmp_path))
+
+    save_index_info(chroma_path, lean=False, doc_store_path=str(tmp_path / "docs.sqlite"))
+    assert resolve_doc_store_path(chroma_path, load_index_info(chroma_path)) is None
+    assert lean_metadata({"doc_id": "B1", "title": "제목", "date_int": 20200101}) == {"doc_id": "B1", "date_int": 20200101}
+
+
+def test_lean_build_hydrates_results(tmp_path, tiny_model_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("chromadb")
+    from build_chroma import build_vector_db
+    from retriever import Retriever
+    from test_build_chroma import make_bills, collection_contents
+
+    chroma_path = str(tmp_path / "chroma")
+    bills = make_bills()
+    build_vector_db(bills, tiny_model_path, chroma_path, lean=True)
+
+    # Chroma에는 본문 없이 필터링 필드만 남음
+    stored = collection_contents(chroma_path, tiny_model_path)
+    assert all(document == "" and "paragraph" not in metadata for document, metadata, _ in stored.values())
+
+    retriever = Retriever(chroma_path, model_name=tiny_model_path, device="cpu")
+    context, metadata = retriever.query(bills[1]["paragraph"], k=3)
+    assert all(bill["paragraph"] in context for bill in bills)
+    assert metadata["paragraph"] in context and "title" in metadata
+
+    # lean이 아닌 구축으로 바꾸면 문서 저장소를 지우고 Chroma에 본문을 다시 기록
+    build_vector_db(bills, tiny_model_path, chroma_path, upsert=True)
+    assert not os.path.exists(os.path.join(chroma_path, "doc_store.sqlite"))
+    assert sorted(document for document, _, _ in collection_contents(chroma_path, tiny_model_path).values()) == \
+        sorted(bill["paragraph"] for bill in bills)
+
+
+def test_missing_doc_store_raises(tmp_path, tiny_model_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("chromadb")
+    from build_chroma import build_vector_db
+    from retriever import Retriever
+    from test_build_chroma import make_bills
+
+    chroma_path = str(tmp_path / "chroma")
+    doc_store_path = str(tmp_path / "docs.sqlite")
+    build_vector_db(make_bills(), tiny_model_path, chroma_path, lean=True, doc_store_path=doc_store_path)
+    os.remove(doc_store_path)
+    with pytest.raises(FileNotFoundError):
+        Retriever(chroma_path, model_name=tiny_model_path, device="cpu").search("임금 체불")
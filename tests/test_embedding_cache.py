@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain")
+
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class CountingEmbeddings:
+    """실제로 임베딩한 텍스트를 기록하는 테스트용 임베딩"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "org/model")
+    assert cache.get_many(["가", "나"]) == [None, None]
+    cache.put_many(["가", "나"], [[1.0, 2.0], [3.0, 4.0]])
+
+    found = cache.get_many(["나", "다", "가"])
+    assert found[1] is None
+    np.testing.assert_array_equal(found[0], [3.0, 4.0])
+    np.testing.assert_array_equal(found[2], [1.0, 2.0])
+    assert cache.stats() == {"hits": 2, "misses": 3, "hit_rate": 0.4}
+    cache.close()
+
+    # 다시 열어도 유지되고, 모델마다 별도 디렉터리를 사용
+    reopened = EmbeddingCache(str(tmp_path), "org/model")
+    np.testing.assert_array_equal(reopened.get_many(["가"])[0], [1.0, 2.0])
+    assert EmbeddingCache(str(tmp_path), "other/model").get_many(["가"]) == [None]
+    with pytest.raises(ValueError):
+        reopened.put_many(["라"], [[1.0, 2.0, 3.0]])
+
+
+def test_partial_trailing_row_is_truncated(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model")
+    cache.put_many(["가"], [[1.0, 2.0]])
+    # 기록 도중 중단되어 인덱스 없이 남은 불완전한 행
+    with open(cache.vectors_path, "ab") as f:
+        f.write(b"\x00" * 6)
+    cache.close()
+
+    cache = EmbeddingCache(str(tmp_path), "model")
+    cache.put_many(["나", "다"], [[3.0, 4.0], [5.0, 6.0]])
+    assert os.path.getsize(cache.vectors_path) == 3 * 2 * 4
+    found = cache.get_many(["가", "나", "다"])
+    np.testing.assert_array_equal(np.stack(found), [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+
+def test_cached_embeddings_embeds_only_misses(tmp_path):
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache(str(tmp_path), "model"))
+    first = embeddings.embed_documents(["가", "나", "가"])
+    second = embeddings.embed_documents(["나", "다"])
+
+    assert inner.embedded == ["가", "나", "다"]
+    assert first[0] == first[2] and second[0] == first[1]
+    # 질의는 캐시를 거치지 않음
+    embeddings.embed_query("가")
+    assert inner.embedded[-1] == "가"
+
+
+def test_rebuild_reuses_cached_embeddings(tmp_path, tiny_model_path, capsys):
+    pytest.importorskip("chromadb")
+    from build_chroma import build_vector_db
+    from test_build_chroma import make_bills
+
+    cache_dir = str(tmp_path / "cache")
+    build_vector_db(make_bills(), tiny_model_path, str(tmp_path / "chroma"), embedding_cache_dir=cache_dir)
+    assert "0 hits, 3 misses" in capsys.readouterr().out
+    build_vector_db(make_bills(), tiny_model_path, str(tmp_path / "chroma"), embedding_cache_dir=cache_dir)
+    assert "3 hits, 0 misses" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+
+from langchain.embeddings import HuggingFaceEmbeddings
+from build_chroma import build_vector_db
+from embedding_cache import EmbeddingCache, normalize_text
+from test_build_chroma import make_bills, collection_contents
+
+
+@pytest.mark.parametrize("embedding_cache", [False, True])
+def test_pipeline_matches_embed_documents(tmp_path, tiny_model_path, embedding_cache):
+    bills = make_bills()
+    # 줄바꿈이 있는 본문도 embed_documents와 같은 벡터가 나와야 함
+    bills[0]["paragraph"] = "사업주가 임금을 체불하면\n과태료를 부과함.\n다만 예외를 둠."
+    cache_dir = str(tmp_path / "cache") if embedding_cache else None
+    chroma_path = str(tmp_path / "chroma")
+    build_vector_db(bills, tiny_model_path, chroma_path, embedding_cache_dir=cache_dir, pipeline=True, batch_size=2)
+
+    stored = collection_contents(chroma_path, tiny_model_path)
+    assert sorted(stored) == ["B1", "B2", "B3"]
+    documents = [stored[doc_id][0] for doc_id in ("B1", "B2", "B3")]
+    assert "\n" in documents[0]
+    expected = HuggingFaceEmbeddings(model_name=tiny_model_path).embed_documents(documents)
+    for doc_id, vector in zip(("B1", "B2", "B3"), expected):
+        np.testing.assert_allclose(stored[doc_id][2], vector, rtol=1e-4, atol=1e-5)
+
+    if embedding_cache:
+        # 파이프라인이 채운 캐시를 CachedEmbeddings 경로에서도 같은 키로 찾을 수 있어야 함
+        cache = EmbeddingCache(cache_dir, tiny_model_path)
+        assert all(vector is not None for vector in cache.get_many([normalize_text(document) for document in documents]))
@@ -0,0 +1,26 @@
+import pytest
+
+from retriever import build_where, normalize_filters
+
+
+def test_normalize_filters():
+    assert normalize_filters(None) == {}
+    assert normalize_filters({"committee": "", "field": [], "session": None, "date_from": ""}) == {}
+    assert normalize_filters({"session": 21, "field": ("근로기준법", "건축법"), "date_from": "2020-07-01",
+                              "date_to": 20211231}) == \
+        {"session": ["21"], "field": ["근로기준법", "건축법"], "date_from": 20200701, "date_to": 20211231}
+    with pytest.raises(ValueError):
+        normalize_filters({"date_from": "2020-7"})
+
+
+def test_build_where():
+    assert build_where({}) is None
+    assert build_where({"committee": "환경노동위원회"}) == {"committee": "환경노동위원회"}
+    # 기간 조건은 숫자로 저장한 date_int 필드로 비교
+    assert build_where({"field": ["근로기준법", "건축법"], "date_from": "2020.01.01", "date_to": "2020-12-31"}) == {
+        "$and": [
+            {"field": {"$in": ["근로기준법", "건축법"]}},
+            {"date_int": {"$gte": 20200101}},
+            {"date_int": {"$lte": 20201231}},
+        ]
+    }
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from flat_index import FlatIndex, write_flat_index, quantize_int8, quantize_binary, squared_l2_distances
+
+
+def make_corpus(num_rows=2000, dim=64, num_clusters=50, seed=0):
+    # 실제 임베딩처럼 차원별로 치우친(평균이 0이 아닌) 군집 데이터
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim))
+    vectors = 1.5 + centers[rng.integers(0, num_clusters, num_rows)] + 0.4 * rng.normal(size=(num_rows, dim))
+    return vectors.astype(np.float32)
+
+
+def build_index(tmp_path, vectors, quantization=None):
+    metadatas = [{"committee": f"위원회{i % 3}", "field": "법", "session": "21", "date_int": 20200101 + i}
+                 for i in range(len(vectors))]
+    write_flat_index(str(tmp_path), [str(i) for i in range(len(vectors))], [f"문서 {i}" for i in range(len(vectors))],
+                     metadatas, vectors, "test-model", quantization=quantization)
+    return FlatIndex(str(tmp_path), block_size=256), metadatas
+
+
+def test_exact_search_matches_brute_force(tmp_path):
+    vectors = make_corpus()
+    index, _ = build_index(tmp_path, vectors)
+    queries = vectors[:20] + 0.05
+    expected = squared_l2_distances(queries, vectors.astype(np.float16))
+    for hits, distances in zip(index.search(queries, k=10), expected):
+        rows = [row for row, _ in hits]
+        assert rows == np.argsort(distances)[:10].tolist()
+        np.testing.assert_allclose([distance for _, distance in hits], distances[rows], rtol=1e-3, atol=1e-3)
+
+
+def test_filtered_search_and_lazy_records(tmp_path):
+    vectors = make_corpus()
+    index, metadatas = build_index(tmp_path, vectors)
+    assert index.columns is None
+    hits = index.search(vectors[:5], k=5, filters={"committee": ["위원회1"], "date_from": 20200500})[0]
+    assert len(hits) == 5
+    for row, _ in hits:
+        record = index.get_record(row)
+        assert record["id"] == str(row)
+        assert record["metadata"]["committee"] == "위원회1"
+        assert record["metadata"]["date_int"] >= 20200500
+    index.close()
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_recall(tmp_path, quantization):
+    vectors = make_corpus()
+    index, _ = build_index(tmp_path, vectors, quantization)
+    queries = vectors[:50] + 0.05
+    truth = np.argsort(squared_l2_distances(queries, vectors.astype(np.float16)), axis=1)[:, :10]
+    found = index.search(queries, k=10)
+    recall = np.mean([len(set(expected) & {row for row, _ in hits}) / 10 for expected, hits in zip(truth, found)])
+    assert recall >= 0.95
+    assert index.memory_report()["codes_mb"] < index.memory_report()["float16_mb"]
+
+
+def test_quantize_int8_roundtrip():
+    vectors = make_corpus(num_rows=100)
+    codes, scales = quantize_int8(vectors)
+    assert codes.dtype == np.int8 and np.abs(codes.astype(np.int16)).max() <= 127
+    np.testing.assert_allclose(codes * scales, vectors, atol=scales.max() / 2 + 1e-6)
+
+
+def test_quantize_binary_centering():
+    vectors = make_corpus(num_rows=100)
+    codes = quantize_binary(vectors)
+    assert codes.shape == (100, 64 // 8) and codes.dtype == np.uint8
+    # 평균을 빼지 않으면 치우친 차원의 비트가 모두 같아지고, 빼면 비트가 고르게 나뉨
+    centered = np.unpackbits(quantize_binary(vectors, center=vectors.mean(axis=0)), axis=1)
+    assert abs(centered.mean() - 0.5) < 0.1
+    assert np.unpackbits(codes, axis=1).mean() > centered.mean()
@@ -0,0 +1,49 @@
+import threading
+import pytest
+
+from generation_backend import OpenAIBackend, StubBackend, create_generation_backend, split_stub_tokens
+from stub_server import create_server
+
+
+MESSAGES = [{"role": "user", "content": "임금 체불 법안은?"}]
+
+
+def test_stub_backend():
+    answer = "임금 체불 사업주의  명단을 공개합니다."
+    assert "".join(split_stub_tokens(answer)) == answer
+    backend = StubBackend(latency=0.0, tokens_per_second=0, answer=answer, max_tokens=3)
+    assert list(backend.stream(MESSAGES)) == ["임금 ", "체불 ", "사업주의  "]
+    assert backend.complete(MESSAGES) == "임금 체불 사업주의"
+
+    assert isinstance(create_generation_backend("stub"), StubBackend)
+    assert isinstance(create_generation_backend("openai", base_url="http://127.0.0.1:1/v1"), OpenAIBackend)
+    with pytest.raises(ValueError):
+        create_generation_backend("local")
+
+
+@pytest.fixture
+def stub_url():
+    server = create_server(port=0, latency=0.0, tokens_per_second=0, answer="스텁 서버의 정해진 답변입니다.")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", server
+    server.shutdown()
+    server.server_close()
+
+
+def test_openai_backend_against_stub_server(stub_url):
+    pytest.importorskip("openai")
+    base_url, server = stub_url
+    backend = create_generation_backend("openai", base_url=base_url, max_retries=0)
+    assert backend.complete(MESSAGES) == "스텁 서버의 정해진 답변입니다."
+    assert "".join(backend.stream(MESSAGES)) == "스텁 서버의 정해진 답변입니다."
+    assert server.requests == 2
+
+
+def test_stub_server_rate_limit(stub_url):
+    openai = pytest.importorskip("openai")
+    base_url, server = stub_url
+    # 재시도 동작 확인용 429 응답
+    server.error_rate = 1.0
+    with pytest.raises(openai.RateLimitError):
+        create_generation_backend("openai", base_url=base_url, max_retries=0).complete(MESSAGES)
@@ -0,0 +1,38 @@
+from prompt_builder import build_messages, count_tokens, fit_context, format_prompt_report
+
+
+def test_fit_context_removes_duplicate_sentences():
+    context = "첫 번째 문장입니다. 두 번째 문장입니다. 첫 번째 문장입니다."
+    fitted, report = fit_context(context, token_budget=None)
+    assert fitted == "첫 번째 문장입니다. 두 번째 문장입니다."
+    assert report["duplicate_sentences"] == 1
+    assert report["trimmed_sentences"] == 0
+
+
+def test_fit_context_respects_budget():
+    context = " ".join(f"{i}번째 법률안은 근로자의 권익을 보호하기 위한 조항을 신설함." for i in range(200))
+    fitted, report = fit_context(context, token_budget=100)
+    assert fitted.startswith("0번째 법률안은")
+    assert report["context_tokens"] <= 100
+    assert report["context_tokens"] == count_tokens(fitted)
+    assert report["trimmed_sentences"] > 0
+
+
+def test_fit_context_truncates_long_sentence():
+    # 구두점 없는 긴 문단도 빈 컨텍스트 대신 예산만큼 앞부분을 남김
+    context = "근로기준법 개정안 " * 500
+    fitted, report = fit_context(context, token_budget=50)
+    assert fitted
+    assert context.startswith(fitted)
+    assert count_tokens(fitted) <= 50
+    assert report["truncated_sentences"] == 1
+
+
+def test_build_messages_fits_context_into_prompt():
+    context = "임금 체불 사업주의 명단을 공개함. " * 300
+    messages, report = build_messages("임금 체불 법안은?", context, {"title": "근로기준법 일부개정법률안"}, 200)
+    assert [message["role"] for message in messages] == ["system", "user"]
+    assert "임금 체불 법안은?" in messages[1]["content"] and "근로기준법 일부개정법률안" in messages[1]["content"]
+    assert report["context_tokens"] <= 200 < report["context_tokens_before"]
+    assert report["prompt_tokens"] == sum(count_tokens(message["content"]) for message in messages)
+    assert format_prompt_report(report).startswith(f"Prompt tokens: {report['prompt_tokens']} ")
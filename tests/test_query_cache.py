@@ -0,0 +1,25 @@
+import unicodedata
+from query_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalized_keys_and_lru_eviction():
+    assert normalize_query("  임금   체불\tAI ") == "임금 체불 ai"
+    # 자모로 분리된 입력(NFD)도 같은 키로 정규화
+    assert normalize_query("가") == normalize_query("가")
+
+    cache = QueryEmbeddingCache(maxsize=2)
+    cache.put("임금 체불", [1.0])
+    cache.put("도로 교통", [2.0])
+    assert cache.get(" 임금  체불 ") == [1.0]
+    cache.put("건축 안전", [3.0])
+    # 가장 오래 쓰지 않은 질의부터 제거
+    assert cache.get("도로 교통") is None
+    assert cache.get("건축 안전") == [3.0]
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 2}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QueryEmbeddingCache(maxsize=0)
+    cache.put("임금 체불", [1.0])
+    assert cache.get("임금 체불") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,72 @@
+import os
+import json
+from artifact_io import load_records
+from raw_preprocess import stream_preprocess, incremental_preprocess, main
+
+
+def make_bill(bill_id, committee="법제사법위원회", session="21"):
+    return {"bill_id": bill_id, "session": session, "title": f"{bill_id} 일부개정법률안", "committee": committee,
+            "field": "형법", "gen_summary": f"{bill_id} 요약", "terminology": "용어", "date": "2021-01-01"}
+
+
+def write_raw(folder, name, data):
+    path = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def make_raw_folder(tmp_path):
+    folder = str(tmp_path / "raw")
+    write_raw(folder, "a/1.json", [make_bill("B1"), make_bill("B2", committee="국방위원회")])
+    write_raw(folder, "a/2.json", make_bill("B3", session="19"))
+    write_raw(folder, "b/3.json", [make_bill("B4"), make_bill("B5", committee="정무위원회", session="20")])
+    with open(os.path.join(folder, "b", "broken.json"), "w", encoding="utf-8") as f:
+        f.write("{")
+    return folder
+
+
+def test_stream_matches_batch_preprocess(tmp_path):
+    folder = make_raw_folder(tmp_path)
+    main(folder, str(tmp_path / "merged.json"), str(tmp_path / "batch.json"))
+    count = stream_preprocess(folder, str(tmp_path / "stream.jsonl"), str(tmp_path / "merged.jsonl"), num_workers=2)
+
+    # 일괄 모드는 os.walk 순서, 스트리밍 모드는 경로 순서로 기록하므로 id 순으로 비교
+    expected = sorted(load_records(str(tmp_path / "batch.json")), key=lambda item: item["id"])
+    assert [item["id"] for item in expected] == ["B1", "B4", "B5"]
+    assert count == 3
+    assert sorted(load_records(str(tmp_path / "stream.jsonl")), key=lambda item: item["id"]) == expected
+    assert len(load_records(str(tmp_path / "merged.jsonl"))) == 5
+
+
+def test_incremental_splices_changed_files(tmp_path):
+    folder = make_raw_folder(tmp_path)
+    output_file = str(tmp_path / "final.jsonl")
+    stats = incremental_preprocess(folder, output_file, num_workers=2)
+    assert stats == {"added": 4, "changed": 0, "deleted": 0, "unchanged": 0}
+    assert [item["id"] for item in load_records(output_file)] == ["B1", "B4", "B5"]
+
+    # 파일 하나를 바꾸고, 하나를 지우고, 하나를 추가
+    write_raw(folder, "a/1.json", [make_bill("B1"), make_bill("B6")])
+    os.remove(os.path.join(folder, "b", "3.json"))
+    write_raw(folder, "a/0.json", make_bill("B0"))
+    stats = incremental_preprocess(folder, output_file, num_workers=2)
+    assert stats == {"added": 1, "changed": 1, "deleted": 1, "unchanged": 2}
+
+    # 처음부터 다시 처리한 결과와 같아야 함
+    stream_preprocess(folder, str(tmp_path / "full.jsonl"), num_workers=2)
+    assert load_records(output_file) == load_records(str(tmp_path / "full.jsonl"))
+    assert [item["id"] for item in load_records(output_file)] == ["B0", "B1", "B6"]
+
+    stats = incremental_preprocess(folder, output_file, num_workers=2)
+    assert stats == {"added": 0, "changed": 0, "deleted": 0, "unchanged": 4}
+
+
+def test_incremental_reprocesses_when_filters_change(tmp_path):
+    folder = make_raw_folder(tmp_path)
+    output_file = str(tmp_path / "final.jsonl")
+    incremental_preprocess(folder, output_file, num_workers=1)
+    stats = incremental_preprocess(folder, output_file, selected_sessions=["19", "20", "21"], num_workers=1)
+    assert stats["added"] == 4
+    assert [item["id"] for item in load_records(output_file)] == ["B1", "B3", "B4", "B5"]
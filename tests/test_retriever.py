@@ -0,0 +1,96 @@
+import os
+import sys
+import subprocess
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+
+from build_chroma import build_vector_db
+from retriever import Retriever, get_retriever, resolve_device
+from test_build_chroma import make_bills
+
+
+@pytest.fixture(scope="module")
+def chroma_path(tmp_path_factory, tiny_model_path):
+    path = str(tmp_path_factory.mktemp("retriever") / "chroma")
+    build_vector_db(make_bills(), tiny_model_path, path)
+    return path
+
+
+def test_get_retriever_reuses_loaded_handles(chroma_path, tiny_model_path):
+    retriever = get_retriever(chroma_path, model_name=tiny_model_path, device="cpu")
+    assert get_retriever(chroma_path, model_name=tiny_model_path, device="cpu") is retriever
+    assert get_retriever(chroma_path, model_name=tiny_model_path, device="cpu", backend="flat") is not retriever
+
+    retriever.warm_up()
+    db, embeddings = retriever.db, retriever.embeddings
+    context, metadata = retriever.query(make_bills()[0]["paragraph"], k=1)
+    # 이후 질의는 처음 연 모델과 DB를 그대로 사용
+    assert retriever.db is db and retriever.embeddings is embeddings
+    assert context == metadata["paragraph"]
+
+
+def test_imports_are_deferred_until_first_search():
+    chatbot_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot")
+    code = "import sys, retriever; print('langchain' in sys.modules, 'torch' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=chatbot_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.split() == ["False", "False"]
+
+
+def test_device_resolved_on_load(chroma_path, tiny_model_path):
+    import torch
+
+    assert resolve_device("cpu") == "cpu"
+    assert resolve_device("auto") == ("cuda" if torch.cuda.is_available() else "cpu")
+
+    retriever = Retriever(chroma_path, model_name=tiny_model_path, device="auto")
+    assert retriever.db is None and retriever.startup_report() == "Retriever not loaded yet"
+    retriever.search("임금 체불", k=1)
+    assert retriever.device == resolve_device("auto")
+    assert set(retriever.timings) == {"import", "model_load", "index_open"}
+    assert f"on {retriever.device}" in retriever.startup_report()
+
+
+def test_search_batch_embeds_uncached_queries_in_one_call(chroma_path, tiny_model_path):
+    from langchain.embeddings import HuggingFaceEmbeddings
+
+    class CountingEmbeddings:
+        def __init__(self, embeddings):
+            self.embeddings = embeddings
+            self.calls = []
+
+        def embed_documents(self, texts):
+            self.calls.append(list(texts))
+            return self.embeddings.embed_documents(texts)
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    embeddings = CountingEmbeddings(HuggingFaceEmbeddings(model_name=tiny_model_path))
+    retriever = Retriever(chroma_path, model_name=tiny_model_path, device="cpu", embeddings=embeddings)
+    queries = ["임금 체불", "어린이 보호구역"]
+    batch = retriever.search_batch(queries, k=2)
+    assert embeddings.calls == [queries]
+
+    # 이후 질의는 정규화한 키로 캐시에서 찾고, 결과는 질의 순서대로 반환
+    singles = [retriever.search(query, k=2) for query in (" 임금  체불", "어린이 보호구역")]
+    assert len(embeddings.calls) == 1
+    assert [[doc.metadata["doc_id"] for doc, _ in results] for results in batch] == \
+        [[doc.metadata["doc_id"] for doc, _ in results] for results in singles]
+    assert retriever.search_batch([]) == []
+    assert retriever.query_cache.stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"committee": "행정안전위원회"}, ["B2"]),
+    ({"session": 21}, ["B1", "B2"]),
+    ({"date_from": "2020-01-01", "date_to": "2020-12-31"}, ["B2"]),
+    ({"session": "21", "date_from": "20210101"}, ["B1"]),
+    ({"committee": "없는 위원회"}, []),
+])
+def test_filters_are_pushed_into_search(chroma_path, tiny_model_path, filters, expected):
+    retriever = get_retriever(chroma_path, model_name=tiny_model_path, device="cpu")
+    results = retriever.search("법률안", k=3, filters=filters)
+    assert sorted(doc.metadata["doc_id"] for doc, _ in results) == expected
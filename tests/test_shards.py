@@ -0,0 +1,58 @@
+import pytest
+
+from shards import group_by_shard, load_shard_manifest, save_shard_manifest, select_shards, shard_collection_name
+
+
+def test_group_and_select_shards(tmp_path):
+    metadatas = [{"session": "21", "committee": "법제사법위원회"}, {"session": "20", "committee": "법제사법위원회"},
+                 {"session": "21", "committee": "국방위원회"}, {"session": "21"}]
+    groups = group_by_shard(metadatas, ["session"])
+    assert sorted(values["session"] for values, _ in groups.values()) == ["20", "21"]
+    assert groups[shard_collection_name({"session": "21"})][1] == [0, 2, 3]
+    # 한글 값도 Chroma에서 쓸 수 있는 컬렉션 이름으로 바뀜
+    assert shard_collection_name({"committee": "국방위원회"}).isascii()
+
+    manifest = {"shard_by": ["session", "committee"], "shards": {
+        name: {"values": values, "count": len(indices)}
+        for name, (values, indices) in group_by_shard(metadatas, ["session", "committee"]).items()
+    }}
+    assert load_shard_manifest(str(tmp_path)) is None
+    save_shard_manifest(str(tmp_path), manifest)
+    assert load_shard_manifest(str(tmp_path)) == manifest
+
+    def selected(filters):
+        return sorted(tuple(manifest["shards"][name]["values"].values()) for name in select_shards(manifest, filters))
+
+    assert len(selected({})) == 4
+    assert selected({"session": ["20"]}) == [("20", "법제사법위원회")]
+    assert selected({"session": ["21"], "committee": ["국방위원회", "외교통일위원회"]}) == [("21", "국방위원회")]
+    # 샤드 필드가 아닌 조건은 샤드 선택에 쓰지 않음
+    assert len(selected({"field": ["근로기준법"]})) == 4
+    assert selected({"session": ["19"]}) == []
+
+
+def test_sharded_build_and_fan_out_search(tmp_path, tiny_model_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("chromadb")
+    from build_chroma import build_vector_db
+    from retriever import Retriever
+    from test_build_chroma import make_bills
+
+    chroma_path = str(tmp_path / "chroma")
+    bills = make_bills()
+    build_vector_db(bills[:2], tiny_model_path, chroma_path, shard_by=["session"])
+    # 새 회기만 구축해도 기존 샤드는 그대로 남음
+    build_vector_db(bills[2:], tiny_model_path, chroma_path, shard_by=["session"])
+    manifest = load_shard_manifest(chroma_path)
+    assert sorted((shard["values"]["session"], shard["count"]) for shard in manifest["shards"].values()) == \
+        [("20", 1), ("21", 2)]
+    with pytest.raises(ValueError):
+        build_vector_db(bills, tiny_model_path, chroma_path, shard_by=["committee"])
+
+    retriever = Retriever(chroma_path, model_name=tiny_model_path, device="cpu")
+    results = retriever.search("법률안", k=3)
+    # 샤드별 결과를 거리순으로 병합
+    assert sorted(doc.metadata["doc_id"] for doc, _ in results) == ["B1", "B2", "B3"]
+    assert [score for _, score in results] == sorted(score for _, score in results)
+    assert [doc.metadata["doc_id"] for doc, _ in retriever.search("법률안", k=3, filters={"session": "20"})] == ["B3"]
+    assert retriever.search("법률안", k=3, filters={"session": "19"}) == []
@@ -0,0 +1,155 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from translation_memory import TranslationMemory
+import translate_keyword
+from translate_keyword import (split_terms, collect_unique_terms, translate_terminology_with_memory,
+                               translation_memory_key, build_length_batches, translate_texts, ShardedTranslator,
+                               initial_translation_model, compare_backends)
+
+
+class RecordingTranslator:
+    """
+    번역 모델 대신 입력 앞에 "en:"을 붙여 돌려주고 호출된 입력을 기록하는 번역기
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [f"en:{text}" for text in texts]
+
+
+class WhitespaceTokenizer:
+    """
+    공백 단위 토큰 수만 돌려주는 토크나이저 (배치 구성 테스트용)
+    """
+
+    def __call__(self, texts, max_length=512, truncation=True):
+        return {"input_ids": [text.split()[:max_length] for text in texts]}
+
+
+def test_length_batches_respect_token_budget():
+    texts = ["가 " * n for n in (5, 1, 9, 2, 8, 3, 1)]
+    batches = build_length_batches(texts, WhitespaceTokenizer(), max_tokens=12, max_batch_size=3)
+    assert sorted(idx for batch in batches for idx in batch) == list(range(len(texts)))
+    lengths = [len(text.split()) for text in texts]
+    for batch in batches:
+        assert len(batch) <= 3
+        # 패딩을 포함한 토큰 수 (가장 긴 입력 x 배치 크기), 한 개짜리 배치는 예외
+        assert len(batch) == 1 or max(lengths[idx] for idx in batch) * len(batch) <= 12
+    # 길이순으로 묶이므로 배치 안의 길이가 정렬되어 있음
+    flat = [lengths[idx] for batch in batches for idx in batch]
+    assert flat == sorted(flat)
+
+
+def test_translate_texts_restores_input_order(monkeypatch):
+    calls = []
+
+    def fake_translate_to_eng(batch_texts, tokenizer, model, device, **decode_kwargs):
+        calls.append((len(batch_texts), decode_kwargs))
+        return [text.upper() for text in batch_texts]
+
+    monkeypatch.setattr(translate_keyword, "translate_to_eng", fake_translate_to_eng)
+    texts = ["c c c", "a", "b b", "d d d d"]
+    result = translate_texts(texts, WhitespaceTokenizer(), None, "cpu", max_tokens=4, max_batch_size=2, greedy=True)
+    assert result == [text.upper() for text in texts]
+    assert len(calls) == 3 and all(kwargs == {"greedy": True} for _, kwargs in calls)
+    assert translate_texts([], WhitespaceTokenizer(), None, "cpu") == []
+
+
+def test_split_and_collect_terms():
+    data = [{"terminology": "임금, 체불, "}, {"terminology": "체불, 과태료"}, {}]
+    assert split_terms(data[0]["terminology"]) == ["임금", "체불"]
+    assert collect_unique_terms(data) == ["임금", "체불", "과태료"]
+
+
+def test_memory_translates_only_new_terms(tmp_path):
+    translator = RecordingTranslator()
+    with TranslationMemory(str(tmp_path / "memory.db"), translation_memory_key("model")) as memory:
+        data = [{"terminology": "임금, 체불"}, {"terminology": "체불"}]
+        translate_terminology_with_memory(data, memory, translator)
+        assert [item["terminology_en"] for item in data] == ["en:임금, en:체불", "en:체불"]
+
+        data = [{"terminology": "과태료, 임금"}, {"terminology": ""}]
+        translate_terminology_with_memory(data, memory, translator, chunk_size=1)
+        assert [item["terminology_en"] for item in data] == ["en:과태료, en:임금", ""]
+
+    assert translator.calls == [["임금", "체불"], ["과태료"]]
+    assert translation_memory_key("model", "int8") == "model:int8"
+
+
+class InlinePool:
+    """
+    워커 프로세스 대신 현재 프로세스에서 샤드를 번역하는 풀 (모델 없이 체크포인트 동작만 확인)
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def imap_unordered(self, func, jobs):
+        self.jobs.extend(jobs)
+        return map(func, jobs)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def test_sharded_translator_checkpoints_and_resumes(tmp_path, monkeypatch):
+    worker = RecordingTranslator()
+    monkeypatch.setattr(translate_keyword, "_worker_translator", worker)
+    checkpoint_dir = str(tmp_path / "shards")
+    # 0~2번과 6~8번 샤드는 내용이 같음
+    texts = ["가", "나", "다", "라", "마", "바", "가", "나", "다", "사"]
+
+    translator = ShardedTranslator(checkpoint_dir, shard_size=3)
+    translator._pool = pool = InlinePool()
+    assert translator(texts) == [f"en:{text}" for text in texts]
+    assert len(pool.jobs) == 3
+    assert worker.calls == [["가", "나", "다"], ["라", "마", "바"], ["사"]]
+
+    # 같은 입력으로 다시 실행하면 모든 샤드를 체크포인트에서 읽음
+    resumed = ShardedTranslator(checkpoint_dir, shard_size=3)
+    resumed._pool = pool = InlinePool()
+    assert resumed(texts) == [f"en:{text}" for text in texts]
+    assert pool.jobs == []
+
+    # 바뀐 샤드만 다시 번역하고, 디코딩 설정이 다르면 체크포인트를 재사용하지 않음
+    texts[4] = "아"
+    assert resumed(texts)[3:6] == ["en:라", "en:아", "en:바"]
+    assert pool.jobs == [(resumed._shard_path(["라", "아", "바"]), ["라", "아", "바"])]
+    greedy = ShardedTranslator(checkpoint_dir, shard_size=3, greedy=True)
+    greedy._pool = pool = InlinePool()
+    greedy(texts)
+    assert len(pool.jobs) == 3
+
+
+def test_unknown_translation_backend():
+    with pytest.raises(ValueError):
+        initial_translation_model(backend="fp16")
+
+
+def test_compare_backends_runs_every_backend_on_cpu(monkeypatch):
+    loaded = []
+
+    def fake_initial_translation_model(model_name, backend, device=None):
+        loaded.append((backend, device))
+        return None, backend, device
+
+    def fake_translate_texts(texts, tokenizer, model, device, **kwargs):
+        # int8은 마지막 텍스트만 다르게 번역
+        return [f"{text}!" if model == "int8" and i == len(texts) - 1 else text for i, text in enumerate(texts)]
+
+    monkeypatch.setattr(translate_keyword, "initial_translation_model", fake_initial_translation_model)
+    monkeypatch.setattr(translate_keyword, "translate_texts", fake_translate_texts)
+    report = compare_backends(["가", "나", "다", "라"], backends=("int8",))
+    assert loaded == [("fp32", "cpu"), ("int8", "cpu")]
+    assert report["fp32"]["device"] == report["int8"]["device"] == "cpu"
+    assert report["fp32"]["diff_ratio"] == 0.0
+    assert report["int8"]["diff_ratio"] == 0.25
@@ -0,0 +1,28 @@
+from translation_memory import TranslationMemory
+
+
+def test_lookup_and_missing_are_per_model(tmp_path):
+    db_path = str(tmp_path / "memory.db")
+    with TranslationMemory(db_path, "model-a") as memory:
+        memory.add({"임금": "wage", "체불": "arrears"})
+        assert memory.lookup(["임금", "근로자"]) == {"임금": "wage"}
+        assert memory.missing(["근로자", "임금", "과태료"]) == ["근로자", "과태료"]
+        assert len(memory) == 2
+
+    # 다른 모델(또는 실행 방식)의 번역은 섞이지 않음
+    with TranslationMemory(db_path, "model-a:int8") as memory:
+        assert memory.lookup(["임금"]) == {}
+        assert len(memory) == 0
+
+    # 다시 열어도 유지되고, 같은 용어는 새 번역으로 교체
+    with TranslationMemory(db_path, "model-a") as memory:
+        memory.add({"임금": "wages"})
+        assert memory.lookup(["임금", "체불"]) == {"임금": "wages", "체불": "arrears"}
+
+
+def test_lookup_in_chunks(tmp_path):
+    with TranslationMemory(str(tmp_path / "memory.db"), "model") as memory:
+        terms = [f"용어{i}" for i in range(1200)]
+        memory.add({term: term.replace("용어", "term") for term in terms})
+        found = memory.lookup(terms, chunk_size=500)
+        assert len(found) == 1200 and found["용어1199"] == "term1199"